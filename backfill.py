@@ -0,0 +1,159 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+import requests
+
+import settings
+from http_client import HttpClient
+from dataframe_parser import DataframeParser
+from snapshot_store import PREPARED_SNAPSHOT, SnapshotStore
+from web_driver import WebDriver
+
+
+class Backfill:
+    r"""
+    Fetches the screener tables of a date range concurrently and stores each date as a prepared snapshot.
+    The `dt_arr` parameter compares one date with the current one ("atual"), the page holds the table of its first
+    date only, so each request fetches a single date. Dates already stored, or known without registers, are skipped:
+    an interrupted backfill resumes where it stopped.
+    """
+    def __init__(
+            self,
+            snapshot_store: Optional[SnapshotStore] = None,
+            web_driver: Optional[WebDriver] = None,
+            max_workers: int = settings.BACKFILL_MAX_WORKERS
+    ) -> None:
+        if max_workers <= 0:
+            print('Invalid number of concurrent requests.')
+            raise SystemExit(1)
+
+        self.snapshot_store = snapshot_store or SnapshotStore(settings.SNAPSHOTS_DIRPATH)
+        self.web_driver = web_driver or WebDriver()
+        self.dataframe_parser = DataframeParser(self.web_driver)
+        self.max_workers = max_workers
+
+        # One keep-alive connection per concurrent request, shared by all the dates
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        self.http_client = HttpClient(session=session)
+
+    # end def
+
+    def run(
+            self,
+            start_date: date,
+            end_date: date
+    ) -> Dict[str, int]:
+        r"""
+        Fetch, parse and store every missing date from `start_date` to `end_date`. A date failing to be fetched or
+        parsed is reported and left missing, the next run retries it.
+
+        Return
+        -------
+        `Dict` with the number of `stored`, `empty`, `skipped` and `failed` dates
+        """
+        if start_date > end_date:
+            print(f'Invalid date range {start_date} - {end_date}.')
+            raise SystemExit(1)
+
+        dates_list = [start_date + timedelta(days=days) for days in range((end_date - start_date).days + 1)]
+        done_dates_set = set(self.snapshot_store.list_dates(PREPARED_SNAPSHOT)) | self.load_empty_dates()
+        missing_dates_list = [link_date for link_date in dates_list if link_date not in done_dates_set]
+        counts_dict = {'stored': 0, 'empty': 0, 'skipped': len(dates_list) - len(missing_dates_list), 'failed': 0}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures_dict = {executor.submit(self.fetch_page, link_date): link_date
+                            for link_date in missing_dates_list}
+
+            # Parsed and stored as pages arrive, by this thread only
+            for future in as_completed(futures_dict):
+                link_date = futures_dict[future]
+                try:
+                    page_text = future.result()
+                    if not self.web_driver.page_has_registers(page_text):
+                        self.store_empty_date(link_date)
+                        counts_dict['empty'] += 1
+                        continue
+
+                    stocks_data_frame = self.dataframe_parser.prepare_dataframe_from_page(page_text)
+                    self.snapshot_store.store_snapshot(PREPARED_SNAPSHOT, link_date, stocks_data_frame)
+                    counts_dict['stored'] += 1
+                except (SystemExit, Exception) as e:
+                    print(f'Could not backfill {link_date:%Y%m%d}: {e!r}')
+                    counts_dict['failed'] += 1
+
+        return counts_dict
+
+    # end def
+
+    def fetch_page(
+            self,
+            link_date: date
+    ) -> str:
+        r"""
+        Get screener page of `link_date` through the pooled, rate limited client.
+
+        Return
+        -------
+        Page HTML as `str`
+        """
+        try:
+            response = self.http_client.get(self.web_driver.get_indicators_url(link_date),
+                                            headers=self.web_driver.header)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f'Error accessing {link_date:%Y%m%d} screener page\nError message: {e}')
+            raise SystemExit(1)
+
+        return response.text
+
+    # end def
+
+    @staticmethod
+    def load_empty_dates() -> Set[date]:
+        try:
+            with open(settings.BACKFILL_EMPTY_DATES_FILEPATH) as empty_dates_file:
+                return {datetime.strptime(line.strip(), '%Y%m%d').date() for line in empty_dates_file if line.strip()}
+        except (OSError, ValueError):
+            return set()
+
+    # end def
+
+    @staticmethod
+    def store_empty_date(link_date: date) -> None:
+        r"""
+        Remember a date without registers. Recent dates may still be published, only dates older than
+        INDICATORS_MAX_LOOKBACK_DAYS are stored.
+        """
+        if link_date >= date.today() - timedelta(days=settings.INDICATORS_MAX_LOOKBACK_DAYS):
+            return
+
+        with open(settings.BACKFILL_EMPTY_DATES_FILEPATH, 'a') as empty_dates_file:
+            empty_dates_file.write(link_date.strftime('%Y%m%d') + '\n')
+
+    # end def
+
+
+def main(argv: Optional[List] = None) -> None:
+    parser = argparse.ArgumentParser(description='Fetch and store the screener tables of a date range')
+    parser.add_argument('--start', required=True, type=lambda text: datetime.strptime(text, '%Y%m%d').date())
+    parser.add_argument('--end', type=lambda text: datetime.strptime(text, '%Y%m%d').date(),
+                        default=date.today() - timedelta(days=1))
+    parser.add_argument('--workers', type=int, default=settings.BACKFILL_MAX_WORKERS)
+    args = parser.parse_args(argv)
+
+    counts_dict = Backfill(max_workers=args.workers).run(args.start, args.end)
+    print(f'Backfill {args.start:%Y%m%d} - {args.end:%Y%m%d}: {counts_dict["stored"]} stored, '
+          f'{counts_dict["empty"]} without registers, {counts_dict["skipped"]} already done, '
+          f'{counts_dict["failed"]} failed')
+    if counts_dict['failed']:
+        raise SystemExit(1)
+# end def
+
+
+if __name__ == "__main__":
+    main()
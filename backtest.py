@@ -0,0 +1,144 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+import settings
+from local_stock_filter import LocalStockFilter
+from snapshot_store import PREPARED_SNAPSHOT, SnapshotStore
+
+
+def select_date_stocks(
+        snapshot_store_dirpath: str,
+        kind: str,
+        snapshot_date: date,
+        top_n: int
+) -> pd.DataFrame:
+    r"""
+    Load the `kind` snapshot of `snapshot_date` and rank it as `LocalStockFilter` does, without the bankruptcy check.
+    Runs in the pool workers: snapshots are memory mapped by each worker, only the selection is sent back.
+
+    Return
+    -------
+    Pandas `DataFrame` with the `top_n` selected stocks, `Date` and `Rank` columns first
+    """
+    stocks_data_frame = SnapshotStore(snapshot_store_dirpath).load_snapshot(kind, snapshot_date)
+    stocks_data_frame = LocalStockFilter.select_cheapest_stocks(stocks_data_frame, top_n=top_n)
+
+    stocks_data_frame.insert(0, 'Rank', range(1, len(stocks_data_frame) + 1))
+    stocks_data_frame.insert(0, 'Date', pd.Timestamp(snapshot_date))
+
+    return stocks_data_frame
+
+
+def select_dates_stocks(arguments: Tuple) -> List:
+    snapshot_store_dirpath, kind, dates_list, top_n = arguments
+    return [select_date_stocks(snapshot_store_dirpath, kind, snapshot_date, top_n) for snapshot_date in dates_list]
+
+
+class Backtest:
+    def __init__(
+            self,
+            snapshot_store: Optional[SnapshotStore] = None,
+            kind: str = PREPARED_SNAPSHOT,
+            top_n: int = settings.BACKTEST_TOP_N,
+            max_workers: int = settings.BACKTEST_MAX_WORKERS
+    ) -> None:
+        self.snapshot_store = snapshot_store or SnapshotStore(settings.SNAPSHOTS_DIRPATH)
+        self.kind = kind
+        self.top_n = top_n
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    # end def
+
+    def run(
+            self,
+            start_date: Optional[date] = None,
+            end_date: Optional[date] = None
+    ) -> pd.DataFrame:
+        r"""
+        Replay the stocks selection on every stored snapshot date from `start_date` to `end_date` (inclusive).
+        Dates are independent, they are spread in chunks across a process pool; with a single worker, or a single
+        chunk, they run in the current process.
+
+        Return
+        -------
+        Pandas `DataFrame` with the selection of every date, sorted by `Date` and `Rank`
+        """
+        dates_list = [snapshot_date for snapshot_date in self.snapshot_store.list_dates(self.kind)
+                      if (start_date is None or snapshot_date >= start_date)
+                      and (end_date is None or snapshot_date <= end_date)]
+        if not dates_list:
+            print(f'No {self.kind} snapshot found on {self.snapshot_store.dirpath} for the backtest period.')
+            raise SystemExit(1)
+
+        # A few chunks per worker, pool start up and results transfer are paid per chunk instead of per date
+        chunk_size = max(1, -(-len(dates_list) // (self.max_workers * 4)))
+        chunks_list = [(self.snapshot_store.dirpath, self.kind, dates_list[first:first + chunk_size], self.top_n)
+                       for first in range(0, len(dates_list), chunk_size)]
+
+        if self.max_workers == 1 or len(chunks_list) == 1:
+            selections_list = [select_dates_stocks(chunk) for chunk in chunks_list]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(chunks_list))) as executor:
+                selections_list = list(executor.map(select_dates_stocks, chunks_list))
+
+        return pd.concat([selection for chunk_selections in selections_list for selection in chunk_selections],
+                         ignore_index=True)
+
+    # end def
+
+    @staticmethod
+    def get_turnover(
+            selection_data_frame: pd.DataFrame
+    ) -> pd.DataFrame:
+        r"""
+        Count, for each date, the stocks that entered and left the selection since the previous date.
+
+        Return
+        -------
+        Pandas `DataFrame` indexed by `Date` with `Selected`, `Entered`, `Left` and `Turnover_(%)` columns
+        """
+        turnover_list = []
+        previous_stocks_set = None
+        for selection_date, stocks_series in selection_data_frame.groupby('Date', sort=True)['Stock']:
+            stocks_set = set(stocks_series)
+            if previous_stocks_set is None:
+                entered = left = 0
+            else:
+                entered = len(stocks_set - previous_stocks_set)
+                left = len(previous_stocks_set - stocks_set)
+            turnover_list.append({'Date': selection_date, 'Selected': len(stocks_set), 'Entered': entered,
+                                  'Left': left,
+                                  'Turnover_(%)': 100 * entered / len(stocks_set) if stocks_set else 0.0})
+            previous_stocks_set = stocks_set
+
+        return pd.DataFrame(turnover_list).set_index('Date')
+
+    # end def
+
+
+def main(argv: Optional[List] = None) -> None:
+    parser = argparse.ArgumentParser(description='Replay the stocks selection over the stored snapshots')
+    parser.add_argument('--start', type=lambda text: datetime.strptime(text, '%Y%m%d').date())
+    parser.add_argument('--end', type=lambda text: datetime.strptime(text, '%Y%m%d').date())
+    parser.add_argument('--workers', type=int, default=settings.BACKTEST_MAX_WORKERS)
+    parser.add_argument('--top', type=int, default=settings.BACKTEST_TOP_N)
+    args = parser.parse_args(argv)
+
+    backtest = Backtest(top_n=args.top, max_workers=args.workers)
+    selection_data_frame = backtest.run(args.start, args.end)
+    selection_data_frame.to_csv(settings.BACKTEST_FILEPATH, index=False)
+
+    turnover_data_frame = backtest.get_turnover(selection_data_frame)
+    print(turnover_data_frame.to_string())
+    print(f'Average turnover: {turnover_data_frame["Turnover_(%)"].iloc[1:].mean():.1f}%, '
+          f'selection stored on {settings.BACKTEST_FILEPATH}')
+# end def
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+from typing import Dict, List, Optional
+
+import requests
+from lxml import html
+
+import settings
+from company_index import CompanyIndex
+from http_client import HttpClient
+from work_queue import WorkQueue
+
+
+class BankruptcyChecker:
+    def __init__(
+            self,
+            indicators_partial_url: Optional[str] = None,
+            max_concurrency: int = settings.BANKRUPTCY_CHECKER_MAX_CONCURRENCY
+    ) -> None:
+        if max_concurrency <= 0:
+            print('Invalid number of concurrent requests.')
+            raise SystemExit(1)
+
+        # Host read on use, so overriding INVESTSITE_BASE_URL at runtime points detail pages at it as well
+        self.indicators_partial_url: str = (indicators_partial_url
+                                            or settings.INVESTSITE_BASE_URL + settings.INDICATORS_PARTIAL_PATH)
+        self.max_concurrency: int = max_concurrency
+        self.stock_bankruptcy_status: str = 'FASE OPERACIONAL'
+        self.bankruptcy_text_xpath: str = '//*[@id="tabela_resumo_empresa"]/tbody/tr[4]/td[2]'
+
+        # One keep-alive connection per concurrent request, shared by all the detail pages
+        self.http_client = HttpClient(pool_maxsize=self.max_concurrency)
+
+    # end def
+
+    def check_bankruptcy(
+            self,
+            companies_stock_link_list: List
+    ) -> List:
+        r"""
+        Gets `List` of stock indicators links and do concurrent HTTP analysis using bankruptcy indicators
+        for each stock, same result as `WebStockFilter.check_bankruptcy` without starting a browser.
+
+        Return
+        -------
+        `List` of stocks in bankruptcy
+        """
+        if not companies_stock_link_list:
+            print('Cannot fetch links, list is empty or corrupted.')
+            raise SystemExit(1)
+
+        companies_stock_name_list = [company_stock_link.split('cod_negociacao=')[-1]
+                                     for company_stock_link in companies_stock_link_list]
+        companies_status_dict = self.check_statuses(companies_stock_name_list)
+
+        return [stock for stock in companies_stock_name_list if not companies_status_dict[stock]]
+
+    # end def
+
+    def check_statuses(
+            self,
+            companies_stock_name_list: List
+    ) -> Dict[str, bool]:
+        r"""
+        Gets `List` of stock names and fetch their indicators pages from a shared work queue. Only the first ticker
+        of each company is fetched, once, retried by the HTTP client up to HTTP_RETRIES times, and its status is applied
+        to the other tickers of the company.
+
+        Return
+        -------
+        `Dict` of stock name to `True` when the company is operational, `False` when in bankruptcy
+        """
+        if not companies_stock_name_list:
+            return {}
+
+        # HttpClient already retries with backoff, the queue does not retry on top of it
+        work_queue = WorkQueue(self.fetch_status, max_workers=self.max_concurrency, retries=0,
+                               timeout_seconds=settings.DETAIL_CHECK_TIMEOUT_SECONDS)
+        company_index = CompanyIndex(companies_stock_name_list)
+        result_collector = work_queue.run(company_index.get_representative_stocks())
+        if result_collector.errors_dict:
+            print(f'Could not check {list(result_collector.errors_dict)} indicators pages\n'
+                  f'Error messages: {list(result_collector.errors_dict.values())}')
+            raise SystemExit(1)
+
+        return company_index.get_company_statuses(result_collector.results_dict)
+
+    # end def
+
+    def fetch_status(
+            self,
+            stock: str,
+            timeout_seconds: float = settings.HTTP_TIMEOUT_SECONDS
+    ) -> bool:
+        return self.is_operational(self.fetch_page(stock, timeout_seconds))
+
+    # end def
+
+    def fetch_page(
+            self,
+            stock: str,
+            timeout_seconds: float = settings.HTTP_TIMEOUT_SECONDS
+    ) -> str:
+        r"""
+        Get indicators page of `stock` through the pooled, rate limited client.
+
+        Return
+        -------
+        Page HTML as `str`
+        """
+        try:
+            response = self.http_client.get(self.indicators_partial_url + stock, timeout_seconds=timeout_seconds)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f'Error accessing {stock} indicators page\nError message: {e}')
+            raise SystemExit(1)
+
+        return response.text
+
+    # end def
+
+    def is_operational(
+            self,
+            page_text: str
+    ) -> bool:
+        r"""
+        Evaluate bankruptcy XPATH on indicators page and check if company is in operational phase.
+
+        Return
+        -------
+        `True` if company is operational, `False` otherwise
+        """
+        page_tree = html.fromstring(page_text)
+        bankruptcy_situation = page_tree.xpath(self.bankruptcy_text_xpath)
+
+        # Browsers add the missing <tbody> to tables, lxml keeps the markup as served
+        if not bankruptcy_situation:
+            bankruptcy_situation = page_tree.xpath(self.bankruptcy_text_xpath.replace('/tbody', ''))
+
+        if not bankruptcy_situation:
+            print('Could not find XPATH, webpage is empty.')
+            raise SystemExit(1)
+
+        return self.stock_bankruptcy_status in bankruptcy_situation[0].text_content()
+
+    # end def
@@ -0,0 +1,104 @@
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Dict, List, Tuple
+
+import settings
+
+
+class BankruptcyStatusCache:
+    def __init__(
+            self,
+            filepath: str = settings.BANKRUPTCY_STATUS_CACHE_FILEPATH,
+            ttl_seconds: int = settings.BANKRUPTCY_STATUS_CACHE_TTL_SECONDS
+    ) -> None:
+        if ttl_seconds < 0:
+            print('Cannot use negative cache TTL.')
+            raise SystemExit(1)
+
+        self.filepath: str = filepath
+        self.ttl_seconds: int = ttl_seconds
+        self.hits: int = 0
+        self.misses: int = 0
+
+        if os.path.dirname(self.filepath):
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS company_status ('
+                'stock TEXT PRIMARY KEY, is_operational INTEGER NOT NULL, fetched_at REAL NOT NULL)'
+            )
+
+    # end def
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.filepath)
+
+    # end def
+
+    def get_statuses(
+            self,
+            companies_stock_name_list: List
+    ) -> Dict[str, bool]:
+        r"""
+        Gets `List` of stock names and look up their cached status, counting hits and misses.
+        Entries older than the TTL are treated as missing.
+
+        Return
+        -------
+        `Dict` of stock name to `True` when the company is operational, only for fresh entries
+        """
+        return {stock: is_operational
+                for stock, (is_operational, _) in self.get_checked_statuses(companies_stock_name_list).items()}
+
+    # end def
+
+    def get_checked_statuses(
+            self,
+            companies_stock_name_list: List
+    ) -> Dict[str, Tuple[bool, float]]:
+        r"""
+        Same lookup as `get_statuses`, keeping the time each status was fetched.
+
+        Return
+        -------
+        `Dict` of stock name to (`True` when the company is operational, fetched at timestamp), only for fresh
+        entries
+        """
+        companies_stock_name_list = list(dict.fromkeys(companies_stock_name_list))
+        if not companies_stock_name_list:
+            return {}
+
+        placeholders = ','.join('?' * len(companies_stock_name_list))
+        with closing(self._connect()) as connection, connection:
+            rows = connection.execute(
+                f'SELECT stock, is_operational, fetched_at FROM company_status '
+                f'WHERE fetched_at >= ? AND stock IN ({placeholders})',
+                [time.time() - self.ttl_seconds, *companies_stock_name_list]
+            ).fetchall()
+
+        checked_status_dict = {stock: (bool(is_operational), fetched_at) for stock, is_operational, fetched_at in rows}
+        self.hits += len(checked_status_dict)
+        self.misses += len(companies_stock_name_list) - len(checked_status_dict)
+
+        return checked_status_dict
+
+    # end def
+
+    def store_statuses(
+            self,
+            companies_status_dict: Dict[str, bool]
+    ) -> None:
+        r"""
+        Stores `Dict` of stock name to operational status, stamped with the current time.
+        """
+        fetched_at = time.time()
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO company_status (stock, is_operational, fetched_at) VALUES (?, ?, ?)',
+                [(stock, int(is_operational), fetched_at) for stock, is_operational in companies_status_dict.items()]
+            )
+
+    # end def
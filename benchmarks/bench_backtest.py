@@ -0,0 +1,33 @@
+# Replay the stocks selection over two years of synthetic daily prepared snapshots.
+# python -m benchmarks.bench_backtest
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from backtest import Backtest
+from benchmarks.synthetic_universe import make_synthetic_universe
+from snapshot_store import PREPARED_SNAPSHOT, SnapshotStore
+
+DAYS = 500
+ROWS = 500
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot_store = SnapshotStore(tmp_dir)
+        start = time.perf_counter()
+        for day in range(DAYS):
+            snapshot_store.store_snapshot(PREPARED_SNAPSHOT, date(2022, 1, 3) + timedelta(days=day),
+                                          make_synthetic_universe(ROWS, seed=day))
+        print(f'{DAYS} snapshots of {ROWS} rows stored in {time.perf_counter() - start:.2f} s')
+
+        for max_workers in sorted({1, os.cpu_count() or 1}):
+            start = time.perf_counter()
+            selection_data_frame = Backtest(snapshot_store, max_workers=max_workers).run()
+            print(f'{max_workers:>3} worker(s): {len(selection_data_frame)} selected rows in '
+                  f'{time.perf_counter() - start:.2f} s')
+
+
+if __name__ == "__main__":
+    main()
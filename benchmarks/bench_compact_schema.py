@@ -0,0 +1,69 @@
+# Memory of a prepared history in the default and the compact schema, and the cost of converting between them.
+# python -m benchmarks.bench_compact_schema [--days 2000] [--rows 500]
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_universe import make_synthetic_universe
+from compact_schema import TickerCodes, from_compact, to_compact
+
+DAYS = 2000
+ROWS = 500
+
+
+def make_history(
+        days: int,
+        rows: int
+) -> pd.DataFrame:
+    r"""
+    Build `days` synthetic prepared tables of `rows` stocks drawn from the same universe, with a `Date` column.
+
+    Return
+    -------
+    Pandas `DataFrame` of `days` * `rows` rows
+    """
+    history_data_frame = pd.concat([make_synthetic_universe(rows, seed=day) for day in range(days)],
+                                   ignore_index=True)
+    history_data_frame.insert(0, 'Date', np.repeat(pd.date_range('2015-01-01', periods=days).to_numpy(), rows))
+    return history_data_frame
+
+
+def main(argv: Optional[List] = None) -> None:
+    parser = argparse.ArgumentParser(description='Compact schema memory benchmark')
+    parser.add_argument('--days', type=int, default=DAYS)
+    parser.add_argument('--rows', type=int, default=ROWS)
+    args = parser.parse_args(argv)
+
+    history_data_frame = make_history(args.days, args.rows)
+    million_rows = len(history_data_frame) / 1_000_000
+
+    start = time.perf_counter()
+    compact_data_frame = to_compact(history_data_frame, TickerCodes())
+    to_compact_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    restored_data_frame = from_compact(compact_data_frame)
+    from_compact_seconds = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(history_data_frame, restored_data_frame)
+
+    default_mib = history_data_frame.memory_usage(deep=True).sum() / 2 ** 20
+    compact_mib = compact_data_frame.memory_usage(deep=True).sum() / 2 ** 20
+    print(f'{len(history_data_frame)} rows, {compact_data_frame["Stock"].cat.categories.size} tickers')
+    for column in history_data_frame.columns:
+        print(f'{column:<22} {str(history_data_frame[column].dtype):>14} -> {str(compact_data_frame[column].dtype):<10}'
+              f'{history_data_frame[column].memory_usage(deep=True, index=False) / 2 ** 20 / million_rows:8.1f} -> '
+              f'{compact_data_frame[column].memory_usage(deep=True, index=False) / 2 ** 20 / million_rows:6.1f} '
+              f'MiB per million rows')
+    print(f'{"total":<22} {default_mib / million_rows:35.1f} -> {compact_mib / million_rows:6.1f} MiB per million rows, '
+          f'{default_mib / compact_mib:.1f}x smaller')
+    print(f'to_compact {to_compact_seconds * 1000 / million_rows:.0f} ms, '
+          f'from_compact {from_compact_seconds * 1000 / million_rows:.0f} ms per million rows')
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,78 @@
+# Compare the previous nested loop company de-duplication against the vectorized one on synthetic universes.
+# python -m benchmarks.bench_drop_duplicated_stocks
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_universe import make_synthetic_universe
+from local_stock_filter import LocalStockFilter
+
+LEGACY_SIZES_LIST = [1_000, 4_000]
+VECTORIZED_SIZES_LIST = [1_000, 4_000, 100_000]
+
+
+def legacy_drop_duplicated_stocks_by_financial_volume(stocks_data_frame: pd.DataFrame) -> pd.DataFrame:
+    # Previous implementation, without the 41 rows cap, kept as reference
+    stocks_data_frame.reset_index(drop=True, inplace=True)
+
+    companies_stock_name_largest_fv_dict = dict(zip(stocks_data_frame['Stock'],
+                                                    stocks_data_frame['Financial_Volume_(%)']))
+    companies_similar_stock_counter_dict = dict(Counter(k[:4] for k in companies_stock_name_largest_fv_dict))
+
+    for key, value in companies_similar_stock_counter_dict.copy().items():
+        if value == 1:
+            companies_similar_stock_counter_dict.pop(key)
+
+    largest_fv_dict = {key: 0 for key in companies_similar_stock_counter_dict}
+    to_remove_keys_set = set()
+    companies_stock_name_largest_fv_dict = dict(sorted(companies_stock_name_largest_fv_dict.items(),
+                                                       key=lambda x: x[1], reverse=False))
+
+    for key_i, value_i in companies_similar_stock_counter_dict.items():
+        counter = value_i
+        for key_j, value_j in companies_stock_name_largest_fv_dict.items():
+            if counter == 0:
+                del largest_fv_dict[key_i]
+                break
+            if key_i == key_j[:4]:
+                counter -= 1
+                if value_j > largest_fv_dict[key_i]:
+                    largest_fv_dict[key_i] = value_j
+                    largest_fv_dict[key_j] = largest_fv_dict[key_i]
+                    if counter > 0:
+                        to_remove_keys_set.add(key_j)
+
+    stocks_data_frame.drop(pd.Index(np.where(stocks_data_frame['Stock'].isin(list(to_remove_keys_set)))[0]),
+                           inplace=True)
+    stocks_data_frame.reset_index(drop=True, inplace=True)
+
+    return stocks_data_frame
+
+
+def time_function(function, stocks_data_frame: pd.DataFrame):
+    start = time.perf_counter()
+    result_data_frame = function(stocks_data_frame.copy())
+    return (time.perf_counter() - start) * 1000, result_data_frame
+
+
+def main() -> None:
+    for rows in VECTORIZED_SIZES_LIST:
+        stocks_data_frame = LocalStockFilter.sort_by_ev_ebit(make_synthetic_universe(rows))
+
+        vectorized_ms, vectorized_data_frame = time_function(
+            LocalStockFilter.drop_duplicated_stocks_by_financial_volume, stocks_data_frame)
+        line = f'{rows:>8} rows  vectorized {vectorized_ms:10.2f} ms'
+
+        if rows in LEGACY_SIZES_LIST:
+            legacy_ms, legacy_data_frame = time_function(legacy_drop_duplicated_stocks_by_financial_volume,
+                                                         stocks_data_frame)
+            pd.testing.assert_frame_equal(legacy_data_frame, vectorized_data_frame)
+            line += f'  legacy {legacy_ms:10.2f} ms  speedup {legacy_ms / vectorized_ms:8.1f}x'
+
+        print(line + f'  ({len(vectorized_data_frame)} companies kept)')
+
+
+if __name__ == "__main__":
+    main()
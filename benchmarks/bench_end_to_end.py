@@ -0,0 +1,101 @@
+# Whole pipeline, screener page to selected stocks, against a local replay of investsite: no network access needed.
+# Replays the archive of python investsite_replay.py record, or the UT fixtures with a few stocks in bankruptcy.
+# python -m benchmarks.bench_end_to_end [--archive investsite_archive.json.gz] [--latency-ms 0 20] [--repeat 3]
+#                                       [--error-rate 0.0] [--rate-limit 8.0]
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from unittest.mock import patch
+
+import pandas as pd
+
+import settings
+from dataframe_parser import DataframeParser
+from http_client import investsite_circuit_breaker, investsite_rate_limiter
+from investsite_replay import HttpArchive, ReplayServer
+from local_stock_filter import LocalStockFilter
+from tests.investsite_stub import build_fixture_archive, render_screener_page
+from web_driver import WebDriver
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+TESTS_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), 'tests')
+FIXTURE_DATE = '20230907'
+LATENCIES_MS_LIST = [0, 20]
+REPEAT = 3
+
+
+def load_fixture_archive() -> HttpArchive:
+    r"""
+    Archive of the UT fixtures, one candidate in six being in bankruptcy.
+
+    Return
+    -------
+    `HttpArchive`
+    """
+    stocks_list = pd.read_pickle(os.path.join(TESTS_DIR, settings.PICKLE_UT_FULL_LIST_FILEPATH))
+    stocks_prepared_dataframe = DataframeParser(None).prepare_dataframe_from_page(render_screener_page(stocks_list))
+    candidates_list = LocalStockFilter.select_cheapest_stocks(stocks_prepared_dataframe)['Stock'].tolist()
+    return build_fixture_archive(stocks_list, FIXTURE_DATE, candidates_list[1::6])
+
+
+def run_pipeline(
+        replay_server: ReplayServer,
+        screener_date: str
+) -> Dict:
+    r"""
+    Run the pipeline once, cold: no HTTP cache, no status cache, no incremental run and no last good date.
+
+    Return
+    -------
+    `Dict` with the run seconds, requests answered by `replay_server` and selected stocks
+    """
+    investsite_circuit_breaker.reset()
+    requests_count = replay_server.requests_count
+
+    with tempfile.TemporaryDirectory() as temp_dir, \
+            patch.multiple(settings, INVESTSITE_BASE_URL=replay_server.base_url,
+                           INDICATORS_LAST_DATE_FILEPATH=os.path.join(temp_dir, 'last_date'),
+                           BANKRUPTCY_STATUS_CACHE_FILEPATH=os.path.join(temp_dir, 'cache.db'),
+                           HTTP_CACHE_BACKEND='none', INCREMENTAL_RUN=False, UNIT_TEST=False), \
+            patch.object(WebDriver, 'current_date', datetime.strptime(screener_date, '%Y%m%d').date()
+                         + timedelta(days=1)):
+        start = time.perf_counter()
+        stocks_data_frame = LocalStockFilter().apply_financial_filters(DataframeParser(WebDriver()))
+        seconds = time.perf_counter() - start
+
+    return {'seconds': seconds, 'requests': replay_server.requests_count - requests_count,
+            'stocks': stocks_data_frame['Stock'].tolist()}
+
+
+def main(argv: Optional[List] = None) -> None:
+    parser = argparse.ArgumentParser(description='End to end pipeline benchmark against a local investsite replay')
+    parser.add_argument('--archive', help='Recorded archive, the UT fixtures when not given')
+    parser.add_argument('--latency-ms', type=float, nargs='+', default=LATENCIES_MS_LIST)
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=settings.HTTP_RATE_LIMIT_PER_SECOND,
+                        help='Requests per second of the shared token bucket')
+    args = parser.parse_args(argv)
+
+    http_archive = HttpArchive.load(args.archive) if args.archive else load_fixture_archive()
+    print(f'{len(http_archive.pages_dict)} archived pages of {http_archive.recorded_on}, '
+          f'rate limit {args.rate_limit:g} requests/s, error rate {args.error_rate:g}')
+
+    with patch.multiple(investsite_rate_limiter, rate_per_second=args.rate_limit, burst=args.rate_limit):
+        for latency_ms in args.latency_ms:
+            with ReplayServer(http_archive, latency_seconds=latency_ms / 1000, error_rate=args.error_rate,
+                              seed=0) as replay_server:
+                runs_list = [run_pipeline(replay_server, http_archive.recorded_on) for _ in range(args.repeat)]
+
+            print(f'latency {latency_ms:5g} ms: median {statistics.median(run["seconds"] for run in runs_list):7.3f} s, '
+                  f'{runs_list[0]["requests"]} requests, {replay_server.errors_count} injected errors, '
+                  f'{len(runs_list[0]["stocks"])} stocks selected')
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
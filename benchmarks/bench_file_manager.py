@@ -0,0 +1,35 @@
+# Compare wall time and peak memory of the pandas ExcelWriter and the constant memory streaming XLSX writer.
+# python -m benchmarks.bench_file_manager
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic_universe import make_synthetic_universe
+from file_manager_sheet import FileManagerStreamingXLSX, FileManagerXLSX
+
+SIZES_LIST = [1_000, 50_000]
+
+
+def main() -> None:
+    previous_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            for rows in SIZES_LIST:
+                stocks_data_frame = make_synthetic_universe(rows)
+                for file_manager in (FileManagerXLSX(), FileManagerStreamingXLSX()):
+                    tracemalloc.start()
+                    start = time.perf_counter()
+                    file_manager.store_on_disk(stocks_data_frame)
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    peak_memory = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    print(f'{rows:>8} rows {type(file_manager).__name__:<26} {elapsed_ms:10.2f} ms '
+                          f'peak {peak_memory / 2 ** 20:8.1f} MiB')
+        finally:
+            os.chdir(previous_cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# Import time of main.py in offline mode (USE_PICKLE_DATAFRAME), measured with python -X importtime in a fresh
+# interpreter. Fails when startup gets slower than the baseline or when an online only module is imported.
+# python -m benchmarks.bench_import_time [--repeat 5] [--update-baseline] [--check]
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARKS_DIR)
+RESULTS_FILEPATH = os.path.join(BENCHMARKS_DIR, 'results', 'bench_import_time.json')
+BASELINE_FILEPATH = os.path.join(BENCHMARKS_DIR, 'baseline', 'bench_import_time.json')
+REPEAT = 5
+TOLERANCE = 0.25
+NOISE_FLOOR_MS = 20.0
+# Loaded only by the stages fetching pages, starting browsers, drawing progress bars or writing spreadsheets
+ONLINE_MODULES_LIST = ['selenium', 'requests', 'cachecontrol', 'urllib3', 'xlsxwriter', 'rich.progress',
+                       'http_client', 'web_driver', 'bankruptcy_checker', 'web_stock_filter', 'file_manager_formats']
+IMPORT_TIME_REGEX = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)$')
+
+
+def measure_import(module: str = 'main') -> Tuple[float, List]:
+    r"""
+    Import `module` in a fresh interpreter with -X importtime.
+
+    Return
+    -------
+    `Tuple` of cumulative import time in ms and `List` of every imported module
+    """
+    completed_process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                       cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+
+    import_ms = None
+    modules_list = []
+    for line in completed_process.stderr.splitlines():
+        match = IMPORT_TIME_REGEX.match(line)
+        if match is None:
+            continue
+        modules_list.append(match.group(3))
+        if match.group(3) == module and not match.group(2):
+            import_ms = int(match.group(1)) / 1000
+
+    return import_ms, modules_list
+
+
+def run_benchmarks(repeat: int = REPEAT) -> Dict:
+    timings_list = []
+    modules_list = []
+    for _ in range(repeat):
+        import_ms, modules_list = measure_import()
+        timings_list.append(import_ms)
+
+    online_modules_list = [online_module for online_module in ONLINE_MODULES_LIST
+                           if any(module == online_module or module.startswith(online_module + '.')
+                                  for module in modules_list)]
+    print(f'import main: min {min(timings_list):.1f} ms, max {max(timings_list):.1f} ms, '
+          f'{len(modules_list)} modules, online modules {online_modules_list}')
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'min_ms': round(min(timings_list), 1),
+        'max_ms': round(max(timings_list), 1),
+        'modules': len(modules_list),
+        'online_modules': online_modules_list,
+    }
+
+
+def store_results(
+        results_dict: Dict,
+        filepath: str
+) -> None:
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, 'w') as results_file:
+        json.dump(results_dict, results_file, indent=2)
+
+
+def main(argv: Optional[List] = None) -> None:
+    parser = argparse.ArgumentParser(description='Offline startup import time benchmark')
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--output', default=RESULTS_FILEPATH)
+    parser.add_argument('--baseline', default=BASELINE_FILEPATH)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--update-baseline', action='store_true', help='Store results as the new baseline')
+    parser.add_argument('--check', action='store_true', help='Exit with status 1 on regressions')
+    args = parser.parse_args(argv)
+
+    results_dict = run_benchmarks(args.repeat)
+    store_results(results_dict, args.output)
+    print(f'Results stored on {args.output}')
+
+    if args.update_baseline:
+        store_results(results_dict, args.baseline)
+        print(f'Baseline stored on {args.baseline}')
+        return
+
+    regressions_list = []
+    if results_dict['online_modules']:
+        regressions_list.append(f"online modules imported at startup: {results_dict['online_modules']}")
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline_ms = json.load(baseline_file)['min_ms']
+        current_ms = results_dict['min_ms']
+        print(f'import main {baseline_ms:10.1f} -> {current_ms:10.1f} ms {current_ms / baseline_ms:6.2f}x')
+        if current_ms > baseline_ms * (1 + args.tolerance) and current_ms - baseline_ms > NOISE_FLOOR_MS:
+            regressions_list.append(f'import time {current_ms:.1f} ms over the {baseline_ms:.1f} ms baseline')
+    else:
+        print(f'No baseline on {args.baseline}, run with --update-baseline to create it.')
+
+    for regression in regressions_list:
+        print(f'REGRESSION: {regression}')
+    print(f'{len(regressions_list)} regression(s) above {args.tolerance:.0%} tolerance')
+    if regressions_list and args.check:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,51 @@
+# Compare remove_invalid_chars + convert_data_type against decode_numeric_columns on the UT fixtures.
+# python -m benchmarks.bench_number_decoder
+import os
+import statistics
+import timeit
+
+import pandas as pd
+
+import settings
+from dataframe_parser import DataframeParser
+from snapshot_store import SnapshotStore
+
+TESTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests')
+REPEAT = 10
+
+
+def chained_passes_path(stocks_data_frame: pd.DataFrame) -> pd.DataFrame:
+    stocks_data_frame = DataframeParser.remove_invalid_chars(stocks_data_frame)
+    stocks_data_frame = DataframeParser.convert_data_type(stocks_data_frame)
+    return DataframeParser.replace_nans_by_zero(stocks_data_frame)
+
+
+def single_pass_path(stocks_data_frame: pd.DataFrame) -> pd.DataFrame:
+    stocks_data_frame = DataframeParser.decode_numeric_columns(stocks_data_frame)
+    return DataframeParser.replace_nans_by_zero(stocks_data_frame)
+
+
+def main() -> None:
+    dataframe_parser = DataframeParser(None)
+    snapshot_store = SnapshotStore(os.path.join(TESTS_DIR, settings.SNAPSHOTS_UT_DIRPATH))
+    stocks_full_dataframe = snapshot_store.load_snapshot('full')
+    stocks_data_frame = dataframe_parser.drop_and_rename_cols(stocks_full_dataframe)
+    stocks_data_frame = dataframe_parser.drop_and_fill_nans(stocks_data_frame)
+
+    for scale in (1, 100):
+        scaled_data_frame = pd.concat([stocks_data_frame] * scale, ignore_index=True)
+        pd.testing.assert_frame_equal(chained_passes_path(scaled_data_frame.copy()),
+                                      single_pass_path(scaled_data_frame.copy()))
+
+        results_dict = {}
+        for name, function in (('chained_passes', chained_passes_path), ('single_pass', single_pass_path)):
+            timings_list = timeit.repeat(lambda: function(scaled_data_frame.copy()), number=1, repeat=REPEAT)
+            results_dict[name] = statistics.median(timings_list) * 1000
+            print(f'{len(scaled_data_frame):>7} rows {name:<16} median {results_dict[name]:8.2f} ms')
+
+        print(f'{len(scaled_data_frame):>7} rows speedup: '
+              f'{results_dict["chained_passes"] / results_dict["single_pass"]:.1f}x')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# Time every DataframeParser and LocalStockFilter stage, with peak memory, on the UT fixtures scaled 1x/10x/100x.
+# Offline only: drop_stocks_in_bankruptcy is network bound and is not part of the suite.
+# python -m benchmarks.bench_pipeline [--scales 1 10 100] [--repeat 5] [--update-baseline] [--check]
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import settings
+from benchmarks.synthetic_universe import scale_stocks_table
+from dataframe_parser import DataframeParser
+from local_stock_filter import LocalStockFilter
+from screener_table_parser import ScreenerTableParser
+from tests.investsite_stub import render_screener_page
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+TESTS_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), 'tests')
+RESULTS_FILEPATH = os.path.join(BENCHMARKS_DIR, 'results', 'bench_pipeline.json')
+BASELINE_FILEPATH = os.path.join(BENCHMARKS_DIR, 'baseline', 'bench_pipeline.json')
+SCALES_LIST = [1, 10, 100]
+REPEAT = 5
+# Slower than baseline by more than this ratio and by more than the noise floor is reported as a regression
+TOLERANCE = 0.25
+NOISE_FLOOR_MS = 1.0
+
+
+def copy_input(value):
+    # Stages drop and rename in place, every run gets its own input
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, list):
+        return [copy_input(item) for item in value]
+    return value
+
+
+def build_stages(stocks_list: List) -> List:
+    r"""
+    Chain the pipeline once, each stage input being the previous stage output.
+
+    Return
+    -------
+    `List` of (stage name, function, input) tuples
+    """
+    dataframe_parser = DataframeParser(None)
+    stages_list = []
+
+    def add_stage(name: str, function: Callable, stage_input):
+        stages_list.append((name, function, stage_input))
+        return function(copy_input(stage_input))
+
+    add_stage('ScreenerTableParser.parse', ScreenerTableParser().parse, render_screener_page(stocks_list))
+
+    stocks_data_frame = add_stage('DataframeParser.extract_dataframe', dataframe_parser.extract_dataframe,
+                                  stocks_list)
+    stocks_data_frame = add_stage('DataframeParser.drop_and_rename_cols', dataframe_parser.drop_and_rename_cols,
+                                  stocks_data_frame)
+    stocks_data_frame = add_stage('DataframeParser.drop_and_fill_nans', dataframe_parser.drop_and_fill_nans,
+                                  stocks_data_frame)
+    legacy_data_frame = add_stage('DataframeParser.remove_invalid_chars', dataframe_parser.remove_invalid_chars,
+                                  stocks_data_frame)
+    add_stage('DataframeParser.convert_data_type', dataframe_parser.convert_data_type, legacy_data_frame)
+    stocks_data_frame = add_stage('DataframeParser.decode_numeric_columns', dataframe_parser.decode_numeric_columns,
+                                  stocks_data_frame)
+    prepared_data_frame = add_stage('DataframeParser.replace_nans_by_zero', dataframe_parser.replace_nans_by_zero,
+                                    stocks_data_frame)
+
+    add_stage('LocalStockFilter.select_cheapest_stocks', LocalStockFilter.select_cheapest_stocks,
+              prepared_data_frame)
+    stocks_data_frame = add_stage('LocalStockFilter.drop_low_financial_volume',
+                                  LocalStockFilter.drop_low_financial_volume, prepared_data_frame)
+    stocks_data_frame = add_stage('LocalStockFilter.drop_negative_profit_stocks',
+                                  LocalStockFilter.drop_negative_profit_stocks, stocks_data_frame)
+    stocks_data_frame = add_stage('LocalStockFilter.sort_by_ev_ebit', LocalStockFilter.sort_by_ev_ebit,
+                                  stocks_data_frame)
+    add_stage('LocalStockFilter.drop_duplicated_stocks_by_financial_volume',
+              LocalStockFilter.drop_duplicated_stocks_by_financial_volume, stocks_data_frame)
+
+    return stages_list
+
+
+def measure_stage(
+        function: Callable,
+        stage_input,
+        repeat: int
+) -> Dict:
+    r"""
+    Time `repeat` runs of `function` after an untimed warm up run, then measure its peak memory in a separate traced
+    run.
+
+    Return
+    -------
+    `Dict` with median and min wall time in ms and peak memory in KiB
+    """
+    function(copy_input(stage_input))
+
+    timings_list = []
+    for _ in range(repeat):
+        run_input = copy_input(stage_input)
+        # Same as timeit, garbage collection pauses are left out of the timed runs
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            function(run_input)
+            timings_list.append((time.perf_counter() - start) * 1000)
+        finally:
+            gc.enable()
+
+    run_input = copy_input(stage_input)
+    tracemalloc.start()
+    try:
+        function(run_input)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {'median_ms': round(statistics.median(timings_list), 3), 'min_ms': round(min(timings_list), 3),
+            'peak_memory_kib': round(peak_memory / 1024, 1)}
+
+
+def run_benchmarks(
+        scales_list: List,
+        repeat: int
+) -> Dict:
+    stocks_list = pd.read_pickle(os.path.join(TESTS_DIR, settings.PICKLE_UT_FULL_LIST_FILEPATH))
+    results_list = []
+
+    for scale in scales_list:
+        scaled_stocks_list = [stocks_list[0], scale_stocks_table(stocks_list[1], scale)]
+        for name, function, stage_input in build_stages(scaled_stocks_list):
+            result_dict = {'stage': name, 'scale': scale, 'rows': len(scaled_stocks_list[1])}
+            result_dict.update(measure_stage(function, stage_input, repeat))
+            results_list.append(result_dict)
+            print(f"{name:<62} {scale:>4}x {result_dict['median_ms']:10.2f} ms "
+                  f"{result_dict['peak_memory_kib']:12.1f} KiB")
+
+    return {'created_at': datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+            'pandas': pd.__version__, 'numpy': np.__version__, 'platform': platform.platform(), 'repeat': repeat,
+            'results': results_list}
+
+
+def compare_with_baseline(
+        results_dict: Dict,
+        baseline_dict: Dict,
+        tolerance: float = TOLERANCE,
+        noise_floor_ms: float = NOISE_FLOOR_MS
+) -> List:
+    r"""
+    Compare min wall times, less sensitive to machine load than medians, against the baseline for each stage and
+    scale present in both.
+
+    Return
+    -------
+    `List` of regressed (stage, scale, baseline ms, current ms) tuples
+    """
+    baseline_timings_dict = {(result['stage'], result['scale']): result['min_ms']
+                             for result in baseline_dict['results']}
+    regressions_list = []
+
+    for result in results_dict['results']:
+        baseline_ms = baseline_timings_dict.get((result['stage'], result['scale']))
+        if baseline_ms is None:
+            continue
+
+        current_ms = result['min_ms']
+        ratio = current_ms / baseline_ms if baseline_ms else float('inf')
+        regressed = current_ms > baseline_ms * (1 + tolerance) and current_ms - baseline_ms > noise_floor_ms
+        print(f"{result['stage']:<62} {result['scale']:>4}x {baseline_ms:10.2f} -> {current_ms:10.2f} ms "
+              f"{ratio:6.2f}x{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions_list.append((result['stage'], result['scale'], baseline_ms, current_ms))
+
+    return regressions_list
+
+
+def store_results(
+        results_dict: Dict,
+        filepath: str
+) -> None:
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, 'w') as results_file:
+        json.dump(results_dict, results_file, indent=2)
+
+
+def main(argv: Optional[List] = None) -> None:
+    parser = argparse.ArgumentParser(description='Offline parse and filter pipeline benchmarks')
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES_LIST)
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--output', default=RESULTS_FILEPATH)
+    parser.add_argument('--baseline', default=BASELINE_FILEPATH)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--update-baseline', action='store_true', help='Store results as the new baseline')
+    parser.add_argument('--check', action='store_true', help='Exit with status 1 on regressions')
+    args = parser.parse_args(argv)
+
+    results_dict = run_benchmarks(args.scales, args.repeat)
+    store_results(results_dict, args.output)
+    print(f'Results stored on {args.output}')
+
+    if args.update_baseline:
+        store_results(results_dict, args.baseline)
+        print(f'Baseline stored on {args.baseline}')
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f'No baseline on {args.baseline}, run with --update-baseline to create it.')
+        return
+
+    with open(args.baseline) as baseline_file:
+        regressions_list = compare_with_baseline(results_dict, json.load(baseline_file), args.tolerance)
+
+    print(f'{len(regressions_list)} regression(s) above {args.tolerance:.0%} tolerance')
+    if regressions_list and args.check:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,52 @@
+# Compare pd.read_html + DataframeParser stages against ScreenerTableParser on the UT fixtures.
+# python -m benchmarks.bench_screener_table_parser
+import os
+import statistics
+import timeit
+from io import StringIO
+
+import pandas as pd
+
+import settings
+from dataframe_parser import DataframeParser
+from screener_table_parser import ScreenerTableParser
+from tests.investsite_stub import render_screener_page
+
+TESTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests')
+REPEAT = 20
+
+
+def read_html_path(page_text: str) -> pd.DataFrame:
+    # Same stages as prepare_dataframe
+    dataframe_parser = DataframeParser(None)
+    stocks_list = pd.read_html(StringIO(page_text), decimal=',', thousands='.')
+    stocks_data_frame = dataframe_parser.extract_dataframe(stocks_list)
+    stocks_data_frame = dataframe_parser.drop_and_rename_cols(stocks_data_frame)
+    stocks_data_frame = dataframe_parser.drop_and_fill_nans(stocks_data_frame)
+    stocks_data_frame = dataframe_parser.remove_invalid_chars(stocks_data_frame)
+    stocks_data_frame = dataframe_parser.convert_data_type(stocks_data_frame)
+    return dataframe_parser.replace_nans_by_zero(stocks_data_frame)
+
+
+def screener_table_parser_path(page_text: str) -> pd.DataFrame:
+    return ScreenerTableParser().parse(page_text)
+
+
+def main() -> None:
+    stocks_list = pd.read_pickle(os.path.join(TESTS_DIR, settings.PICKLE_UT_FULL_LIST_FILEPATH))
+    page_text = render_screener_page(stocks_list)
+
+    pd.testing.assert_frame_equal(read_html_path(page_text), screener_table_parser_path(page_text))
+
+    results_dict = {}
+    for name, function in (('read_html', read_html_path), ('screener_table_parser', screener_table_parser_path)):
+        timings_list = timeit.repeat(lambda: function(page_text), number=1, repeat=REPEAT)
+        results_dict[name] = statistics.median(timings_list) * 1000
+        print(f'{name:<24} median {results_dict[name]:8.2f} ms  min {min(timings_list) * 1000:8.2f} ms')
+
+    print(f'Speedup: {results_dict["read_html"] / results_dict["screener_table_parser"]:.1f}x '
+          f'({len(stocks_list[1])} rows, {len(page_text) / 1024:.0f} KiB page)')
+
+
+if __name__ == "__main__":
+    main()
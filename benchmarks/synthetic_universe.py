@@ -0,0 +1,77 @@
+import string
+
+import numpy as np
+import pandas as pd
+
+SHARE_CLASSES_LIST = ['3', '4', '11']
+
+
+def make_company_prefixes(companies: int) -> np.ndarray:
+    r"""
+    Build `companies` distinct four letters prefixes (AAAA, AAAB, ...).
+    """
+    letters = np.array(list(string.ascii_uppercase))
+    company_codes = np.arange(companies)
+    return np.array([''.join(word) for word in zip(*[letters[company_codes // 26 ** power % 26]
+                                                     for power in (3, 2, 1, 0)])])
+
+
+def make_synthetic_universe(
+        rows: int,
+        seed: int = 0
+) -> pd.DataFrame:
+    r"""
+    Build a prepared-like stocks `DataFrame` with `rows` unique stocks, companies having one to three share classes.
+
+    Return
+    -------
+    Pandas `DataFrame` with the columns of `DataframeParser.prepare_dataframe`
+    """
+    rng = np.random.default_rng(seed)
+    companies = -(-rows * 2 // len(SHARE_CLASSES_LIST))
+    stock_codes = rng.choice(companies * len(SHARE_CLASSES_LIST), size=rows, replace=False)
+
+    company_prefixes = make_company_prefixes(companies)[stock_codes // len(SHARE_CLASSES_LIST)]
+    share_classes = np.array(SHARE_CLASSES_LIST)[stock_codes % len(SHARE_CLASSES_LIST)]
+
+    return pd.DataFrame({
+        'Stock': np.char.add(company_prefixes, share_classes).astype(object),
+        'Price': rng.uniform(0.5, 120, rows).round(2),
+        'EBIT_Margin_(%)': rng.normal(10, 25, rows).round(2),
+        'EV_EBIT': rng.normal(12, 20, rows).round(2),
+        'Dividend_Yield_(%)': rng.exponential(4, rows).round(2),
+        'Financial_Volume_(%)': rng.lognormal(14, 3, rows).astype(int),
+    })
+
+
+def scale_stocks_table(
+        stocks_data_frame: pd.DataFrame,
+        scale: int,
+        stock_column: str = 'Ação'
+) -> pd.DataFrame:
+    r"""
+    Repeat a screener table `scale` times, each copy with new company prefixes so stocks stay unique and companies
+    keep their share classes.
+
+    Return
+    -------
+    Pandas `DataFrame` with `scale` times the rows of `stocks_data_frame`
+    """
+    if scale == 1:
+        return stocks_data_frame.copy()
+
+    companies_prefix_series = stocks_data_frame[stock_column].str[:4]
+    share_classes_series = stocks_data_frame[stock_column].str[4:]
+    companies_prefixes = companies_prefix_series.unique()
+
+    new_prefixes = make_company_prefixes(len(companies_prefixes) * (scale + 1))
+    new_prefixes = new_prefixes[~np.isin(new_prefixes, companies_prefixes)]
+
+    copies_list = [stocks_data_frame]
+    for copy_number in range(scale - 1):
+        prefixes_dict = dict(zip(companies_prefixes, new_prefixes[copy_number * len(companies_prefixes):]))
+        stocks_copy = stocks_data_frame.copy()
+        stocks_copy[stock_column] = companies_prefix_series.map(prefixes_dict) + share_classes_series
+        copies_list.append(stocks_copy)
+
+    return pd.concat(copies_list, ignore_index=True)
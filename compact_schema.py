@@ -0,0 +1,156 @@
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+TICKER_COLUMN = 'Stock'
+# Ratios decoded from the page with two decimals, kept as float32 when every value rounds back to itself
+FLOAT32_COLUMNS_DICT = {
+    'Price': 2,
+    'EBIT_Margin_(%)': 2,
+    'EV_EBIT': 2,
+    'Dividend_Yield_(%)': 2
+}
+# Financial volume goes over the int32 range
+INT64_COLUMNS_LIST = ['Financial_Volume_(%)']
+
+
+class TickerCodes:
+    r"""
+    Append only code table of tickers: a ticker keeps its code once added, so categorical columns built from the
+    same table, on any date and in any run, share their codes and are concatenated without decoding.
+    """
+    def __init__(self, tickers_list: Optional[List] = None) -> None:
+        self.tickers_list: List = []
+        self.codes_dict: Dict[str, int] = {}
+        self.add_tickers(tickers_list or [])
+
+    # end def
+
+    def add_tickers(self, tickers_list) -> np.ndarray:
+        r"""
+        Add the tickers not in the table yet.
+
+        Return
+        -------
+        `np.ndarray` of the table codes of `tickers_list`
+        """
+        for ticker in tickers_list:
+            if ticker not in self.codes_dict:
+                self.codes_dict[ticker] = len(self.tickers_list)
+                self.tickers_list.append(ticker)
+
+        return np.array([self.codes_dict[ticker] for ticker in tickers_list], dtype=np.int32)
+
+    # end def
+
+    def to_categorical(self, tickers) -> pd.Categorical:
+        r"""
+        Encode `tickers` (array-like or `pd.Categorical`) with the table codes, NaN tickers get code -1.
+        Each distinct ticker is looked up once.
+
+        Return
+        -------
+        `pd.Categorical` with the table as categories
+        """
+        if isinstance(tickers, pd.Series):
+            tickers = tickers.array
+        if isinstance(tickers, pd.Categorical):
+            local_codes, local_tickers = tickers.codes, tickers.categories
+        else:
+            local_codes, local_tickers = pd.factorize(np.asarray(tickers, dtype=object))
+
+        table_codes = self.add_tickers(list(local_tickers))
+        codes = np.where(local_codes >= 0, table_codes[local_codes] if len(table_codes) else -1, -1)
+
+        return pd.Categorical.from_codes(codes, categories=self.tickers_list)
+
+    # end def
+
+    @classmethod
+    def load(cls, filepath: str) -> 'TickerCodes':
+        r"""
+        Read the code table from disk.
+
+        Return
+        -------
+        `TickerCodes`, empty if it was never stored
+        """
+        try:
+            with open(filepath, encoding='utf-8') as ticker_codes_file:
+                return cls(json.load(ticker_codes_file))
+        except FileNotFoundError:
+            return cls()
+
+    # end def
+
+    def store(self, filepath: str) -> None:
+        with open(filepath, 'w', encoding='utf-8') as ticker_codes_file:
+            json.dump(self.tickers_list, ticker_codes_file)
+
+    # end def
+
+
+def can_be_float32(
+        values: np.ndarray,
+        decimals: int
+) -> bool:
+    r"""
+    Return
+    -------
+    `True` if every value of `values` is given back by float32 rounded to `decimals`
+    """
+    restored_values = np.round(values.astype(np.float32).astype(np.float64), decimals)
+    return bool(np.array_equal(restored_values, values, equal_nan=True))
+# end def
+
+
+def to_compact(
+        stocks_data_frame: pd.DataFrame,
+        ticker_codes: Optional[TickerCodes] = None
+) -> pd.DataFrame:
+    r"""
+    Convert a prepared `DataFrame` to the compact schema: `Stock` categorical with `ticker_codes` as categories,
+    ratios as float32 where the precision allows, financial volume as int64. Other columns are kept as they are.
+
+    Return
+    -------
+    Pandas `DataFrame`
+    """
+    ticker_codes = ticker_codes or TickerCodes()
+    # Columns are replaced, not copied, on a shallow copy
+    compact_data_frame = stocks_data_frame.copy(deep=False)
+    for column in stocks_data_frame.columns:
+        values = stocks_data_frame[column]
+        if column == TICKER_COLUMN:
+            compact_data_frame[column] = ticker_codes.to_categorical(values)
+        elif column in FLOAT32_COLUMNS_DICT and values.dtype == np.float64 \
+                and can_be_float32(values.to_numpy(), FLOAT32_COLUMNS_DICT[column]):
+            compact_data_frame[column] = values.astype(np.float32)
+        elif column in INT64_COLUMNS_LIST:
+            compact_data_frame[column] = values.astype(np.int64)
+
+    return compact_data_frame
+# end def
+
+
+def from_compact(stocks_data_frame: pd.DataFrame) -> pd.DataFrame:
+    r"""
+    Convert a compact `DataFrame` back to the prepared schema: `Stock` as `str` objects and ratios as float64 with
+    their exact decoded values. Financial volume stays int64.
+
+    Return
+    -------
+    Pandas `DataFrame`
+    """
+    prepared_data_frame = stocks_data_frame.copy(deep=False)
+    for column in stocks_data_frame.columns:
+        values = stocks_data_frame[column]
+        if column == TICKER_COLUMN and isinstance(values.dtype, pd.CategoricalDtype):
+            prepared_data_frame[column] = values.astype(object)
+        elif column in FLOAT32_COLUMNS_DICT and values.dtype == np.float32:
+            prepared_data_frame[column] = values.astype(np.float64).round(FLOAT32_COLUMNS_DICT[column])
+
+    return prepared_data_frame
+# end def
@@ -0,0 +1,63 @@
+from typing import Dict, List
+
+import pandas as pd
+
+# B3 tickers start with the four letters code of their issuer: PETR3 and PETR4 are both Petrobras shares
+COMPANY_CODE_LENGTH = 4
+
+
+def get_company_codes(stocks_series: pd.Series) -> pd.Series:
+    r"""
+    Return
+    -------
+    `pd.Series` of the issuer code of each stock of `stocks_series`
+    """
+    return stocks_series.str[:COMPANY_CODE_LENGTH]
+# end def
+
+
+class CompanyIndex:
+    r"""
+    Ticker to company index of `companies_stock_name_list`. Bankruptcy status belongs to the company, so one
+    representative ticker per company is checked and its status applies to every ticker of the company.
+    """
+    def __init__(self, companies_stock_name_list: List) -> None:
+        self.stock_company_dict: Dict[str, str] = {stock: stock[:COMPANY_CODE_LENGTH]
+                                                   for stock in dict.fromkeys(companies_stock_name_list)}
+        # First ticker of each company, in the received order
+        self.company_stock_dict: Dict[str, str] = {}
+        for stock, company in self.stock_company_dict.items():
+            self.company_stock_dict.setdefault(company, stock)
+
+    # end def
+
+    def get_representative_stocks(self) -> List:
+        r"""
+        Return
+        -------
+        `List` with the first ticker of each company, in the received order
+        """
+        return list(self.company_stock_dict.values())
+
+    # end def
+
+    def get_company_statuses(
+            self,
+            companies_status_dict: Dict[str, bool]
+    ) -> Dict[str, bool]:
+        r"""
+        Apply the known statuses of `companies_status_dict` to every ticker of their companies, a ticker with a
+        status of its own keeps it.
+
+        Return
+        -------
+        `Dict` of stock name to status for every indexed ticker whose company status is known
+        """
+        company_status_dict = {}
+        for stock, is_operational in companies_status_dict.items():
+            company_status_dict.setdefault(stock[:COMPANY_CODE_LENGTH], is_operational)
+
+        return {stock: companies_status_dict.get(stock, company_status_dict[company])
+                for stock, company in self.stock_company_dict.items() if company in company_status_dict}
+
+    # end def
@@ -1,15 +1,19 @@
-import time
-from typing import List
+from typing import TYPE_CHECKING, List
 import pandas as pd
-from rich.progress import Progress
 
-from web_driver import WebDriver
+from instrumentation import stage_events
+from screener_table_parser import ScreenerTableParser
+from utils.number_decoder import decode_br_numbers
+
+if TYPE_CHECKING:
+    # HTTP and browser modules are only loaded by the online stages
+    from web_driver import WebDriver
 
 
 class DataframeParser:
     companies_in_bankruptcy_list = []
 
-    def __init__(self, web_driver: WebDriver()):
+    def __init__(self, web_driver: 'WebDriver'):
         self.drop_columns_list = [
             'Empresa', 'Data Preço', 'Data Dem.Financ.', 'Consolidação', 'ROTanC', 'ROInvC', 'RPL', 'ROA',
             'Margem Líquida', 'Margem Bruta', 'Giro Ativo', 'Alav.Financ.', 'Passivo/PL', 'Preço/Lucro', 'Preço/VPA',
@@ -18,6 +22,28 @@ class DataframeParser:
             '# Ações Total', '# Ações Ord.', '# Ações Pref.'
         ]
         self.web_driver = web_driver
+        self.screener_table_parser = ScreenerTableParser()
+    # end def
+
+    def prepare_dataframe_from_page(
+            self,
+            page_text: str
+    ) -> pd.DataFrame:
+        r"""
+        Get screener page HTML and parse only the used columns of the stocks table, same result as
+        `prepare_dataframe` on the `List` of `DataFrame` read from the page.
+
+        Return
+        -------
+        Pandas `DataFrame`
+        """
+        if page_text:
+            with stage_events.stage('Preparing fetched data'):
+                return self.screener_table_parser.parse(page_text)
+        else:
+            print('Cannot parse data, page is empty or corrupted.')
+            raise SystemExit(1)
+
     # end def
 
     def prepare_dataframe(
@@ -32,25 +58,13 @@ class DataframeParser:
         Pandas `DataFrame`
         """
         if stocks_list:
-            with Progress() as progress:
-                task1 = progress.add_task("[green]Preparing fetched data:    ", total=100)
-
-                while not progress.finished:
-                    stocks_data_frame = self.extract_dataframe(stocks_list)
-                    stocks_data_frame = self.drop_and_rename_cols(stocks_data_frame)
-                    time.sleep(0.25)
-                    progress.update(task1, advance=40)
-
-                    stocks_data_frame = self.drop_and_fill_nans(stocks_data_frame)
-                    stocks_data_frame = self.remove_invalid_chars(stocks_data_frame)
-                    time.sleep(0.25)
-                    progress.update(task1, advance=40)
-
-                    stocks_data_frame = self.convert_data_type(stocks_data_frame)
-                    stocks_data_frame = self.replace_nans_by_zero(stocks_data_frame)
-                    time.sleep(0.25)
-                    progress.update(task1, advance=20)
-                return stocks_data_frame
+            with stage_events.stage('Preparing fetched data'):
+                stocks_data_frame = self.extract_dataframe(stocks_list)
+                stocks_data_frame = self.drop_and_rename_cols(stocks_data_frame)
+                stocks_data_frame = self.drop_and_fill_nans(stocks_data_frame)
+                stocks_data_frame = self.decode_numeric_columns(stocks_data_frame)
+                stocks_data_frame = self.replace_nans_by_zero(stocks_data_frame)
+            return stocks_data_frame
         else:
             print('Cannot parse data, list is empty or corrupted.')
             raise SystemExit(1)
@@ -113,6 +127,30 @@ class DataframeParser:
 
     # end def
 
+    @staticmethod
+    def decode_numeric_columns(stocks_data_frame: pd.DataFrame) -> pd.DataFrame:
+        r"""
+        Get `DataFrame`, decode pt-BR formatted numbers of each column in a single pass.
+        Same result as `remove_invalid_chars` followed by `convert_data_type`.
+
+        Return
+        -------
+        Pandas `DataFrame`
+        """
+        if not stocks_data_frame.empty:
+            for col in ['Price', 'EBIT_Margin_(%)', 'EV_EBIT', 'Dividend_Yield_(%)']:
+                stocks_data_frame[col] = decode_br_numbers(stocks_data_frame[col])
+
+            stocks_data_frame['Financial_Volume_(%)'] = (decode_br_numbers(stocks_data_frame['Financial_Volume_(%)'],
+                                                                           na_value=0).astype(int))
+        else:
+            print('Cannot decode data, dataframe is empty or corrupted.')
+            raise SystemExit(1)
+
+        return stocks_data_frame
+
+    # end def
+
     @staticmethod
     def remove_invalid_chars(stocks_data_frame: pd.DataFrame) -> pd.DataFrame:
         r"""
@@ -2,6 +2,13 @@ from abc import ABC, abstractmethod
 
 
 class FileManager(ABC):
+    @property
+    @abstractmethod
+    def filename(self) -> str:
+        # Date stamped when writing, not when the class is defined, long running processes change day
+        raise NotImplementedError
+    # end def
+
     @abstractmethod
     def store_on_disk(
             self,
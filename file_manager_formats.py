@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+import settings
+from file_manager import FileManager
+from file_manager_sheet import FileManagerStreamingXLSX, FileManagerXLSX
+from file_manager_text import FileManagerCSV, FileManagerJSON, FileManagerParquet
+
+FILE_MANAGERS_DICT: Dict = {
+    'xlsx': FileManagerXLSX,
+    'xlsx_streaming': FileManagerStreamingXLSX,
+    'csv': FileManagerCSV,
+    'json': FileManagerJSON,
+    'parquet': FileManagerParquet,
+}
+
+
+class FileManagerFormats(FileManager):
+    r"""
+    Writes the same `DataFrame` in every selected output format, concurrently, one thread per format.
+    """
+    def __init__(
+            self,
+            output_formats_list: Optional[List] = None
+    ) -> None:
+        output_formats_list = settings.OUTPUT_FORMATS if output_formats_list is None else output_formats_list
+
+        unknown_formats_list = [output_format for output_format in output_formats_list
+                                if output_format not in FILE_MANAGERS_DICT]
+        if not output_formats_list or unknown_formats_list:
+            print(f'Cannot write output formats {unknown_formats_list or output_formats_list}, '
+                  f'choose among {list(FILE_MANAGERS_DICT)}.')
+            raise SystemExit(1)
+
+        self.file_managers_list: List[FileManager] = [FILE_MANAGERS_DICT[output_format]()
+                                                      for output_format in dict.fromkeys(output_formats_list)]
+    # end def
+
+    @property
+    def filename(self) -> str:
+        return ', '.join(self.get_filenames())
+    # end def
+
+    def get_filenames(self) -> List:
+        filenames_list = [file_manager.filename for file_manager in self.file_managers_list]
+        if len(set(filenames_list)) != len(filenames_list):
+            print(f'Cannot write output formats writing the same file: {filenames_list}.')
+            raise SystemExit(1)
+
+        return filenames_list
+    # end def
+
+    def store_on_disk(
+            self,
+            stocks_data_frame: pd.DataFrame
+    ) -> List:
+        r"""
+        Write `stocks_data_frame` in every format, a failing format does not stop the others.
+
+        Return
+        -------
+        `List` of written filenames
+        """
+        filenames_list = self.get_filenames()
+
+        with ThreadPoolExecutor(max_workers=len(self.file_managers_list)) as executor:
+            futures_list = [executor.submit(file_manager.store_on_disk, stocks_data_frame)
+                            for file_manager in self.file_managers_list]
+
+        errors_list = [f'{filename}: {future.exception()!r}' for filename, future in zip(filenames_list, futures_list)
+                       if future.exception() is not None]
+        if errors_list:
+            print(f'Could not write {errors_list}.')
+            raise SystemExit(1)
+
+        return filenames_list
+    # end def
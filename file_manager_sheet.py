@@ -1,29 +1,63 @@
 from datetime import date
 
 import pandas as pd
+import xlsxwriter
+from xlsxwriter.exceptions import FileCreateError
 
 import settings
 from file_manager import FileManager
 
 
 class FileManagerXLSX(FileManager):
-    filename = str(date.today()) + settings.XLSX_FILENAME
-
     def __new__(cls):
         if not hasattr(cls, 'instance'):
             cls.instance = super(FileManagerXLSX, cls).__new__(cls)
         return cls.instance
     # end def
 
+    @property
+    def filename(self) -> str:
+        return str(date.today()) + settings.XLSX_FILENAME
+    # end def
+
+    def store_on_disk(
+            self,
+            stocks_data_frame: pd.DataFrame
+    ) -> None:
+        try:
+            with pd.ExcelWriter(self.filename, engine='xlsxwriter') as writer:
+                stocks_data_frame.to_excel(writer, sheet_name='Most_valuable_stocks', startrow=0)
+        except (PermissionError, FileCreateError) as e:
+            print(f"{e} - Could not write the spreadsheet.")
+            raise SystemExit(1)
+    # end def
+
+
+class FileManagerStreamingXLSX(FileManager):
+    r"""
+    Writes the spreadsheet row by row with xlsxwriter constant memory mode, each row is flushed to disk once the
+    next one starts, memory stays flat for large or history outputs. Same layout as `FileManagerXLSX`.
+    """
+    @property
+    def filename(self) -> str:
+        return str(date.today()) + settings.XLSX_FILENAME
+    # end def
+
     def store_on_disk(
             self,
             stocks_data_frame: pd.DataFrame
     ) -> None:
-        writer = pd.ExcelWriter(self.filename, engine='xlsxwriter')
         try:
-            stocks_data_frame.to_excel(writer, sheet_name='Most_valuable_stocks', startrow=0)
-        except PermissionError as e:
-            input(f"{e} - Could not write the spreadsheet.")
+            with xlsxwriter.Workbook(self.filename, {'constant_memory': True, 'nan_inf_to_errors': True}) as workbook:
+                worksheet = workbook.add_worksheet('Most_valuable_stocks')
+                header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center',
+                                                     'valign': 'top'})
 
-        writer.close()
+                worksheet.write_row(0, 1, [str(column) for column in stocks_data_frame.columns], header_format)
+                for row_number, row in enumerate(stocks_data_frame.itertuples(name=None), start=1):
+                    worksheet.write(row_number, 0, row[0], header_format)
+                    worksheet.write_row(row_number, 1, row[1:])
+        except (PermissionError, FileCreateError) as e:
+            print(f"{e} - Could not write the spreadsheet.")
+            raise SystemExit(1)
     # end def
@@ -0,0 +1,73 @@
+import importlib.util
+from datetime import date
+
+import pandas as pd
+
+import settings
+from file_manager import FileManager
+
+
+class FileManagerCSV(FileManager):
+    @property
+    def filename(self) -> str:
+        return str(date.today()) + settings.CSV_FILENAME
+    # end def
+
+    def store_on_disk(
+            self,
+            stocks_data_frame: pd.DataFrame
+    ) -> None:
+        try:
+            stocks_data_frame.to_csv(self.filename, index=False)
+        except PermissionError as e:
+            print(f"{e} - Could not write the CSV file.")
+            raise SystemExit(1)
+    # end def
+
+
+class FileManagerJSON(FileManager):
+    @property
+    def filename(self) -> str:
+        return str(date.today()) + settings.JSON_FILENAME
+    # end def
+
+    def store_on_disk(
+            self,
+            stocks_data_frame: pd.DataFrame
+    ) -> None:
+        try:
+            stocks_data_frame.to_json(self.filename, orient='records', indent=2, force_ascii=False)
+        except PermissionError as e:
+            print(f"{e} - Could not write the JSON file.")
+            raise SystemExit(1)
+    # end def
+
+
+class FileManagerParquet(FileManager):
+    r"""
+    Needs pyarrow or fastparquet, optional dependencies not listed in requirements.txt.
+    """
+    @property
+    def filename(self) -> str:
+        return str(date.today()) + settings.PARQUET_FILENAME
+    # end def
+
+    def store_on_disk(
+            self,
+            stocks_data_frame: pd.DataFrame
+    ) -> None:
+        if not self.is_available():
+            print('Cannot write the Parquet file, install pyarrow or fastparquet.')
+            raise SystemExit(1)
+
+        try:
+            stocks_data_frame.to_parquet(self.filename, index=False)
+        except PermissionError as e:
+            print(f"{e} - Could not write the Parquet file.")
+            raise SystemExit(1)
+    # end def
+
+    @staticmethod
+    def is_available() -> bool:
+        return any(importlib.util.find_spec(engine) is not None for engine in ('pyarrow', 'fastparquet'))
+    # end def
@@ -0,0 +1,190 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import requests
+from cachecontrol.adapter import CacheControlAdapter
+from cachecontrol.cache import BaseCache
+from cachecontrol.caches import FileCache
+from cachecontrol.heuristics import LastModified
+
+import settings
+
+
+class SQLiteCache(BaseCache):
+    r"""
+    CacheControl backend keeping every response in a single SQLite file. Once the stored bodies exceed
+    `max_bytes`, the least recently used responses are evicted.
+    """
+    def __init__(
+            self,
+            filepath: str = settings.HTTP_CACHE_FILEPATH,
+            max_bytes: int = settings.HTTP_CACHE_MAX_BYTES
+    ) -> None:
+        if max_bytes <= 0:
+            print('Cannot use a non positive HTTP cache size.')
+            raise SystemExit(1)
+
+        self.filepath: str = filepath
+        self.max_bytes: int = max_bytes
+
+        if os.path.dirname(self.filepath):
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS http_cache ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, expires REAL, '
+                'accessed_at REAL NOT NULL)'
+            )
+
+    # end def
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per call, responses are cached from the threads of the concurrent checkers
+        return sqlite3.connect(self.filepath, timeout=settings.HTTP_TIMEOUT_SECONDS)
+
+    # end def
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with closing(self._connect()) as connection, connection:
+            row = connection.execute('SELECT value, expires FROM http_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] < now:
+                connection.execute('DELETE FROM http_cache WHERE key = ?', (key,))
+                return None
+            connection.execute('UPDATE http_cache SET accessed_at = ? WHERE key = ?', (now, key))
+
+        return row[0]
+
+    # end def
+
+    def set(self, key: str, value: bytes, expires=None) -> None:
+        r"""
+        Store `value`, `expires` is a number of seconds or a `datetime` as passed by CacheControl.
+        """
+        now = time.time()
+        if isinstance(expires, datetime):
+            expires = expires.replace(tzinfo=expires.tzinfo or timezone.utc).timestamp()
+        elif expires is not None:
+            expires = now + expires
+
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO http_cache (key, value, size, expires, accessed_at) VALUES (?, ?, ?, ?, ?)',
+                (key, value, len(value), expires, now)
+            )
+            # Keeps the most recently used responses fitting in max_bytes, ranked only once the limit is exceeded
+            if connection.execute('SELECT COALESCE(SUM(size), 0) FROM http_cache').fetchone()[0] <= self.max_bytes:
+                return
+            connection.execute(
+                'DELETE FROM http_cache WHERE key IN (SELECT key FROM ('
+                'SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, rowid DESC) AS kept_bytes FROM http_cache'
+                ') WHERE kept_bytes > ?)',
+                (self.max_bytes,)
+            )
+
+    # end def
+
+    def delete(self, key: str) -> None:
+        with closing(self._connect()) as connection, connection:
+            connection.execute('DELETE FROM http_cache WHERE key = ?', (key,))
+
+    # end def
+
+    def get_size(self) -> int:
+        with closing(self._connect()) as connection, connection:
+            return connection.execute('SELECT COALESCE(SUM(size), 0) FROM http_cache').fetchone()[0]
+
+    # end def
+
+
+class HttpCacheStats:
+    r"""
+    Counts the responses of the cached sessions: `hits` were served from the cache, fresh or revalidated with a
+    304 answer, `misses` were downloaded. `bytes_saved` adds the body sizes of the hits.
+    """
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.bytes_saved: int = 0
+
+    # end def
+
+    def record(self, response: requests.Response, *args, **kwargs) -> None:
+        from_cache = getattr(response, 'from_cache', False)
+        with self.lock:
+            if from_cache:
+                self.hits += 1
+                self.bytes_saved += len(response.content)
+            else:
+                self.misses += 1
+
+    # end def
+
+    def reset(self) -> None:
+        with self.lock:
+            self.hits = self.misses = self.bytes_saved = 0
+
+    # end def
+
+    def to_dict(self) -> Dict[str, int]:
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'bytes_saved': self.bytes_saved}
+
+    # end def
+
+
+http_cache_stats = HttpCacheStats()
+
+
+def get_http_cache() -> Optional[BaseCache]:
+    r"""
+    Cache backend selected by HTTP_CACHE_BACKEND.
+
+    Return
+    -------
+    CacheControl `BaseCache`, None when responses are not cached
+    """
+    if settings.HTTP_CACHE_BACKEND == 'sqlite':
+        return SQLiteCache(settings.HTTP_CACHE_FILEPATH, settings.HTTP_CACHE_MAX_BYTES)
+    if settings.HTTP_CACHE_BACKEND == 'file':
+        return FileCache(settings.HTTP_CACHE_DIRPATH)
+    if settings.HTTP_CACHE_BACKEND == 'none':
+        return None
+
+    print(f'Unknown HTTP cache backend {settings.HTTP_CACHE_BACKEND}, expected sqlite, file or none.')
+    raise SystemExit(1)
+# end def
+
+
+def create_cached_session(pool_maxsize: int = requests.adapters.DEFAULT_POOLSIZE) -> requests.Session:
+    r"""
+    Session with keep-alive connections, responses cached by the selected backend and revalidated with
+    If-None-Match / If-Modified-Since once stale, counted by `http_cache_stats`. Responses with an ETag are kept
+    and revalidated on each request, responses with only Last-Modified are fresh for a tenth of their age.
+
+    Return
+    -------
+    `requests.Session`
+    """
+    session = requests.Session()
+    http_cache = get_http_cache()
+    if http_cache is None:
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+    else:
+        adapter = CacheControlAdapter(http_cache, heuristic=LastModified(), pool_connections=1,
+                                      pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.hooks['response'].append(http_cache_stats.record)
+
+    return session
+# end def
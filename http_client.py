@@ -0,0 +1,283 @@
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+import settings
+from http_cache import create_cached_session
+
+USER_AGENT = ('Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) '
+              'Chrome/50.0.2661.75 Safari/537.36')
+HEADER_DICT = {
+    'User-Agent': USER_AGENT,
+    'Accept-Encoding': 'gzip'
+}
+# Answers meaning the site is throttling (429) or temporarily failing (5xx), worth another attempt
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Called with every response received by an `HttpClient`, `HttpArchive.record` attaches here to record a run
+response_hooks_list: List[Callable] = []
+
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    r"""
+    Raised without sending the request while the circuit breaker is open.
+    """
+
+
+class TokenBucket:
+    r"""
+    Thread-safe token bucket: each request takes one token, tokens are refilled at `rate_per_second` up to `burst`.
+    `pause` empties the bucket and holds every caller for a while, used when the site answers 429.
+    """
+    def __init__(
+            self,
+            rate_per_second: float = settings.HTTP_RATE_LIMIT_PER_SECOND,
+            burst: int = settings.HTTP_RATE_LIMIT_BURST
+    ) -> None:
+        if rate_per_second <= 0 or burst <= 0:
+            print('Invalid HTTP rate limit.')
+            raise SystemExit(1)
+
+        self.lock = threading.Lock()
+        self.rate_per_second: float = rate_per_second
+        self.burst: int = burst
+        self.tokens: float = burst
+        self.updated_at: float = time.monotonic()
+        self.paused_until: float = 0.0
+
+    # end def
+
+    def acquire(self) -> float:
+        r"""
+        Take one token, waiting for it when the bucket is empty or paused.
+
+        Return
+        -------
+        Seconds waited
+        """
+        waited_seconds = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate_per_second)
+                self.updated_at = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited_seconds
+                wait_seconds = max(self.paused_until - now, (1 - self.tokens) / self.rate_per_second)
+
+            time.sleep(wait_seconds)
+            waited_seconds += wait_seconds
+
+    # end def
+
+    def pause(self, seconds: float) -> None:
+        with self.lock:
+            self.tokens = 0.0
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    # end def
+
+
+class CircuitBreaker:
+    r"""
+    Opens after `failure_threshold` consecutive failures and fails every request fast for `reset_seconds`. Then a
+    single trial request is let through (half-open): its success closes the circuit, its failure opens it again.
+    A trial that never reports its outcome expires after `reset_seconds` and another one is let through.
+    """
+    def __init__(
+            self,
+            failure_threshold: int = settings.HTTP_CIRCUIT_FAILURE_THRESHOLD,
+            reset_seconds: float = settings.HTTP_CIRCUIT_RESET_SECONDS
+    ) -> None:
+        if failure_threshold <= 0 or reset_seconds < 0:
+            print('Invalid circuit breaker threshold or reset time.')
+            raise SystemExit(1)
+
+        self.lock = threading.Lock()
+        self.failure_threshold: int = failure_threshold
+        self.reset_seconds: float = reset_seconds
+        self.state: str = CIRCUIT_CLOSED
+        self.failures: int = 0
+        self.opened_at: float = 0.0
+        self.trial_in_flight: bool = False
+        self.trial_started_at: float = 0.0
+
+    # end def
+
+    def before_request(self) -> None:
+        r"""
+        Let the request through or raise `CircuitOpenError` while the site is considered down.
+        """
+        with self.lock:
+            if self.state == CIRCUIT_OPEN:
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    raise CircuitOpenError('Circuit breaker is open, www.investsite.com.br is failing')
+                self.state = CIRCUIT_HALF_OPEN
+                self.trial_in_flight = False
+
+            if self.state == CIRCUIT_HALF_OPEN:
+                if self.trial_in_flight and time.monotonic() - self.trial_started_at < self.reset_seconds:
+                    raise CircuitOpenError('Circuit breaker is half-open, waiting for the trial request')
+                self.trial_in_flight = True
+                self.trial_started_at = time.monotonic()
+
+    # end def
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.state = CIRCUIT_CLOSED
+            self.failures = 0
+            self.trial_in_flight = False
+
+    # end def
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.state == CIRCUIT_HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = CIRCUIT_OPEN
+                self.opened_at = time.monotonic()
+
+    # end def
+
+    def reset(self) -> None:
+        self.record_success()
+
+    # end def
+
+    def to_dict(self) -> Dict:
+        with self.lock:
+            return {'state': self.state, 'failures': self.failures}
+
+    # end def
+
+
+# Shared by every client of the process, so parallel workers draw from the same budget
+investsite_rate_limiter = TokenBucket()
+investsite_circuit_breaker = CircuitBreaker()
+
+
+def call_response_hooks(
+        response: requests.Response,
+        *args,
+        **kwargs
+) -> None:
+    # Session hook looking `response_hooks_list` up on each response, hooks attached later apply to existing clients
+    for response_hook in response_hooks_list:
+        response_hook(response, *args, **kwargs)
+# end def
+
+
+class HttpClient:
+    r"""
+    GET requests to www.investsite.com.br through `session`, rate limited by the shared token bucket, retried with
+    jittered exponential backoff on 429, 5xx and connection errors, and failing fast while the shared circuit
+    breaker is open.
+    """
+    def __init__(
+            self,
+            pool_maxsize: int = requests.adapters.DEFAULT_POOLSIZE,
+            session: Optional[requests.Session] = None,
+            rate_limiter: Optional[TokenBucket] = None,
+            circuit_breaker: Optional[CircuitBreaker] = None,
+            retries: int = settings.HTTP_RETRIES,
+            backoff_base_seconds: float = settings.HTTP_BACKOFF_BASE_SECONDS,
+            backoff_max_seconds: float = settings.HTTP_BACKOFF_MAX_SECONDS
+    ) -> None:
+        if retries < 0 or backoff_base_seconds < 0 or backoff_max_seconds < 0:
+            print('Invalid HTTP retries or backoff.')
+            raise SystemExit(1)
+
+        self.session: requests.Session = session or create_cached_session(pool_maxsize)
+        self.session.headers.update(HEADER_DICT)
+        if call_response_hooks not in self.session.hooks['response']:
+            self.session.hooks['response'].append(call_response_hooks)
+        self.rate_limiter: TokenBucket = rate_limiter or investsite_rate_limiter
+        self.circuit_breaker: CircuitBreaker = circuit_breaker or investsite_circuit_breaker
+        self.retries: int = retries
+        self.backoff_base_seconds: float = backoff_base_seconds
+        self.backoff_max_seconds: float = backoff_max_seconds
+
+    # end def
+
+    def get(
+            self,
+            url: str,
+            headers: Optional[Dict] = None,
+            timeout_seconds: float = settings.HTTP_TIMEOUT_SECONDS
+    ) -> requests.Response:
+        r"""
+        Get `url`, retrying up to `retries` times. Raises `requests.exceptions.RequestException` once every attempt
+        failed, `CircuitOpenError` while the circuit breaker is open.
+
+        Return
+        -------
+        `requests.Response` of any status other than 429 and 5xx
+        """
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.acquire()
+            self.circuit_breaker.before_request()
+            try:
+                response = self.session.get(url, headers=headers, timeout=timeout_seconds)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self.circuit_breaker.record_failure()
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.get_backoff_seconds(attempt))
+                continue
+            except BaseException:
+                # Any other error, from the session or its cache, still reports the outcome of the request
+                self.circuit_breaker.record_failure()
+                raise
+
+            if response.status_code not in RETRY_STATUS_CODES:
+                self.circuit_breaker.record_success()
+                return response
+
+            if response.status_code == 429:
+                # Throttled, the site is up: every worker of the process waits before its next request
+                self.circuit_breaker.record_success()
+                if attempt == self.retries:
+                    response.raise_for_status()
+                self.rate_limiter.pause(self.get_retry_after_seconds(response, attempt))
+                continue
+
+            self.circuit_breaker.record_failure()
+            if attempt == self.retries:
+                response.raise_for_status()
+            time.sleep(self.get_backoff_seconds(attempt))
+
+    # end def
+
+    def get_backoff_seconds(self, attempt: int) -> float:
+        r"""
+        Full jitter backoff: uniform between 0 and `backoff_base_seconds` * 2 ** `attempt`, capped.
+
+        Return
+        -------
+        Seconds to wait before the next attempt
+        """
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+
+    # end def
+
+    def get_retry_after_seconds(
+            self,
+            response: requests.Response,
+            attempt: int
+    ) -> float:
+        try:
+            return min(self.backoff_max_seconds, max(0.0, float(response.headers['Retry-After'])))
+        except (KeyError, ValueError):
+            return self.get_backoff_seconds(attempt)
+
+    # end def
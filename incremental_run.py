@@ -0,0 +1,187 @@
+import time
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import rich
+
+import settings
+from snapshot_store import CANDIDATES_SNAPSHOT, PREPARED_SNAPSHOT, SELECTION_SNAPSHOT, STATUSES_SNAPSHOT, SnapshotStore
+
+
+class IncrementalRun:
+    r"""
+    Diffs the prepared screener table against the most recent stored one by stock, so unchanged stocks reuse the
+    results of the previous run: the candidates selection when no row and no threshold changed and the bankruptcy
+    statuses fetched less than BANKRUPTCY_STATUS_CACHE_TTL_SECONDS ago.
+    """
+    def __init__(
+            self,
+            snapshot_store: SnapshotStore,
+            snapshot_date: date
+    ) -> None:
+        self.snapshot_store = snapshot_store
+        self.snapshot_date = snapshot_date
+        self.previous_date: Optional[date] = None
+        self.unchanged_stocks_set = set()
+        self.diff_counts_dict = {'rows': 0, 'unchanged': 0, 'changed': 0, 'added': 0, 'removed': 0}
+        self.checks_avoided: int = 0
+
+    # end def
+
+    def diff(
+            self,
+            stocks_data_frame: pd.DataFrame
+    ) -> Dict:
+        r"""
+        Compare `stocks_data_frame` rows with the previous prepared snapshot rows of the same stock, then store it as
+        the prepared snapshot of `snapshot_date`.
+
+        Return
+        -------
+        `Dict` with rows, unchanged, changed, added and removed stocks counts
+        """
+        previous_dates_list = [previous_date for previous_date in self.snapshot_store.list_dates(PREPARED_SNAPSHOT)
+                               if previous_date <= self.snapshot_date]
+        self.previous_date = previous_dates_list[-1] if previous_dates_list else None
+
+        if self.previous_date is None:
+            previous_data_frame = stocks_data_frame.iloc[:0]
+        else:
+            previous_data_frame = self.snapshot_store.load_snapshot(PREPARED_SNAPSHOT, self.previous_date)
+
+        self.unchanged_stocks_set = set(self.get_unchanged_stocks(previous_data_frame, stocks_data_frame))
+        previous_stocks_set = set(previous_data_frame['Stock'])
+        stocks_set = set(stocks_data_frame['Stock'])
+
+        self.diff_counts_dict = {'rows': len(stocks_data_frame), 'unchanged': len(self.unchanged_stocks_set),
+                                 'changed': len((stocks_set & previous_stocks_set) - self.unchanged_stocks_set),
+                                 'added': len(stocks_set - previous_stocks_set),
+                                 'removed': len(previous_stocks_set - stocks_set)}
+
+        self.snapshot_store.store_snapshot(PREPARED_SNAPSHOT, self.snapshot_date, stocks_data_frame)
+
+        return self.diff_counts_dict
+
+    # end def
+
+    def load_previous_candidates(
+            self,
+            selection_dict: Dict
+    ) -> Optional[pd.DataFrame]:
+        r"""
+        Gets `selection_dict` of `select_cheapest_stocks` arguments of this run.
+
+        Return
+        -------
+        Previous run candidates `DataFrame` when no row changed since then and they were selected with the same
+        arguments, None when they must be selected again
+        """
+        if self.previous_date is None or self.diff_counts_dict['unchanged'] != self.diff_counts_dict['rows'] \
+                or self.diff_counts_dict['removed']:
+            return None
+
+        if self.previous_date not in self.snapshot_store.list_dates(CANDIDATES_SNAPSHOT) \
+                or self.previous_date not in self.snapshot_store.list_dates(SELECTION_SNAPSHOT):
+            return None
+
+        selection_data_frame = self.snapshot_store.load_snapshot(SELECTION_SNAPSHOT, self.previous_date)
+        if selection_data_frame.iloc[0].to_dict() != selection_dict:
+            return None
+
+        return self.snapshot_store.load_snapshot(CANDIDATES_SNAPSHOT, self.previous_date)
+
+    # end def
+
+    def store_candidates(
+            self,
+            stocks_data_frame: pd.DataFrame,
+            selection_dict: Dict
+    ) -> None:
+        self.snapshot_store.store_snapshot(CANDIDATES_SNAPSHOT, self.snapshot_date, stocks_data_frame)
+        self.snapshot_store.store_snapshot(SELECTION_SNAPSHOT, self.snapshot_date, pd.DataFrame([selection_dict]))
+
+    # end def
+
+    def get_known_statuses(
+            self,
+            companies_stock_name_list: List
+    ) -> Dict[str, Tuple[bool, float]]:
+        r"""
+        Gets `List` of stock names, returns the previous run bankruptcy statuses of the unchanged ones fetched less
+        than BANKRUPTCY_STATUS_CACHE_TTL_SECONDS ago.
+
+        Return
+        -------
+        `Dict` of stock name to (`True` when the company is operational, fetched at timestamp)
+        """
+        if self.previous_date is None or self.previous_date not in self.snapshot_store.list_dates(STATUSES_SNAPSHOT):
+            return {}
+
+        statuses_data_frame = self.snapshot_store.load_snapshot(STATUSES_SNAPSHOT, self.previous_date)
+        if 'Fetched_At' not in statuses_data_frame.columns:
+            # Snapshots stored without the fetch time could be older than the TTL
+            return {}
+
+        fetched_after = time.time() - settings.BANKRUPTCY_STATUS_CACHE_TTL_SECONDS
+        previous_status_dict = {stock: (bool(is_operational), float(fetched_at))
+                                for stock, is_operational, fetched_at in zip(statuses_data_frame['Stock'],
+                                                                             statuses_data_frame['Is_Operational'],
+                                                                             statuses_data_frame['Fetched_At'])
+                                if fetched_at > fetched_after}
+
+        checked_status_dict = {stock: previous_status_dict[stock] for stock in dict.fromkeys(companies_stock_name_list)
+                               if stock in self.unchanged_stocks_set and stock in previous_status_dict}
+        self.checks_avoided += len(checked_status_dict)
+
+        return checked_status_dict
+
+    # end def
+
+    def store_statuses(
+            self,
+            checked_status_dict: Dict[str, Tuple[bool, float]]
+    ) -> None:
+        r"""
+        Stores `Dict` of stock name to (operational status, fetched at timestamp), statuses reused from the previous
+        run keep their original fetch time.
+        """
+        self.snapshot_store.store_snapshot(STATUSES_SNAPSHOT, self.snapshot_date, pd.DataFrame(
+            {'Stock': pd.Series(list(checked_status_dict), dtype=object),
+             'Is_Operational': pd.Series([is_operational for is_operational, _ in checked_status_dict.values()],
+                                         dtype=bool),
+             'Fetched_At': pd.Series([fetched_at for _, fetched_at in checked_status_dict.values()], dtype=float)}))
+
+    # end def
+
+    def report(self) -> None:
+        rich.print(f"[blue]Incremental run: {self.diff_counts_dict['unchanged']} of {self.diff_counts_dict['rows']} "
+                   f"rows unchanged ({self.diff_counts_dict['changed']} changed, {self.diff_counts_dict['added']} "
+                   f"added, {self.diff_counts_dict['removed']} removed), {self.checks_avoided} network checks "
+                   f"avoided")
+
+    # end def
+
+    @staticmethod
+    def get_unchanged_stocks(
+            previous_data_frame: pd.DataFrame,
+            stocks_data_frame: pd.DataFrame
+    ) -> List:
+        r"""
+        Gets previous and current `DataFrame`, matches rows by stock and compares every other column.
+
+        Return
+        -------
+        `List` of stocks with the same values in both
+        """
+        merged_data_frame = stocks_data_frame.merge(previous_data_frame, on='Stock', how='inner',
+                                                    suffixes=('', '_previous'))
+        unchanged_mask = pd.Series(True, index=merged_data_frame.index)
+        for column in stocks_data_frame.columns.drop('Stock'):
+            current_series = merged_data_frame[column]
+            previous_series = merged_data_frame[column + '_previous']
+            unchanged_mask &= (current_series == previous_series) | (current_series.isna() & previous_series.isna())
+
+        return list(merged_data_frame.loc[unchanged_mask, 'Stock'])
+
+    # end def
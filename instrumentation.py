@@ -0,0 +1,188 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+
+class StageListener:
+    r"""
+    Receives stage events, override only the events of interest.
+    """
+    def on_stage_start(
+            self,
+            name: str,
+            depth: int
+    ) -> None:
+        pass
+
+    # end def
+
+    def on_stage_finish(
+            self,
+            name: str,
+            depth: int,
+            wall_time_ms: float,
+            failed: bool
+    ) -> None:
+        pass
+
+    # end def
+
+
+class StageEvents:
+    def __init__(self) -> None:
+        self.listeners_list: List[StageListener] = []
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    # end def
+
+    def subscribe(
+            self,
+            listener: StageListener
+    ) -> StageListener:
+        with self.lock:
+            self.listeners_list.append(listener)
+        return listener
+
+    # end def
+
+    def unsubscribe(
+            self,
+            listener: StageListener
+    ) -> None:
+        with self.lock:
+            if listener in self.listeners_list:
+                self.listeners_list.remove(listener)
+
+    # end def
+
+    @contextmanager
+    def stage(
+            self,
+            name: str
+    ):
+        r"""
+        Report start and finish events of the `name` stage, with its wall time, to every listener.
+        Stages can be nested, `depth` is 0 for the outermost stage of the current thread.
+        """
+        depth = getattr(self.local, 'depth', 0)
+        self.local.depth = depth + 1
+        with self.lock:
+            listeners_list = list(self.listeners_list)
+
+        for listener in listeners_list:
+            listener.on_stage_start(name, depth)
+
+        failed = True
+        start = time.perf_counter()
+        try:
+            yield
+            failed = False
+        finally:
+            wall_time_ms = (time.perf_counter() - start) * 1000
+            self.local.depth = depth
+            for listener in listeners_list:
+                listener.on_stage_finish(name, depth, wall_time_ms, failed)
+
+    # end def
+
+
+class StageTimer(StageListener):
+    r"""
+    Records wall time of each finished stage.
+    """
+    def __init__(self) -> None:
+        self.stages_list: List[Dict] = []
+        self.lock = threading.Lock()
+
+    # end def
+
+    def on_stage_finish(
+            self,
+            name: str,
+            depth: int,
+            wall_time_ms: float,
+            failed: bool
+    ) -> None:
+        with self.lock:
+            self.stages_list.append({'stage': name, 'depth': depth, 'wall_time_ms': round(wall_time_ms, 3),
+                                     'failed': failed})
+
+    # end def
+
+    def to_json(self) -> str:
+        r"""
+        Return
+        -------
+        Stage timings as JSON `str`, in finish order
+        """
+        with self.lock:
+            return json.dumps({'stages': self.stages_list}, indent=2)
+
+    # end def
+
+    def store_on_disk(
+            self,
+            filepath: str
+    ) -> None:
+        with open(filepath, 'w') as timings_file:
+            timings_file.write(self.to_json())
+
+    # end def
+
+
+class ProgressListener(StageListener):
+    r"""
+    Shows one progress bar per stage, completed when the stage finishes.
+    """
+    def __init__(self) -> None:
+        # Loaded by online runs only, rich.progress is slow to import
+        from rich.progress import BarColumn, Progress, TextColumn, TimeElapsedColumn
+
+        self.progress = Progress(TextColumn('{task.description}'), BarColumn(), TimeElapsedColumn())
+        self.tasks_dict: Dict = {}
+        self.running_stages: int = 0
+        self.lock = threading.Lock()
+
+    # end def
+
+    def on_stage_start(
+            self,
+            name: str,
+            depth: int
+    ) -> None:
+        with self.lock:
+            if self.running_stages == 0:
+                self.progress.start()
+            self.running_stages += 1
+            self.tasks_dict[(name, depth)] = self.progress.add_task(f"[green]{'  ' * depth}{name + ':':<28}",
+                                                                    total=1)
+
+    # end def
+
+    def on_stage_finish(
+            self,
+            name: str,
+            depth: int,
+            wall_time_ms: float,
+            failed: bool
+    ) -> None:
+        with self.lock:
+            task = self.tasks_dict.pop((name, depth))
+            if failed:
+                self.progress.update(task, description=f"[red]{'  ' * depth}{name + ':':<28}")
+            else:
+                self.progress.update(task, completed=1)
+            self.progress.stop_task(task)
+
+            self.running_stages -= 1
+            if self.running_stages == 0:
+                self.progress.stop()
+
+    # end def
+
+
+# Shared by all stages of a run, listeners are subscribed by the entry point
+stage_events = StageEvents()
@@ -0,0 +1,401 @@
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import settings
+
+SCREENER_PATH = '/selecao_acoes.php'
+# Screener answer of a date without registers, as the site renders it
+SCREENER_EMPTY_PAGE = (
+    '<html><body><table id="tabela_selecao_acoes"><thead><tr><th>Ação</th></tr></thead>'
+    '<tbody><tr><td>Sem registros para mostrar</td></tr></tbody></table></body></html>'
+)
+
+
+def get_screener_date(query: str) -> str:
+    r"""
+    Return
+    -------
+    Link date (YYYYMMDD) of a screener URL `query`, dt_arr is URL encoded twice: %255B%2522YYYYMMDD%2522...
+    """
+    return json.loads(unquote(parse_qs(query)['dt_arr'][0]))[0]
+# end def
+
+
+class HttpArchive:
+    r"""
+    Pages of www.investsite.com.br keyed by path and query, so the same archive answers requests sent to any host.
+    Recorded from live runs through `record`, stored as gzip compressed JSON.
+    """
+    def __init__(
+            self,
+            pages_dict: Optional[Dict[str, str]] = None,
+            recorded_on: str = ''
+    ) -> None:
+        self.pages_dict: Dict[str, str] = pages_dict or {}
+        # Screener date (YYYYMMDD) of the recorded run
+        self.recorded_on: str = recorded_on
+        self.lock = threading.Lock()
+
+    # end def
+
+    @staticmethod
+    def get_key(url: str) -> str:
+        r"""
+        Return
+        -------
+        Path and query of `url`
+        """
+        url_parts = urlsplit(url)
+        return url_parts.path + ('?' + url_parts.query if url_parts.query else '')
+
+    # end def
+
+    def add_page(
+            self,
+            url: str,
+            page_text: str
+    ) -> None:
+        with self.lock:
+            self.pages_dict[self.get_key(url)] = page_text
+
+    # end def
+
+    def get_page(self, url: str) -> Optional[str]:
+        return self.pages_dict.get(self.get_key(url))
+
+    # end def
+
+    def get_screener_pages(self) -> Dict[str, str]:
+        r"""
+        Return
+        -------
+        `Dict` of link date (YYYYMMDD) to archived screener page key
+        """
+        screener_pages_dict = {}
+        for key in self.pages_dict:
+            url_parts = urlsplit(key)
+            if url_parts.path == SCREENER_PATH:
+                screener_pages_dict[get_screener_date(url_parts.query)] = key
+
+        return screener_pages_dict
+
+    # end def
+
+    def record(
+            self,
+            response,
+            *args,
+            **kwargs
+    ) -> None:
+        r"""
+        `requests` response hook: archive `response` if it is a page. Cached responses are archived as well.
+        """
+        if response.status_code == 200:
+            self.add_page(response.url or response.request.url, response.text)
+
+    # end def
+
+    @classmethod
+    def load(cls, filepath: str) -> 'HttpArchive':
+        try:
+            with gzip.open(filepath, 'rt', encoding='utf-8') as archive_file:
+                archive_dict = json.load(archive_file)
+        except (OSError, ValueError) as e:
+            print(f'Could not read the archive {filepath}, record one with python investsite_replay.py record\n'
+                  f'Error message: {e}')
+            raise SystemExit(1)
+
+        return cls(archive_dict['pages'], archive_dict['recorded_on'])
+
+    # end def
+
+    def store(self, filepath: str) -> None:
+        with self.lock, gzip.open(filepath, 'wt', encoding='utf-8') as archive_file:
+            json.dump({'recorded_on': self.recorded_on, 'pages': self.pages_dict}, archive_file, ensure_ascii=False)
+
+    # end def
+
+
+class ReplayServer:
+    r"""
+    Local stand-in for www.investsite.com.br answering from an `HttpArchive`, each answer delayed by
+    `latency_seconds` and replaced by `error_status_code` with probability `error_rate`. Statuses queued by
+    `inject_failures` answer the next requests before any page is served. Screener dates not archived get the empty
+    screener page, or with `fill_dates` the most recent archived page not after them, so runs on later days replay
+    the recorded screener. Other pages not archived get 404. Pages carry an ETag and conditional requests matching
+    it get 304 Not Modified. With `log_requests`, requested screener dates and stocks are kept in order.
+    """
+    def __init__(
+            self,
+            http_archive: HttpArchive,
+            host: str = '127.0.0.1',
+            port: int = 0,
+            latency_seconds: float = 0.0,
+            error_rate: float = 0.0,
+            error_status_code: int = 503,
+            fill_dates: bool = False,
+            seed: Optional[int] = None,
+            log_requests: bool = False
+    ) -> None:
+        if latency_seconds < 0 or not 0 <= error_rate <= 1:
+            print('Invalid replay latency or error rate.')
+            raise SystemExit(1)
+
+        self.http_archive = http_archive
+        self.latency_seconds = latency_seconds
+        self.error_rate = error_rate
+        self.error_status_code = error_status_code
+        self.fill_dates = fill_dates
+        self.screener_pages_dict = http_archive.get_screener_pages()
+        self.random = random.Random(seed)
+        self.log_requests = log_requests
+
+        self.requests_count: int = 0
+        self.errors_count: int = 0
+        self.not_found_count: int = 0
+        # Pages answered with 304 Not Modified to a conditional request
+        self.not_modified_count: int = 0
+        # Injected 429 / 5xx answers still to be sent, and how many were sent
+        self.injected_statuses_list: List[int] = []
+        self.retry_after_seconds: Optional[float] = None
+        self.failed_count: int = 0
+        self.requested_dates_list: List[str] = []
+        self.requested_stocks_list: List[str] = []
+        self.lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server_thread: Optional[threading.Thread] = None
+
+    # end def
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.server.server_address[0]}:{self.server.server_port}'
+
+    # end def
+
+    @property
+    def indicators_partial_url(self) -> str:
+        return self.base_url + settings.INDICATORS_PARTIAL_PATH
+
+    # end def
+
+    def inject_failures(
+            self,
+            status_codes_list: List[int],
+            retry_after_seconds: Optional[float] = None
+    ) -> None:
+        with self.lock:
+            self.injected_statuses_list.extend(status_codes_list)
+            self.retry_after_seconds = retry_after_seconds
+
+    # end def
+
+    def start(self) -> None:
+        # Short poll interval, stopping does not wait half a second
+        self.server_thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05},
+                                              daemon=True)
+        self.server_thread.start()
+
+    # end def
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    # end def
+
+    def __enter__(self):
+        # A fresh local site: failures seen by earlier clients of the process do not keep the circuit open
+        from http_client import investsite_circuit_breaker
+
+        investsite_circuit_breaker.reset()
+        self.start()
+        return self
+
+    # end def
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    # end def
+
+    def get_page(self, path: str) -> Optional[str]:
+        r"""
+        Return
+        -------
+        Archived page of `path`, `None` if it was not recorded
+        """
+        page_text = self.http_archive.get_page(path)
+        url_parts = urlsplit(path)
+        if page_text is not None or url_parts.path != SCREENER_PATH:
+            return page_text
+
+        if self.fill_dates:
+            link_date = get_screener_date(url_parts.query)
+            archived_dates_list = [archived_date for archived_date in self.screener_pages_dict
+                                   if archived_date <= link_date]
+            if archived_dates_list:
+                return self.http_archive.pages_dict[self.screener_pages_dict[max(archived_dates_list)]]
+
+        return SCREENER_EMPTY_PAGE
+
+    # end def
+
+    def record_request(self, path: str) -> None:
+        url_parts = urlsplit(path)
+        with self.lock:
+            if url_parts.path == SCREENER_PATH:
+                self.requested_dates_list.append(get_screener_date(url_parts.query))
+            else:
+                self.requested_stocks_list.append(parse_qs(url_parts.query).get('cod_negociacao', [''])[0])
+
+    # end def
+
+    def _handler_class(self):
+        replay_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with replay_server.lock:
+                    replay_server.requests_count += 1
+                    if replay_server.injected_statuses_list:
+                        error_status_code = replay_server.injected_statuses_list.pop(0)
+                        replay_server.failed_count += 1
+                    elif replay_server.random.random() < replay_server.error_rate:
+                        error_status_code = replay_server.error_status_code
+                        replay_server.errors_count += 1
+                    else:
+                        error_status_code = None
+
+                if replay_server.latency_seconds:
+                    time.sleep(replay_server.latency_seconds)
+
+                if error_status_code is not None:
+                    self.send_empty(error_status_code)
+                    return
+
+                if replay_server.log_requests:
+                    replay_server.record_request(self.path)
+
+                page_text = replay_server.get_page(self.path)
+                if page_text is None:
+                    with replay_server.lock:
+                        replay_server.not_found_count += 1
+                    self.send_empty(404)
+                    return
+
+                self.send_page(page_text)
+
+            def send_page(self, page_text):
+                body = page_text.encode('utf-8')
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    with replay_server.lock:
+                        replay_server.not_modified_count += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def send_empty(self, status):
+                self.send_response(status)
+                if status == 429 and replay_server.retry_after_seconds is not None:
+                    self.send_header('Retry-After', str(replay_server.retry_after_seconds))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    # end def
+
+
+def record(archive_filepath: str) -> HttpArchive:
+    r"""
+    Run the pipeline against the live site and archive every screener and detail page it receives. The incremental
+    run and the bankruptcy status cache are turned off so every checked stock is fetched, and the HTTP bankruptcy
+    checker is used since pages loaded by Chrome cannot be recorded.
+
+    Return
+    -------
+    Stored `HttpArchive`
+    """
+    from dataframe_parser import DataframeParser
+    from http_client import response_hooks_list
+    from local_stock_filter import LocalStockFilter
+    from web_driver import WebDriver
+
+    settings.INCREMENTAL_RUN = False
+    settings.BANKRUPTCY_STATUS_CACHE_TTL_SECONDS = 0
+    settings.USE_HTTP_BANKRUPTCY_CHECKER = True
+
+    http_archive = HttpArchive()
+    response_hooks_list.append(http_archive.record)
+    try:
+        web_driver = WebDriver()
+        LocalStockFilter().apply_financial_filters(DataframeParser(web_driver))
+    finally:
+        response_hooks_list.remove(http_archive.record)
+
+    http_archive.recorded_on = web_driver.updated_date
+    http_archive.store(archive_filepath)
+    return http_archive
+# end def
+
+
+def main(argv: Optional[List] = None) -> None:
+    parser = argparse.ArgumentParser(description='Record investsite pages or replay them from a local server')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help='Run the pipeline online and archive the received pages')
+    record_parser.add_argument('--archive', default=settings.REPLAY_ARCHIVE_FILEPATH)
+
+    serve_parser = subparsers.add_parser('serve', help='Serve an archive as a local investsite')
+    serve_parser.add_argument('--archive', default=settings.REPLAY_ARCHIVE_FILEPATH)
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=settings.REPLAY_PORT)
+    serve_parser.add_argument('--latency-ms', type=float, default=0.0)
+    serve_parser.add_argument('--error-rate', type=float, default=0.0)
+    serve_parser.add_argument('--error-status', type=int, default=503)
+    serve_parser.add_argument('--fill-dates', action='store_true',
+                              help='Answer later screener dates with the most recent archived page')
+    serve_parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        http_archive = record(args.archive)
+        print(f'Recorded {len(http_archive.pages_dict)} pages of {http_archive.recorded_on} into {args.archive}')
+        return
+
+    http_archive = HttpArchive.load(args.archive)
+    with ReplayServer(http_archive, args.host, args.port, args.latency_ms / 1000, args.error_rate,
+                      args.error_status, args.fill_dates, args.seed) as replay_server:
+        print(f'Replaying {len(http_archive.pages_dict)} pages of {http_archive.recorded_on} on '
+              f'{replay_server.base_url}, set INVESTSITE_BASE_URL = {replay_server.base_url!r} in settings.py')
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+# end def
+
+
+if __name__ == "__main__":
+    main()
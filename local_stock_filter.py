@@ -1,24 +1,32 @@
-import os
-import threading
 import time
-from collections import Counter
+from datetime import date, datetime
+from io import StringIO
+from typing import Callable, Dict, List, Optional, Tuple
 
-import numpy as np
 import pandas as pd
 import rich
-from rich.progress import Progress
 
 import settings
+from bankruptcy_status_cache import BankruptcyStatusCache
+from company_index import CompanyIndex, get_company_codes
 from dataframe_parser import DataframeParser
+from incremental_run import IncrementalRun
+from instrumentation import stage_events
 from local_filter import LocalFilter
-from web_stock_filter import WebStockFilter
+from screen_query import Screen, ScreenQueryEngine
+from snapshot_store import CANDIDATES_SNAPSHOT, PREPARED_SNAPSHOT, RAW_SNAPSHOT, SnapshotStore
 
 
 class LocalStockFilter(LocalFilter):
-    companies_in_bankruptcy_list = []
-
     def __init__(self):
-        self.indicators_partial_url: str = 'https://www.investsite.com.br/principais_indicadores.php?cod_negociacao='
+        self.indicators_partial_url: str = settings.INVESTSITE_BASE_URL + settings.INDICATORS_PARTIAL_PATH
+        self.snapshot_store = SnapshotStore(settings.SNAPSHOTS_DIRPATH)
+        self.snapshot_date: date = date.today()
+        self.incremental_run: Optional[IncrementalRun] = None
+        # Result of the last bankruptcy check of this run
+        self.companies_in_bankruptcy_list: List = []
+        # Created on the first status not cached, its connections are reused by the next batches
+        self.bankruptcy_checker = None
     # end def
 
     def apply_financial_filters(self, dataframe_parser: DataframeParser) -> pd.DataFrame:
@@ -32,47 +40,114 @@ class LocalStockFilter(LocalFilter):
         """
 
         if not settings.USE_PICKLE_DATAFRAME:
-            stocks_list = dataframe_parser.web_driver.get_stocks_table()
-            stocks_data_frame = dataframe_parser.prepare_dataframe(stocks_list)
+            if settings.USE_SCREENER_TABLE_PARSER:
+                page_text = dataframe_parser.web_driver.get_stocks_page()
+                stocks_data_frame = dataframe_parser.prepare_dataframe_from_page(page_text)
+                if settings.STORE_PICLE:
+                    stocks_list = pd.read_html(StringIO(page_text), decimal=',', thousands='.')
+            else:
+                stocks_list = dataframe_parser.web_driver.get_stocks_table()
+                stocks_data_frame = dataframe_parser.prepare_dataframe(stocks_list)
+
+            # Snapshots are partitioned by screener date
+            if dataframe_parser.web_driver.updated_date:
+                self.snapshot_date = datetime.strptime(dataframe_parser.web_driver.updated_date, '%Y%m%d').date()
+
+            if settings.STORE_PICLE:
+                self.snapshot_store.store_snapshot(RAW_SNAPSHOT, self.snapshot_date,
+                                                   dataframe_parser.extract_dataframe(stocks_list))
+                self.snapshot_store.store_snapshot(PREPARED_SNAPSHOT, self.snapshot_date, stocks_data_frame)
         else:
             # Creates empty dataframe
             stocks_data_frame = pd.DataFrame()
 
         if not stocks_data_frame.empty or settings.USE_PICKLE_DATAFRAME:
-            with Progress() as progress:
-                task1 = progress.add_task("[green]Applying financial filters:", total=100)
-
-                while not progress.finished:
-                    if not settings.USE_PICKLE_DATAFRAME:
-                        # First filter: Drop all Financial_Volume_(%) less than 1_000_000 R$
-                        stocks_data_frame = self.drop_low_financial_volume(stocks_data_frame)
-
-                        # Second filter: Drop companies with negative or zero profit EBIT_Margin_(%)
-                        stocks_data_frame = self.drop_negative_profit_stocks(stocks_data_frame)
-                        time.sleep(0.5)
-                        progress.update(task1, advance=40)
-
-                        # Third filter: Sort from the cheapest to expensive stocks EV_EBIT
-                        stocks_data_frame = self.sort_by_ev_ebit(stocks_data_frame)
-
-                        # Fourth filter: Remove stocks from the same company with less Financial_Volume_(%)
-                        stocks_data_frame = self.drop_duplicated_stocks_by_financial_volume(stocks_data_frame)
-                        time.sleep(0.5)
-                        progress.update(task1, advance=40)
+            with stage_events.stage('Applying financial filters'):
+                if not settings.USE_PICKLE_DATAFRAME:
+                    # First to fourth filters: Drop low Financial_Volume_(%) and negative EBIT_Margin_(%),
+                    # remove stocks from the same company with less Financial_Volume_(%) and keep only the
+                    # cheapest EV_EBIT stocks worth checking for bankruptcy
+                    if settings.INCREMENTAL_RUN and not settings.UNIT_TEST:
+                        stocks_data_frame = self.select_cheapest_stocks_incrementally(stocks_data_frame)
                     else:
-                        stocks_data_frame = pd.DataFrame()
+                        stocks_data_frame = self.select_cheapest_stocks(stocks_data_frame)
+                else:
+                    stocks_data_frame = pd.DataFrame()
 
-                    # Fifth filter: Remove stocks in bankruptcy
+                # Fifth filter: Remove stocks in bankruptcy
+                with stage_events.stage('Dropping stocks in bankruptcy'):
                     stocks_data_frame = self.drop_stocks_in_bankruptcy(stocks_data_frame)
-                    time.sleep(0.5)
-                    progress.update(task1, advance=20)
-                    break
         else:
             print('Cannot apply filters, dataframe is empty or corrupted.')
             raise SystemExit(1)
 
+        if self.incremental_run:
+            self.incremental_run.report()
+
         rich.print('[blue]Finished')
-        return stocks_data_frame.head(20)
+        return stocks_data_frame.head(settings.SELECTED_STOCKS_LIMIT)
+
+    # end def
+
+    def select_cheapest_stocks_incrementally(
+            self,
+            stocks_data_frame: pd.DataFrame
+    ) -> pd.DataFrame:
+        r"""
+        Gets prepared `stocks_data_frame`, diffs it against the previous prepared snapshot and reuses the previous
+        candidates when no row and no threshold changed, otherwise selects them again. Bankruptcy statuses of
+        unchanged candidates are reused by `get_checked_statuses` until the status cache TTL.
+
+        Return
+        -------
+        Pandas `DataFrame` sorted from the cheapest to expensive stocks EV_EBIT
+        """
+        self.incremental_run = IncrementalRun(self.snapshot_store, self.snapshot_date)
+        self.incremental_run.diff(stocks_data_frame)
+
+        selection_dict = {'top_n': settings.BANKRUPTCY_CANDIDATES_LIMIT,
+                          'financial_volume': settings.MIN_FINANCIAL_VOLUME,
+                          'ebit_margin': settings.MIN_EBIT_MARGIN}
+        candidates_data_frame = self.incremental_run.load_previous_candidates(selection_dict)
+        if candidates_data_frame is None:
+            candidates_data_frame = self.select_cheapest_stocks(stocks_data_frame, **selection_dict)
+        self.incremental_run.store_candidates(candidates_data_frame, selection_dict)
+
+        return candidates_data_frame
+
+    # end def
+
+    @staticmethod
+    def select_cheapest_stocks(
+            stocks_data_frame: pd.DataFrame,
+            top_n: Optional[int] = None,
+            financial_volume: Optional[int] = None,
+            ebit_margin: Optional[float] = None
+    ) -> pd.DataFrame:
+        r"""
+        Gets `stocks_data_frame`, keeps stocks with Financial_Volume_(%) and EBIT_Margin_(%) not less than the
+        thresholds, removes stocks from the same company with less Financial_Volume_(%) and selects the `top_n`
+        cheapest stocks by EV_EBIT. Same result as the separate filters and sort, evaluated as a single `Screen`.
+        Thresholds not given are read from `settings` on each call.
+
+        Return
+        -------
+        Pandas `DataFrame` sorted from the cheapest to expensive stocks EV_EBIT
+        """
+        top_n = settings.BANKRUPTCY_CANDIDATES_LIMIT if top_n is None else top_n
+        financial_volume = settings.MIN_FINANCIAL_VOLUME if financial_volume is None else financial_volume
+        ebit_margin = settings.MIN_EBIT_MARGIN if ebit_margin is None else ebit_margin
+        if financial_volume <= 0:
+            print('Cannot drop negative financial volume.')
+            raise SystemExit(1)
+        if top_n <= 0:
+            print('Cannot select a non positive number of stocks.')
+            raise SystemExit(1)
+
+        screen = Screen('cheapest', [('Financial_Volume_(%)', '>=', financial_volume),
+                                     ('EBIT_Margin_(%)', '>=', ebit_margin)], sort_by='EV_EBIT', top_n=top_n)
+
+        return ScreenQueryEngine(stocks_data_frame).select(screen)
 
     # end def
 
@@ -143,58 +218,21 @@ class LocalStockFilter(LocalFilter):
     ) -> pd.DataFrame:
         r"""
         Gets `stocks_data_frame` and remove stocks from the same company with less Financial_Volume_(%).
+        Companies are grouped by the first four letters of the stock name, the remaining stocks keep their order.
 
         Return
         -------
         Pandas `DataFrame`
         """
-        # Maintain only first 40 most valuable stocks
-        stocks_data_frame.drop(stocks_data_frame.index[41:], inplace=True)
         stocks_data_frame.reset_index(drop=True, inplace=True)
 
-        # Gets stock names and financial volumes to map each other
-        companies_stock_name_list = list(stocks_data_frame['Stock'])
-        companies_stock_fv_list = list(stocks_data_frame['Financial_Volume_(%)'])
-        companies_stock_name_largest_fv_dict = dict(map(
-            lambda i, j: (i, j), companies_stock_name_list, companies_stock_fv_list))
-
-        # Counter same companies (Same four letters in stock name) to compare the financial volume
-        companies_similar_stock_counter_dict = dict(Counter(k[:4] for k in companies_stock_name_largest_fv_dict))
-
-        # Pop stocks which are unique
-        for key, value in companies_similar_stock_counter_dict.copy().items():
-            if value == 1:
-                companies_similar_stock_counter_dict.pop(key)
-
-        # Creates dict with non-unique stocks with value as zero to be filled with financial volume
-        largest_fv_dict = {key: 0 for key in companies_similar_stock_counter_dict}
-        to_remove_keys_set = set()
-
-        # Order by financial volume from the largest to smallest
-        companies_stock_name_largest_fv_dict = dict(sorted(companies_stock_name_largest_fv_dict.items(),
-                                                           key=lambda x: x[1], reverse=False))
-
-        # Process non-unique stocks and fills with the greatest financial volume
-        for key_i, value_i in companies_similar_stock_counter_dict.items():
-            counter = value_i
-            for key_j, value_j in companies_stock_name_largest_fv_dict.items():
-                if counter == 0:
-                    del largest_fv_dict[key_i]
-                    break
-                if key_i == key_j[:4]:
-                    counter -= 1
-                    if value_j > largest_fv_dict[key_i]:
-                        largest_fv_dict[key_i] = value_j
-                        largest_fv_dict[key_j] = largest_fv_dict[key_i]
-                        if counter > 0:
-                            to_remove_keys_set.add(key_j)
-
-        # Removes the smallest financial volumes repeated stocks
-        stocks_data_frame.drop(pd.Index(np.where(stocks_data_frame['Stock'].isin(list(to_remove_keys_set)))[0]),
-                               inplace=True)
-        stocks_data_frame.reset_index(drop=True, inplace=True)
+        # First stock of each company by descending financial volume, stable sort keeps current order on ties
+        largest_fv_first_idx = (stocks_data_frame['Financial_Volume_(%)']
+                                .sort_values(ascending=False, kind='stable').index)
+        companies_prefix_series = get_company_codes(stocks_data_frame['Stock']).reindex(largest_fv_first_idx)
+        largest_fv_idx = largest_fv_first_idx[~companies_prefix_series.duplicated().to_numpy()]
 
-        return stocks_data_frame
+        return stocks_data_frame[stocks_data_frame.index.isin(largest_fv_idx)].reset_index(drop=True)
 
     # end def
 
@@ -203,68 +241,196 @@ class LocalStockFilter(LocalFilter):
             stocks_data_frame: pd.DataFrame
     ) -> pd.DataFrame:
         r"""
-        Gets `stocks_data_frame` and drop stocks in bankruptcy.
+        Gets `stocks_data_frame` sorted from the cheapest to expensive EV_EBIT and keeps its operational stocks,
+        checked in this order until SELECTED_STOCKS_LIMIT of them are found.
 
         Return
         -------
         Pandas `DataFrame`
         """
         if settings.STORE_PICLE:
-            # Stores dataframe on disk and exits.
-            stocks_data_frame.to_pickle(settings.PICKLE_FILEPATH)
+            # Stores candidates snapshot on disk and exits.
+            self.snapshot_store.store_snapshot(CANDIDATES_SNAPSHOT, self.snapshot_date, stocks_data_frame)
             exit()
 
         if settings.USE_PICKLE_DATAFRAME:
-            # Reads from picle to speed up tests loading dataframe.
-            if os.path.exists(settings.PICKLE_FILEPATH):
-                stocks_data_frame = pd.read_pickle(settings.PICKLE_FILEPATH)
-            else:
-                print("Pickle file not found, set STORE_PICLE as True")
-                exit()
+            # Reads the most recent candidates snapshot, memory mapped, to speed up tests loading dataframe.
+            stocks_data_frame = self.snapshot_store.load_snapshot(CANDIDATES_SNAPSHOT)
 
         companies_stock_name_list = list(stocks_data_frame['Stock'])
-        companies_stock_link_list = [self.indicators_partial_url + stock_check_link
-                                     for stock_check_link in companies_stock_name_list]
-
-        # Creating list of links in format:
-        # <INDICATORS_LINK> + <STOCK_NAME>
-        number_of_threads = 4
-
-        if settings.DEBUG_THREADS:
-            print(f"Initializing analysis with {number_of_threads} cores, each core with "
-                  f"{int(len(companies_stock_link_list) / number_of_threads)} tasks")
-        threads = []
-        next_first_half_chunk = 0
-
-        if not settings.UNIT_TEST:
-            # Sharing data between processes that can be serialized.
-            for current_thread in range(1, number_of_threads + 1):
-                # Dividing companies_stock_link_list for each current_thread to optimize requests
-                first_half_per_thread = next_first_half_chunk
-                second_half_per_thread = int(len(companies_stock_link_list) * current_thread / number_of_threads)
-                next_first_half_chunk = second_half_per_thread + 1
-
-                if settings.DEBUG_THREADS:
-                    print(f"Core {current_thread} processing from {first_half_per_thread} to {second_half_per_thread}")
-
-                threads.append(
-                    threading.Thread(
-                        target=WebStockFilter().check_bankruptcy,
-                        kwargs={
-                            'companies_stock_link_list': companies_stock_link_list,
-                            'companies_in_bankruptcy_list': self.companies_in_bankruptcy_list,
-                            'first_half_per_thread': first_half_per_thread,
-                            'second_half_per_thread': second_half_per_thread
-                        },
-                        daemon=True
-                    ),
-                )
-
-            [th.start() for th in threads]
-            [th.join() for th in threads]
-
-        stocks_data_frame = stocks_data_frame[~stocks_data_frame.Stock.isin(self.companies_in_bankruptcy_list)]
 
-        return stocks_data_frame
+        if settings.UNIT_TEST:
+            return stocks_data_frame[~stocks_data_frame.Stock.isin(self.companies_in_bankruptcy_list)]
+
+        if settings.USE_HTTP_BANKRUPTCY_CHECKER:
+            bankruptcy_status_cache = BankruptcyStatusCache(settings.BANKRUPTCY_STATUS_CACHE_FILEPATH,
+                                                            settings.BANKRUPTCY_STATUS_CACHE_TTL_SECONDS)
+            checked_status_dict = {}
+
+            def check_statuses(stocks_batch_list: List) -> Dict[str, bool]:
+                checked_status_dict.update(self.get_checked_statuses(stocks_batch_list, bankruptcy_status_cache))
+                return {stock: checked_status_dict[stock][0] for stock in stocks_batch_list}
+
+            companies_status_dict = self.check_statuses_in_rank_order(companies_stock_name_list, check_statuses)
+            self.print_cache_stats(bankruptcy_status_cache)
+        else:
+            companies_status_dict = self.check_statuses_in_rank_order(companies_stock_name_list,
+                                                                       self.get_statuses_with_browser)
+            checked_at = time.time()
+            checked_status_dict = {stock: (is_operational, checked_at)
+                                   for stock, is_operational in companies_status_dict.items()}
+
+        if self.incremental_run:
+            self.incremental_run.store_statuses(checked_status_dict)
+
+        self.companies_in_bankruptcy_list = [stock for stock, is_operational in companies_status_dict.items()
+                                             if not is_operational]
+
+        # Candidates after the last checked one are left out, the first top N healthy stocks were already found
+        return stocks_data_frame[stocks_data_frame.Stock.map(companies_status_dict).eq(True).to_numpy()]
+
+    # end def
+
+    @staticmethod
+    def check_statuses_in_rank_order(
+            companies_stock_name_list: List,
+            check_statuses: Callable[[List], Dict[str, bool]],
+            top_n: Optional[int] = None,
+            batch_size: Optional[int] = None
+    ) -> Dict[str, bool]:
+        r"""
+        Gets `List` of stock names sorted from the cheapest to expensive EV_EBIT and checks them in this order, up to
+        `batch_size` concurrently, until `top_n` operational stocks are found. Each batch holds no more stocks than
+        the operational ones still missing, so no stock after the top N operational ones is checked. `top_n` and
+        `batch_size` not given are read from `settings` on each call.
+
+        Return
+        -------
+        `Dict` of checked stock name to `True` when the company is operational, in rank order
+        """
+        top_n = settings.SELECTED_STOCKS_LIMIT if top_n is None else top_n
+        batch_size = settings.BANKRUPTCY_CHECK_BATCH_SIZE if batch_size is None else batch_size
+        if top_n <= 0 or batch_size <= 0:
+            print('Invalid number of stocks to select or batch size.')
+            raise SystemExit(1)
+
+        companies_status_dict = {}
+        operational_stocks = 0
+        position = 0
+        while position < len(companies_stock_name_list) and operational_stocks < top_n:
+            stocks_batch_list = companies_stock_name_list[position:position + min(batch_size,
+                                                                                 top_n - operational_stocks)]
+            batch_status_dict = check_statuses(stocks_batch_list)
+            for stock in stocks_batch_list:
+                companies_status_dict[stock] = batch_status_dict[stock]
+            operational_stocks += sum(batch_status_dict[stock] for stock in stocks_batch_list)
+            position += len(stocks_batch_list)
+
+        rich.print(f'[blue]Bankruptcy check: {position} of {len(companies_stock_name_list)} candidates checked, '
+                   f'{operational_stocks} operational')
+
+        return companies_status_dict
+
+    # end def
+
+    def get_statuses_with_browser(
+            self,
+            companies_stock_name_list: List
+    ) -> Dict[str, bool]:
+        from web_stock_filter import WebStockFilter
+
+        # Every link is taken once from a shared work queue by DETAIL_CHECK_WORKERS browsers
+        companies_in_bankruptcy_list = WebStockFilter().check_bankruptcy(
+            [self.indicators_partial_url + stock for stock in companies_stock_name_list])
+
+        return {stock: stock not in companies_in_bankruptcy_list for stock in companies_stock_name_list}
+
+    # end def
+
+    def check_bankruptcy_with_cache(
+            self,
+            companies_stock_name_list: List
+    ) -> List:
+        r"""
+        Gets `List` of stock names, reuses statuses cached on disk and only fetches missing or expired ones.
+        A status known for one ticker of a company is reused for its other tickers.
+
+        Return
+        -------
+        `List` of stocks in bankruptcy
+        """
+        bankruptcy_status_cache = BankruptcyStatusCache(settings.BANKRUPTCY_STATUS_CACHE_FILEPATH,
+                                                        settings.BANKRUPTCY_STATUS_CACHE_TTL_SECONDS)
+        checked_status_dict = self.get_checked_statuses(companies_stock_name_list, bankruptcy_status_cache)
+        self.print_cache_stats(bankruptcy_status_cache)
+
+        if self.incremental_run:
+            self.incremental_run.store_statuses(checked_status_dict)
+
+        return [stock for stock in companies_stock_name_list if not checked_status_dict[stock][0]]
+
+    # end def
+
+    def get_statuses_with_cache(
+            self,
+            companies_stock_name_list: List,
+            bankruptcy_status_cache: BankruptcyStatusCache
+    ) -> Dict[str, bool]:
+        r"""
+        Gets `List` of stock names, takes the statuses known by the incremental run or cached on disk and fetches
+        the others, storing them in `bankruptcy_status_cache`.
+
+        Return
+        -------
+        `Dict` of stock name to `True` when the company is operational, in the received order
+        """
+        return {stock: is_operational for stock, (is_operational, _) in
+                self.get_checked_statuses(companies_stock_name_list, bankruptcy_status_cache).items()}
+
+    # end def
+
+    def get_checked_statuses(
+            self,
+            companies_stock_name_list: List,
+            bankruptcy_status_cache: BankruptcyStatusCache
+    ) -> Dict[str, Tuple[bool, float]]:
+        r"""
+        Same as `get_statuses_with_cache`, keeping the time each status was fetched: statuses known by the incremental
+        run or cached on disk keep their original fetch time.
+
+        Return
+        -------
+        `Dict` of stock name to (`True` when the company is operational, fetched at timestamp), in the received order
+        """
+        checked_status_dict = {}
+        if self.incremental_run:
+            checked_status_dict.update(self.incremental_run.get_known_statuses(companies_stock_name_list))
+
+        checked_status_dict.update(bankruptcy_status_cache.get_checked_statuses(
+            [stock for stock in companies_stock_name_list if stock not in checked_status_dict]))
+        checked_status_dict = CompanyIndex(companies_stock_name_list).get_company_statuses(checked_status_dict)
+
+        companies_to_fetch_list = [stock for stock in companies_stock_name_list if stock not in checked_status_dict]
+        if companies_to_fetch_list:
+            if self.bankruptcy_checker is None:
+                # HTTP modules are only loaded when a status is not cached
+                from bankruptcy_checker import BankruptcyChecker
+
+                self.bankruptcy_checker = BankruptcyChecker(self.indicators_partial_url)
+
+            fetched_status_dict = self.bankruptcy_checker.check_statuses(companies_to_fetch_list)
+            bankruptcy_status_cache.store_statuses(fetched_status_dict)
+            fetched_at = time.time()
+            checked_status_dict.update({stock: (is_operational, fetched_at)
+                                        for stock, is_operational in fetched_status_dict.items()})
+
+        return {stock: checked_status_dict[stock] for stock in dict.fromkeys(companies_stock_name_list)}
+
+    # end def
+
+    @staticmethod
+    def print_cache_stats(bankruptcy_status_cache: BankruptcyStatusCache) -> None:
+        rich.print(f'[blue]Bankruptcy status cache: {bankruptcy_status_cache.hits} hits, '
+                   f'{bankruptcy_status_cache.misses} misses')
 
     # end def
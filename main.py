@@ -1,27 +1,52 @@
-import time
+import sys
 import warnings
 
-from linetimer import CodeTimer
-
 import settings
 from dataframe_parser import DataframeParser
-from file_manager_sheet import FileManagerXLSX
+from instrumentation import StageTimer, stage_events
 from local_stock_filter import LocalStockFilter
-from web_driver import WebDriver
+from web_driver_pool import web_driver_pool
 
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
 
 def main():
-    with CodeTimer("main program"):
-        web_driver = WebDriver()
-        dataframe_parser = DataframeParser(web_driver)
-        local_stock_filter = LocalStockFilter()
-        stocks_data_frame = local_stock_filter.apply_financial_filters(dataframe_parser)
-
-        if not settings.USE_PICKLE_DATAFRAME:
-            FileManagerXLSX().store_on_disk(stocks_data_frame)
-            time.sleep(2)
+    stage_timer = stage_events.subscribe(StageTimer())
+    progress_listener = None
+    try:
+        with stage_events.stage('main program'):
+            # HTTP, browser, progress bars and spreadsheet modules are loaded by online runs only
+            if settings.USE_PICKLE_DATAFRAME:
+                web_driver = None
+            else:
+                from instrumentation import ProgressListener
+                from web_driver import WebDriver
+
+                progress_listener = stage_events.subscribe(ProgressListener())
+                web_driver = WebDriver()
+
+            dataframe_parser = DataframeParser(web_driver)
+            local_stock_filter = LocalStockFilter()
+            stocks_data_frame = local_stock_filter.apply_financial_filters(dataframe_parser)
+
+            if not settings.USE_PICKLE_DATAFRAME:
+                from file_manager_formats import FileManagerFormats
+
+                with stage_events.stage('Storing on disk'):
+                    FileManagerFormats().store_on_disk(stocks_data_frame)
+    finally:
+        web_driver_pool.shutdown()
+        if progress_listener is not None:
+            stage_events.unsubscribe(progress_listener)
+        stage_events.unsubscribe(stage_timer)
+        stage_timer.store_on_disk(settings.STAGE_TIMINGS_FILEPATH)
+        print(stage_timer.to_json())
+
+        # Offline runs never load the HTTP modules, there are no stats to print
+        if 'http_cache' in sys.modules:
+            http_cache_dict = sys.modules['http_cache'].http_cache_stats.to_dict()
+            print(f'HTTP cache: {http_cache_dict["hits"]} hits, {http_cache_dict["misses"]} misses, '
+                  f'{http_cache_dict["bytes_saved"] / 1024:.1f} KiB saved')
 # end def
 
 
@@ -0,0 +1,207 @@
+import argparse
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import rich
+
+import settings
+from company_index import get_company_codes
+from snapshot_store import PREPARED_SNAPSHOT, SnapshotStore
+
+OPERATORS_DICT = {
+    '>=': np.greater_equal,
+    '>': np.greater,
+    '<=': np.less_equal,
+    '<': np.less,
+    '==': np.equal,
+    '!=': np.not_equal,
+}
+
+
+class Screen:
+    r"""
+    Declarative screen over the prepared table: keep rows matching every `(column, operator, value)` filter,
+    optionally remove stocks from the same company with less Financial_Volume_(%), then select the `top_n` rows by
+    `sort_by`.
+    """
+    def __init__(
+            self,
+            name: str,
+            filters_list: Optional[List[Tuple]] = None,
+            sort_by: str = 'EV_EBIT',
+            ascending: bool = True,
+            top_n: int = settings.SELECTED_STOCKS_LIMIT,
+            drop_duplicated_companies: bool = True
+    ) -> None:
+        self.name = name
+        self.filters_list = [tuple(stock_filter) for stock_filter in filters_list or []]
+        self.sort_by = sort_by
+        self.ascending = ascending
+        self.top_n = top_n
+        self.drop_duplicated_companies = drop_duplicated_companies
+
+        for stock_filter in self.filters_list:
+            if len(stock_filter) != 3 or stock_filter[1] not in OPERATORS_DICT:
+                print(f'Invalid filter {stock_filter} on screen {name}, expected [column, operator, value] with '
+                      f'operator in {list(OPERATORS_DICT)}.')
+                raise SystemExit(1)
+        if top_n <= 0:
+            print('Cannot select a non positive number of stocks.')
+            raise SystemExit(1)
+
+    # end def
+
+    @classmethod
+    def from_dict(cls, screen_dict: Dict) -> 'Screen':
+        r"""
+        Build a screen from its JSON form:
+        {"name": "cheapest", "filters": [["EBIT_Margin_(%)", ">=", 0]], "sort_by": "EV_EBIT", "top_n": 20}
+
+        Return
+        -------
+        `Screen`
+        """
+        keys_dict = {'name': 'name', 'filters': 'filters_list', 'sort_by': 'sort_by', 'ascending': 'ascending',
+                     'top_n': 'top_n', 'drop_duplicated_companies': 'drop_duplicated_companies'}
+        unknown_keys_list = [key for key in screen_dict if key not in keys_dict]
+        if 'name' not in screen_dict or unknown_keys_list:
+            print(f'Invalid screen {screen_dict}, expected a name and keys in {list(keys_dict)}.')
+            raise SystemExit(1)
+
+        return cls(**{keys_dict[key]: value for key, value in screen_dict.items()})
+
+    # end def
+
+
+def load_screens(filepath: str = settings.SCREENS_FILEPATH) -> List[Screen]:
+    r"""
+    Load the `List` of screens stored as JSON.
+
+    Return
+    -------
+    `List` of `Screen`
+    """
+    try:
+        with open(filepath, encoding='utf-8') as screens_file:
+            return [Screen.from_dict(screen_dict) for screen_dict in json.load(screens_file)]
+    except (OSError, ValueError) as e:
+        print(f'{e} - Could not load the screens.')
+        raise SystemExit(1)
+# end def
+
+
+class ScreenQueryEngine:
+    r"""
+    Evaluates several screens over the same prepared table. Column arrays, filter masks and the company
+    de-duplication order are computed once and shared by every screen, a filter used by several screens is evaluated
+    once.
+    """
+    def __init__(self, stocks_data_frame: pd.DataFrame) -> None:
+        self.stocks_data_frame = stocks_data_frame.reset_index(drop=True)
+        self.masks_dict: Dict[Tuple, np.ndarray] = {}
+        self._largest_fv_first_idx: Optional[np.ndarray] = None
+        self._companies_prefix_array: Optional[np.ndarray] = None
+
+    # end def
+
+    def get_mask(self, stock_filter: Tuple) -> np.ndarray:
+        if stock_filter not in self.masks_dict:
+            column, operator, value = stock_filter
+            if column not in self.stocks_data_frame.columns:
+                print(f'Cannot filter by {column}, column not in the prepared table.')
+                raise SystemExit(1)
+            self.masks_dict[stock_filter] = OPERATORS_DICT[operator](self.stocks_data_frame[column].to_numpy(), value)
+
+        return self.masks_dict[stock_filter]
+
+    # end def
+
+    def get_largest_fv_first_idx(self) -> Tuple[np.ndarray, np.ndarray]:
+        r"""
+        Row positions by descending Financial_Volume_(%), stable on ties, and the company prefix of each of them.
+        Same grouping as `LocalStockFilter.drop_duplicated_stocks_by_financial_volume`.
+
+        Return
+        -------
+        `Tuple` of row positions and company prefixes `ndarray`
+        """
+        if self._largest_fv_first_idx is None:
+            self._largest_fv_first_idx = (self.stocks_data_frame['Financial_Volume_(%)']
+                                          .sort_values(ascending=False, kind='stable').index.to_numpy())
+            self._companies_prefix_array = (get_company_codes(self.stocks_data_frame['Stock'])
+                                            .to_numpy()[self._largest_fv_first_idx])
+
+        return self._largest_fv_first_idx, self._companies_prefix_array
+
+    # end def
+
+    def select(self, screen: Screen) -> pd.DataFrame:
+        r"""
+        Evaluate one screen. Ties on `sort_by` keep the table order and rows without `sort_by` are not selected.
+
+        Return
+        -------
+        Pandas `DataFrame` with at most `top_n` rows sorted by `sort_by`
+        """
+        if screen.sort_by not in self.stocks_data_frame.columns:
+            print(f'Cannot sort by {screen.sort_by}, column not in the prepared table.')
+            raise SystemExit(1)
+
+        mask = np.ones(len(self.stocks_data_frame), dtype=bool)
+        for stock_filter in screen.filters_list:
+            mask &= self.get_mask(stock_filter)
+
+        if screen.drop_duplicated_companies:
+            largest_fv_first_idx, companies_prefix_array = self.get_largest_fv_first_idx()
+            kept_mask = mask[largest_fv_first_idx]
+            kept_idx = largest_fv_first_idx[kept_mask]
+            rows_idx = np.sort(kept_idx[~pd.Series(companies_prefix_array[kept_mask]).duplicated().to_numpy()])
+        else:
+            rows_idx = np.flatnonzero(mask)
+
+        stocks_data_frame = self.stocks_data_frame.iloc[rows_idx]
+        if screen.ascending:
+            stocks_data_frame = stocks_data_frame.nsmallest(screen.top_n, screen.sort_by)
+        else:
+            stocks_data_frame = stocks_data_frame.nlargest(screen.top_n, screen.sort_by)
+
+        return stocks_data_frame.reset_index(drop=True)
+
+    # end def
+
+    def run(self, screens_list: List[Screen]) -> Dict[str, pd.DataFrame]:
+        r"""
+        Evaluate every screen in one pass over the shared table.
+
+        Return
+        -------
+        `Dict` of screen name to Pandas `DataFrame`, in the screens order
+        """
+        screens_name_list = [screen.name for screen in screens_list]
+        if len(set(screens_name_list)) != len(screens_name_list):
+            print(f'Screen names must be unique: {screens_name_list}')
+            raise SystemExit(1)
+
+        return {screen.name: self.select(screen) for screen in screens_list}
+
+    # end def
+
+
+def main(argv: Optional[List] = None) -> None:
+    parser = argparse.ArgumentParser(description='Run the screens over the latest prepared snapshot')
+    parser.add_argument('screens_filepath', nargs='?', default=settings.SCREENS_FILEPATH)
+    args = parser.parse_args(argv)
+
+    screens_list = load_screens(args.screens_filepath)
+    stocks_data_frame = SnapshotStore(settings.SNAPSHOTS_DIRPATH).load_snapshot(PREPARED_SNAPSHOT)
+
+    for screen_name, screen_data_frame in ScreenQueryEngine(stocks_data_frame).run(screens_list).items():
+        rich.print(f'[blue]{screen_name}: {len(screen_data_frame)} stocks')
+        print(screen_data_frame.to_string())
+# end def
+
+
+if __name__ == "__main__":
+    main()
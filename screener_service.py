@@ -0,0 +1,327 @@
+import json
+import threading
+import time
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+import settings
+from bankruptcy_status_cache import BankruptcyStatusCache
+from dataframe_parser import DataframeParser
+from http_cache import http_cache_stats
+from http_client import investsite_circuit_breaker
+from instrumentation import stage_events
+from local_stock_filter import LocalStockFilter
+from web_driver import WebDriver
+
+
+class ScreenerService:
+    r"""
+    Keeps the latest prepared screener table and the candidates bankruptcy statuses in memory, refreshes them on a
+    schedule and answers top N queries over a local HTTP API:
+
+    GET  /top?n=20&min_financial_volume=1000000&min_ebit_margin=0
+    GET  /health
+    POST /refresh
+    """
+    def __init__(
+            self,
+            web_driver: Optional[WebDriver] = None,
+            indicators_partial_url: Optional[str] = None,
+            refresh_interval_seconds: float = settings.SERVICE_REFRESH_INTERVAL_SECONDS,
+            host: str = settings.SERVICE_HOST,
+            port: int = settings.SERVICE_PORT
+    ) -> None:
+        self.web_driver = web_driver or WebDriver()
+        self.dataframe_parser = DataframeParser(self.web_driver)
+        self.local_stock_filter = LocalStockFilter()
+        if indicators_partial_url:
+            self.local_stock_filter.indicators_partial_url = indicators_partial_url
+        self.refresh_interval_seconds = refresh_interval_seconds
+
+        # Replaced as a whole on each refresh, queries read a consistent pair without waiting for refreshes
+        self.prepared_data_frame: Optional[pd.DataFrame] = None
+        self.screener_date: str = ''
+        self.updated_at: str = ''
+        self.state_lock = threading.Lock()
+
+        # Stock name to (is operational, checked at), kept across refreshes up to the cache TTL
+        self.checked_status_dict: Dict = {}
+        self.status_lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.refreshes: int = 0
+        self.last_error: str = ''
+
+        self.stop_event = threading.Event()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server_thread: Optional[threading.Thread] = None
+        self.scheduler_thread: Optional[threading.Thread] = None
+
+    # end def
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.server.server_address[0]}:{self.server.server_port}'
+
+    # end def
+
+    def start(self) -> None:
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.scheduler_thread = threading.Thread(target=self.run_scheduler, daemon=True)
+        self.server_thread.start()
+        self.scheduler_thread.start()
+
+    # end def
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.scheduler_thread.join(timeout=settings.HTTP_TIMEOUT_SECONDS)
+
+    # end def
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    # end def
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    # end def
+
+    def run_scheduler(self) -> None:
+        while not self.stop_event.is_set():
+            self.try_refresh()
+            self.stop_event.wait(self.refresh_interval_seconds)
+
+    # end def
+
+    def try_refresh(self) -> bool:
+        r"""
+        Refresh, a failed refresh keeps serving the previous data and is reported by /health.
+
+        Return
+        -------
+        True if the refresh succeeded
+        """
+        try:
+            self.refresh()
+        except (SystemExit, Exception) as e:
+            self.last_error = f'{datetime.now().isoformat(timespec="seconds")} {e!r}'
+            return False
+
+        self.last_error = ''
+        return True
+
+    # end def
+
+    def refresh(self) -> None:
+        r"""
+        Fetch and prepare the screener table of the most recent date, then check the bankruptcy status of the
+        default candidates not checked within the cache TTL.
+        """
+        with self.refresh_lock, stage_events.stage('Refreshing screener'):
+            # The service outlives the day it was started on
+            self.web_driver.current_date = date.today()
+            page_text = self.web_driver.get_stocks_page()
+            prepared_data_frame = self.dataframe_parser.prepare_dataframe_from_page(page_text)
+
+            candidates_data_frame = LocalStockFilter.select_cheapest_stocks(prepared_data_frame.copy())
+            self.check_statuses(list(candidates_data_frame['Stock']))
+
+            with self.state_lock:
+                self.prepared_data_frame = prepared_data_frame
+                self.screener_date = self.web_driver.updated_date
+                self.updated_at = datetime.now().isoformat(timespec='seconds')
+                self.refreshes += 1
+
+    # end def
+
+    def check_statuses(
+            self,
+            companies_stock_name_list: List
+    ) -> Dict[str, bool]:
+        r"""
+        Gets `List` of stock names, reuses statuses checked by previous refreshes within the cache TTL and checks
+        the others with the disk cache and HTTP checker of `LocalStockFilter`.
+
+        Return
+        -------
+        `Dict` of stock name to True if the company is operational, for every received stock
+        """
+        # Statuses to check are picked and merged under the lock, fetched outside it so queries are not blocked
+        with self.status_lock:
+            now = time.time()
+            self.checked_status_dict = {stock: (is_operational, checked_at)
+                                        for stock, (is_operational, checked_at) in self.checked_status_dict.items()
+                                        if now - checked_at < settings.BANKRUPTCY_STATUS_CACHE_TTL_SECONDS}
+            checked_status_dict = {stock: self.checked_status_dict[stock] for stock in companies_stock_name_list
+                                   if stock in self.checked_status_dict}
+
+        companies_to_check_list = [stock for stock in companies_stock_name_list if stock not in checked_status_dict]
+        if companies_to_check_list:
+            bankruptcy_status_cache = BankruptcyStatusCache(settings.BANKRUPTCY_STATUS_CACHE_FILEPATH,
+                                                            settings.BANKRUPTCY_STATUS_CACHE_TTL_SECONDS)
+            # Statuses served from the disk cache keep the time they were fetched, so they expire with it
+            fetched_status_dict = self.local_stock_filter.get_checked_statuses(companies_to_check_list,
+                                                                               bankruptcy_status_cache)
+            self.local_stock_filter.print_cache_stats(bankruptcy_status_cache)
+            checked_status_dict.update(fetched_status_dict)
+
+            with self.status_lock:
+                self.checked_status_dict.update(fetched_status_dict)
+
+        return {stock: is_operational for stock, (is_operational, _) in checked_status_dict.items()}
+
+    # end def
+
+    @staticmethod
+    def validate_query(
+            top_n: int,
+            financial_volume: int
+    ) -> None:
+        if not 0 < top_n <= settings.SERVICE_MAX_TOP_N:
+            print(f'Number of stocks must be between 1 and {settings.SERVICE_MAX_TOP_N}.')
+            raise SystemExit(1)
+        if financial_volume <= 0:
+            print('Cannot drop negative financial volume.')
+            raise SystemExit(1)
+
+    # end def
+
+    def get_top_stocks(
+            self,
+            top_n: Optional[int] = None,
+            financial_volume: Optional[int] = None,
+            ebit_margin: Optional[float] = None
+    ) -> Optional[pd.DataFrame]:
+        r"""
+        Select the `top_n` cheapest operational stocks of the in memory table. Stocks are checked in rank order
+        until `top_n` operational ones are found: statuses checked by refreshes and earlier queries are reused,
+        the others come from the disk cache or the HTTP checker, so no unchecked stock is returned. Arguments not
+        given are read from `settings` on each call.
+
+        Return
+        -------
+        Pandas `DataFrame`, empty when no stock passes the thresholds, None before the first refresh
+        """
+        top_n = settings.SELECTED_STOCKS_LIMIT if top_n is None else top_n
+        financial_volume = settings.MIN_FINANCIAL_VOLUME if financial_volume is None else financial_volume
+        ebit_margin = settings.MIN_EBIT_MARGIN if ebit_margin is None else ebit_margin
+        self.validate_query(top_n, financial_volume)
+        with self.state_lock:
+            prepared_data_frame = self.prepared_data_frame
+
+        if prepared_data_frame is None:
+            return None
+
+        stocks_data_frame = LocalStockFilter.select_cheapest_stocks(
+            prepared_data_frame.copy(), top_n=len(prepared_data_frame), financial_volume=financial_volume,
+            ebit_margin=ebit_margin)
+        if stocks_data_frame.empty:
+            return stocks_data_frame.assign(Is_Operational=pd.Series(dtype=bool))
+
+        companies_status_dict = LocalStockFilter.check_statuses_in_rank_order(
+            list(stocks_data_frame['Stock']), self.check_statuses, top_n=top_n)
+
+        operational_mask = stocks_data_frame['Stock'].map(lambda stock: companies_status_dict.get(stock, False))
+        stocks_data_frame = stocks_data_frame[operational_mask.astype(bool)].head(top_n).reset_index(drop=True)
+        stocks_data_frame['Is_Operational'] = True
+
+        return stocks_data_frame
+
+    # end def
+
+    def get_health(self) -> Dict:
+        with self.state_lock:
+            return {'status': 'ok' if self.prepared_data_frame is not None else 'starting',
+                    'screener_date': self.screener_date, 'updated_at': self.updated_at,
+                    'refreshes': self.refreshes, 'last_error': self.last_error,
+                    'http_cache': http_cache_stats.to_dict(),
+                    'circuit_breaker': investsite_circuit_breaker.to_dict()}
+
+    # end def
+
+    def _handler_class(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+
+                if url.path == '/health':
+                    self.send_json(200, service.get_health())
+                    return
+
+                if url.path != '/top':
+                    self.send_json(404, {'error': f'Unknown path {url.path}'})
+                    return
+
+                query_dict = parse_qs(url.query)
+                try:
+                    top_n = int(query_dict.get('n', [str(settings.SELECTED_STOCKS_LIMIT)])[0])
+                    financial_volume = int(query_dict.get('min_financial_volume',
+                                                          [str(settings.MIN_FINANCIAL_VOLUME)])[0])
+                    ebit_margin = float(query_dict.get('min_ebit_margin', [str(settings.MIN_EBIT_MARGIN)])[0])
+                    service.validate_query(top_n, financial_volume)
+                except (SystemExit, ValueError) as e:
+                    self.send_json(400, {'error': f'Invalid query parameters: {e!r}'})
+                    return
+
+                try:
+                    stocks_data_frame = service.get_top_stocks(top_n, financial_volume, ebit_margin)
+                except (SystemExit, Exception) as e:
+                    self.send_json(502, {'error': f'Could not check bankruptcy statuses: {e!r}'})
+                    return
+
+                if stocks_data_frame is None:
+                    self.send_json(503, {'error': 'Screener data not loaded yet', **service.get_health()})
+                    return
+
+                health_dict = service.get_health()
+                self.send_json(200, {'screener_date': health_dict['screener_date'],
+                                     'updated_at': health_dict['updated_at'],
+                                     'stocks': json.loads(stocks_data_frame.to_json(orient='records'))})
+
+            def do_POST(self):
+                if urlparse(self.path).path != '/refresh':
+                    self.send_json(404, {'error': f'Unknown path {self.path}'})
+                    return
+
+                self.send_json(200 if service.try_refresh() else 502, service.get_health())
+
+            def send_json(self, status, body_dict):
+                body = json.dumps(body_dict, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    # end def
+
+
+def main():
+    with ScreenerService() as screener_service:
+        print(f'Screener service listening on {screener_service.base_url}, refreshing every '
+              f'{screener_service.refresh_interval_seconds} s')
+        try:
+            screener_service.stop_event.wait()
+        except KeyboardInterrupt:
+            pass
+# end def
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import re
+from typing import List
+
+import numpy as np
+import pandas as pd
+from lxml import etree
+
+from utils.number_decoder import decode_br_numbers
+
+
+class ScreenerTableParser:
+    def __init__(self):
+        self.table_xpath: str = '//table[@id="tabela_selecao_acoes"]'
+        self.table_start_regex = re.compile(r'<table[^>]*\bid=["\']tabela_selecao_acoes["\']', re.IGNORECASE)
+        # Only columns used by the filters, in output order
+        self.columns_dict = {
+            'Ação': 'Stock', 'Preço': 'Price', 'Margem EBIT': 'EBIT_Margin_(%)', 'EV/EBIT': 'EV_EBIT',
+            'Div.Yield': 'Dividend_Yield_(%)', 'Volume Financ.(R$)': 'Financial_Volume_(%)'
+        }
+    # end def
+
+    def parse(
+            self,
+            page_text: str
+    ) -> pd.DataFrame:
+        r"""
+        Get screener page HTML and extract only the used columns of the stocks table into typed arrays.
+        Same result as `DataframeParser.prepare_dataframe` on `pd.read_html` output, without building the
+        `DataFrames` of every table and column on the page.
+
+        Return
+        -------
+        Pandas `DataFrame`
+        """
+        stocks_table_rows_list = self.extract_rows(page_text)
+        if not stocks_table_rows_list:
+            print('Cannot parse data, stocks table is empty or corrupted.')
+            raise SystemExit(1)
+
+        stock_list, price_list, ebit_margin_list, ev_ebit_list, dividend_yield_list, financial_volume_list = (
+            zip(*stocks_table_rows_list))
+
+        stocks_data_frame = pd.DataFrame({
+            'Stock': np.array(stock_list, dtype=object),
+            'Price': decode_br_numbers(pd.Series(price_list, dtype=object)),
+            'EBIT_Margin_(%)': decode_br_numbers(pd.Series(ebit_margin_list, dtype=object)),
+            'EV_EBIT': decode_br_numbers(pd.Series(ev_ebit_list, dtype=object)),
+            'Dividend_Yield_(%)': decode_br_numbers(pd.Series(dividend_yield_list, dtype=object)),
+            'Financial_Volume_(%)': decode_br_numbers(pd.Series(financial_volume_list, dtype=object)),
+        })
+
+        # Same rules as drop_and_fill_nans and replace_nans_by_zero
+        stocks_data_frame.dropna(subset=['EBIT_Margin_(%)', 'EV_EBIT'], inplace=True)
+        stocks_data_frame.fillna(value=0, inplace=True)
+        stocks_data_frame['Financial_Volume_(%)'] = stocks_data_frame['Financial_Volume_(%)'].astype(int)
+
+        return stocks_data_frame
+
+    # end def
+
+    def extract_rows(
+            self,
+            page_text: str
+    ) -> List:
+        r"""
+        Get screener page HTML and read the used cells of each row of the stocks table.
+
+        Return
+        -------
+        `List` of row tuples with the cell texts, in `columns_dict` order
+        """
+        # Parse only the stocks table markup, as plain etree elements: lxml.html element class lookup
+        # is the slowest part for large tables
+        stocks_table_list = etree.fromstring(self.slice_table(page_text), etree.HTMLParser()).xpath(self.table_xpath)
+        if not stocks_table_list:
+            print('Cannot parse data, stocks table not found.')
+            raise SystemExit(1)
+        stocks_table = stocks_table_list[0]
+
+        header_list = [' '.join(''.join(th.itertext()).split()) for th in stocks_table.iter('th')]
+        try:
+            columns_idx_list = [header_list.index(col) for col in self.columns_dict]
+        except ValueError as e:
+            print(f'Cannot parse data, stocks table columns changed\nError message: {e}')
+            raise SystemExit(1)
+
+        # Only cells of the used columns, on rows with a cell for every header
+        stocks_table_rows_list = []
+        for row in stocks_table.iter('tr'):
+            if len(row) == len(header_list) and row[0].tag == 'td':
+                stocks_table_rows_list.append(tuple(''.join(row[idx].itertext()).strip() for idx in columns_idx_list))
+
+        return stocks_table_rows_list
+
+    # end def
+
+    def slice_table(
+            self,
+            page_text: str
+    ) -> str:
+        r"""
+        Cut the stocks table markup out of the page, or keep the whole page if it cannot be located.
+
+        Return
+        -------
+        HTML as `str`
+        """
+        table_start_match = self.table_start_regex.search(page_text)
+        if table_start_match is None:
+            return page_text
+
+        table_end = page_text.find('</table>', table_start_match.start())
+        if table_end == -1:
+            return page_text
+
+        return page_text[table_start_match.start():table_end + len('</table>')]
+
+    # end def
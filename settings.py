@@ -1,32 +1,206 @@
 # Adding globals
 
-# Uses Picle dataframe (pickle_dataframe.pkl) instead of fetching from the web for tests speed up.
+# Uses the most recent candidates snapshot (SNAPSHOTS_DIRPATH) instead of fetching from the web for tests speed up.
 global USE_PICKLE_DATAFRAME
 USE_PICKLE_DATAFRAME = False
 
+# Stores raw, prepared and candidates snapshots of the current screener date and exits.
 global STORE_PICLE
 STORE_PICLE = False
 
 global UNIT_TEST
 UNIT_TEST = False
 
-global DEBUG_THREADS
-DEBUG_THREADS = False
-
-global PICKLE_FILEPATH
-PICKLE_FILEPATH = 'pickle_dataframe/pickle_dataframe.pkl'
-
 global PICKLE_UT_FULL_LIST_FILEPATH
 PICKLE_UT_FULL_LIST_FILEPATH = 'static_data/pickle_ut_full_list.pkl'
 
-global PICKLE_UT_FULL_FILEPATH
-PICKLE_UT_FULL_FILEPATH = 'static_data/pickle_ut_full_dataframe.pkl'
+global XLSX_FILENAME
+XLSX_FILENAME = '-most_valuable_stocks.xlsx'
 
-global PICKLE_UT_PREPARED_FILEPATH
-PICKLE_UT_PREPARED_FILEPATH = 'static_data/pickle_ut_prepared_dataframe.pkl'
+# Screener and detail pages host, point it at a replay server (python investsite_replay.py serve) to run offline
+global INVESTSITE_BASE_URL
+INVESTSITE_BASE_URL = 'https://www.investsite.com.br'
 
-global PICKLE_UT_FILTERED_FILEPATH
-PICKLE_UT_FILTERED_FILEPATH = 'static_data/pickle_ut_filtered_dataframe.pkl'
+# Detail page of a stock, appended to INVESTSITE_BASE_URL when the page is requested
+global INDICATORS_PARTIAL_PATH
+INDICATORS_PARTIAL_PATH = '/principais_indicadores.php?cod_negociacao='
 
-global XLSX_FILENAME
-XLSX_FILENAME = '-most_valuable_stocks.xlsx'
+# Checks bankruptcy over plain HTTP instead of starting Chrome instances.
+global USE_HTTP_BANKRUPTCY_CHECKER
+USE_HTTP_BANKRUPTCY_CHECKER = True
+
+global BANKRUPTCY_CHECKER_MAX_CONCURRENCY
+BANKRUPTCY_CHECKER_MAX_CONCURRENCY = 8
+
+# Detail pages checks work queue: browser workers of the Selenium checker, retries and page load timeout of each page.
+# HTTP checks are retried by the HTTP client only (HTTP_RETRIES)
+global DETAIL_CHECK_WORKERS
+DETAIL_CHECK_WORKERS = 4
+
+global DETAIL_CHECK_RETRIES
+DETAIL_CHECK_RETRIES = 2
+
+global DETAIL_CHECK_TIMEOUT_SECONDS
+DETAIL_CHECK_TIMEOUT_SECONDS = 15
+
+global HTTP_TIMEOUT_SECONDS
+HTTP_TIMEOUT_SECONDS = 15
+
+# Every request to www.investsite.com.br, from any thread, takes a token from one bucket refilled at
+# HTTP_RATE_LIMIT_PER_SECOND up to HTTP_RATE_LIMIT_BURST tokens
+global HTTP_RATE_LIMIT_PER_SECOND
+HTTP_RATE_LIMIT_PER_SECOND = 8.0
+
+global HTTP_RATE_LIMIT_BURST
+HTTP_RATE_LIMIT_BURST = 8
+
+# 429, 5xx answers and connection errors are retried with jittered exponential backoff, 429 honours Retry-After
+global HTTP_RETRIES
+HTTP_RETRIES = 3
+
+global HTTP_BACKOFF_BASE_SECONDS
+HTTP_BACKOFF_BASE_SECONDS = 0.5
+
+global HTTP_BACKOFF_MAX_SECONDS
+HTTP_BACKOFF_MAX_SECONDS = 30.0
+
+# After HTTP_CIRCUIT_FAILURE_THRESHOLD consecutive failures, requests fail fast for HTTP_CIRCUIT_RESET_SECONDS
+global HTTP_CIRCUIT_FAILURE_THRESHOLD
+HTTP_CIRCUIT_FAILURE_THRESHOLD = 5
+
+global HTTP_CIRCUIT_RESET_SECONDS
+HTTP_CIRCUIT_RESET_SECONDS = 60.0
+
+# HTTP cache of the screener and detail pages: sqlite (single file, LRU evicted above HTTP_CACHE_MAX_BYTES),
+# file (CacheControl FileCache, never evicted) or none
+global HTTP_CACHE_BACKEND
+HTTP_CACHE_BACKEND = 'sqlite'
+
+global HTTP_CACHE_FILEPATH
+HTTP_CACHE_FILEPATH = '.web_cache.db'
+
+global HTTP_CACHE_DIRPATH
+HTTP_CACHE_DIRPATH = '.web_cache'
+
+global HTTP_CACHE_MAX_BYTES
+HTTP_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Company status rarely changes, cached entries younger than the TTL are not fetched again.
+global BANKRUPTCY_STATUS_CACHE_FILEPATH
+BANKRUPTCY_STATUS_CACHE_FILEPATH = '.bankruptcy_status_cache.db'
+
+global BANKRUPTCY_STATUS_CACHE_TTL_SECONDS
+BANKRUPTCY_STATUS_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Chrome instances are started on first use and quit after WEB_DRIVER_MAX_PAGES pages or above the memory limit.
+global WEB_DRIVER_POOL_SIZE
+WEB_DRIVER_POOL_SIZE = 4
+
+global WEB_DRIVER_MAX_PAGES
+WEB_DRIVER_MAX_PAGES = 50
+
+global WEB_DRIVER_MAX_MEMORY_MB
+WEB_DRIVER_MAX_MEMORY_MB = 1024
+
+# Screener dates are probed backwards up to this many days, stopping at the last date known to have data.
+global INDICATORS_MAX_LOOKBACK_DAYS
+INDICATORS_MAX_LOOKBACK_DAYS = 10
+
+global INDICATORS_LAST_DATE_FILEPATH
+INDICATORS_LAST_DATE_FILEPATH = '.indicators_last_date'
+
+# Parses only the used columns of the stocks table instead of every table on the page with pd.read_html.
+global USE_SCREENER_TABLE_PARSER
+USE_SCREENER_TABLE_PARSER = True
+
+# Number of cheapest companies (after de-duplication) checked for bankruptcy.
+global BANKRUPTCY_CANDIDATES_LIMIT
+BANKRUPTCY_CANDIDATES_LIMIT = 41
+
+# Local filters thresholds: minimum Financial_Volume_(%) in R$ and minimum EBIT_Margin_(%).
+global MIN_FINANCIAL_VOLUME
+MIN_FINANCIAL_VOLUME = 1_000_000
+
+global MIN_EBIT_MARGIN
+MIN_EBIT_MARGIN = 0
+
+# Number of stocks kept at the end of a run, after the bankruptcy check
+global SELECTED_STOCKS_LIMIT
+SELECTED_STOCKS_LIMIT = 20
+
+# Candidates are checked for bankruptcy in EV_EBIT rank order, up to this many at a time, until SELECTED_STOCKS_LIMIT
+# operational stocks are found
+global BANKRUPTCY_CHECK_BATCH_SIZE
+BANKRUPTCY_CHECK_BATCH_SIZE = 8
+
+# Declarative screens evaluated together by screen_query.py
+global SCREENS_FILEPATH
+SCREENS_FILEPATH = 'screens.json'
+
+# Wall time of each stage, written at the end of a run
+global STAGE_TIMINGS_FILEPATH
+STAGE_TIMINGS_FILEPATH = 'stage_timings.json'
+
+# Date partitioned columnar snapshots of the screener tables
+global SNAPSHOTS_DIRPATH
+SNAPSHOTS_DIRPATH = 'snapshots'
+
+global SNAPSHOTS_UT_DIRPATH
+SNAPSHOTS_UT_DIRPATH = 'static_data/snapshots'
+
+# Historical replay of the stocks selection over the prepared snapshots, 0 workers uses every CPU
+global BACKTEST_TOP_N
+BACKTEST_TOP_N = 20
+
+global BACKTEST_MAX_WORKERS
+BACKTEST_MAX_WORKERS = 0
+
+global BACKTEST_FILEPATH
+BACKTEST_FILEPATH = 'backtest_selection.csv'
+
+# Historical backfill of prepared snapshots (python backfill.py --start YYYYMMDD), dates without registers are
+# remembered so resumed runs do not fetch them again
+global BACKFILL_MAX_WORKERS
+BACKFILL_MAX_WORKERS = 4
+
+global BACKFILL_EMPTY_DATES_FILEPATH
+BACKFILL_EMPTY_DATES_FILEPATH = '.backfill_empty_dates'
+
+# Diffs the prepared table against the previous snapshot, unchanged stocks reuse the previous run candidates and the
+# statuses fetched less than BANKRUPTCY_STATUS_CACHE_TTL_SECONDS ago
+global INCREMENTAL_RUN
+INCREMENTAL_RUN = True
+
+# Output formats written at the end of a run: xlsx, xlsx_streaming, csv, json, parquet (needs pyarrow)
+global OUTPUT_FORMATS
+OUTPUT_FORMATS = ['xlsx']
+
+global CSV_FILENAME
+CSV_FILENAME = '-most_valuable_stocks.csv'
+
+global JSON_FILENAME
+JSON_FILENAME = '-most_valuable_stocks.json'
+
+global PARQUET_FILENAME
+PARQUET_FILENAME = '-most_valuable_stocks.parquet'
+
+# Screener service (python screener_service.py): local HTTP API over data refreshed on a schedule
+global SERVICE_HOST
+SERVICE_HOST = '127.0.0.1'
+
+global SERVICE_PORT
+SERVICE_PORT = 8765
+
+global SERVICE_REFRESH_INTERVAL_SECONDS
+SERVICE_REFRESH_INTERVAL_SECONDS = 15 * 60
+
+# Largest n of a /top query, stocks are checked for bankruptcy until n operational ones are found
+global SERVICE_MAX_TOP_N
+SERVICE_MAX_TOP_N = 100
+
+# Record / replay of investsite pages (python investsite_replay.py record | serve)
+global REPLAY_ARCHIVE_FILEPATH
+REPLAY_ARCHIVE_FILEPATH = 'investsite_archive.json.gz'
+
+global REPLAY_PORT
+REPLAY_PORT = 8766
@@ -0,0 +1,285 @@
+import json
+import os
+import shutil
+from datetime import date, datetime
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+import settings
+from compact_schema import TICKER_COLUMN, TickerCodes, from_compact, to_compact
+
+# Snapshot kinds: screener table as read from the page, after DataframeParser, before the bankruptcy check, the
+# candidates bankruptcy statuses and the thresholds the candidates were selected with
+RAW_SNAPSHOT = 'raw'
+PREPARED_SNAPSHOT = 'prepared'
+CANDIDATES_SNAPSHOT = 'candidates'
+STATUSES_SNAPSHOT = 'statuses'
+SELECTION_SNAPSHOT = 'selection'
+# Ticker code table shared by every compact history loaded from the store
+TICKER_CODES_FILENAME = 'ticker_codes.json'
+
+
+class SnapshotStore:
+    r"""
+    Date partitioned columnar store of screener tables, one NumPy file per column:
+    <dirpath>/<kind>/<YYYYMMDD>/columns.json, 0.npy, 1.npy, ...
+
+    Numeric columns are memory mapped when loaded, so selected columns of selected dates are read without
+    deserializing the whole table. String columns are stored as fixed width unicode with a null mask, categorical
+    columns as their codes and categories.
+    """
+    metadata_filename = 'columns.json'
+    date_format = '%Y%m%d'
+
+    def __init__(
+            self,
+            dirpath: str = settings.SNAPSHOTS_DIRPATH
+    ) -> None:
+        self.dirpath = dirpath
+
+    # end def
+
+    def store_snapshot(
+            self,
+            kind: str,
+            snapshot_date: date,
+            stocks_data_frame: pd.DataFrame
+    ) -> str:
+        r"""
+        Store `stocks_data_frame` as the `kind` snapshot of `snapshot_date`, replacing a previous one.
+        Columns are written to a temporary directory renamed at the end, readers never see a partial snapshot.
+
+        Return
+        -------
+        Snapshot directory path as `str`
+        """
+        snapshot_dirpath = self.get_snapshot_dirpath(kind, snapshot_date)
+        tmp_dirpath = f'{snapshot_dirpath}.tmp-{os.getpid()}'
+        shutil.rmtree(tmp_dirpath, ignore_errors=True)
+        os.makedirs(tmp_dirpath)
+
+        columns_list = []
+        for position, column in enumerate(stocks_data_frame.columns):
+            values = stocks_data_frame[column]
+            values = values.array if isinstance(values.dtype, pd.CategoricalDtype) else values.to_numpy()
+            columns_list.append({'name': column, 'encoding': self.store_column(tmp_dirpath, str(position), values)})
+
+        if isinstance(stocks_data_frame.index, pd.RangeIndex) and stocks_data_frame.index.start == 0 \
+                and stocks_data_frame.index.step == 1:
+            index_encoding = 'range'
+        else:
+            index_encoding = self.store_column(tmp_dirpath, 'index', stocks_data_frame.index.to_numpy())
+
+        with open(os.path.join(tmp_dirpath, self.metadata_filename), 'w', encoding='utf-8') as metadata_file:
+            json.dump({'rows': len(stocks_data_frame), 'index': index_encoding, 'columns': columns_list},
+                      metadata_file, ensure_ascii=False)
+
+        shutil.rmtree(snapshot_dirpath, ignore_errors=True)
+        os.rename(tmp_dirpath, snapshot_dirpath)
+
+        return snapshot_dirpath
+
+    # end def
+
+    def load_snapshot(
+            self,
+            kind: str,
+            snapshot_date: Optional[date] = None,
+            columns_list: Optional[List] = None
+    ) -> pd.DataFrame:
+        r"""
+        Load `columns_list` (all by default) of the `kind` snapshot of `snapshot_date` (most recent by default).
+        Numeric columns are copy-on-write memory maps, changing them never touches the stored snapshot.
+
+        Return
+        -------
+        Pandas `DataFrame`
+        """
+        if snapshot_date is None:
+            dates_list = self.list_dates(kind)
+            if not dates_list:
+                print(f'No {kind} snapshot found on {self.dirpath}, set STORE_PICLE as True')
+                raise SystemExit(1)
+            snapshot_date = dates_list[-1]
+
+        snapshot_dirpath = self.get_snapshot_dirpath(kind, snapshot_date)
+        metadata_dict = self.load_metadata(snapshot_dirpath)
+
+        positions_dict = {column['name']: position for position, column in enumerate(metadata_dict['columns'])}
+        if columns_list is None:
+            columns_list = list(positions_dict)
+
+        missing_columns_list = [column for column in columns_list if column not in positions_dict]
+        if missing_columns_list:
+            print(f'Columns {missing_columns_list} not found on {snapshot_dirpath}')
+            raise SystemExit(1)
+
+        columns_dict = {column: self.load_column(snapshot_dirpath, str(positions_dict[column]),
+                                                 metadata_dict['columns'][positions_dict[column]]['encoding'])
+                        for column in columns_list}
+
+        if metadata_dict['index'] == 'range':
+            index = pd.RangeIndex(metadata_dict['rows'])
+        else:
+            index = pd.Index(self.load_column(snapshot_dirpath, 'index', metadata_dict['index']))
+
+        return pd.DataFrame(columns_dict, index=index, columns=columns_list, copy=False)
+
+    # end def
+
+    def load_history(
+            self,
+            kind: str,
+            dates_list: Optional[List] = None,
+            columns_list: Optional[List] = None,
+            ticker_codes: Optional[TickerCodes] = None
+    ) -> pd.DataFrame:
+        r"""
+        Load `columns_list` of the `kind` snapshots of `dates_list` (all by default) into one compact `DataFrame`
+        with a leading `Date` column, see `compact_schema.to_compact`. Tickers are encoded with `ticker_codes`, by
+        default the code table stored along the snapshots, updated on disk when new tickers are found.
+
+        Return
+        -------
+        Pandas `DataFrame`
+        """
+        ticker_codes_filepath = os.path.join(self.dirpath, TICKER_CODES_FILENAME)
+        stored_ticker_codes = ticker_codes is None
+        if stored_ticker_codes:
+            ticker_codes = TickerCodes.load(ticker_codes_filepath)
+        known_tickers = len(ticker_codes.tickers_list)
+
+        snapshots_list = []
+        for snapshot_date in (self.list_dates(kind) if dates_list is None else dates_list):
+            # Snapshots stored in either schema are brought to exact float64 values before the dtypes are chosen
+            stocks_data_frame = from_compact(self.load_snapshot(kind, snapshot_date, columns_list))
+            if TICKER_COLUMN in stocks_data_frame:
+                # Decoded once per date, never kept as Python strings
+                stocks_data_frame[TICKER_COLUMN] = ticker_codes.to_categorical(stocks_data_frame[TICKER_COLUMN])
+            stocks_data_frame.insert(0, 'Date', pd.Timestamp(snapshot_date))
+            snapshots_list.append(stocks_data_frame)
+
+        if not snapshots_list:
+            print(f'No {kind} snapshot found on {self.dirpath}, set STORE_PICLE as True')
+            raise SystemExit(1)
+
+        for stocks_data_frame in snapshots_list:
+            if TICKER_COLUMN in stocks_data_frame:
+                stocks_data_frame[TICKER_COLUMN] = (stocks_data_frame[TICKER_COLUMN].cat
+                                                    .set_categories(ticker_codes.tickers_list))
+
+        if stored_ticker_codes and len(ticker_codes.tickers_list) > known_tickers:
+            ticker_codes.store(ticker_codes_filepath)
+
+        return to_compact(pd.concat(snapshots_list, ignore_index=True), ticker_codes)
+
+    # end def
+
+    def list_dates(
+            self,
+            kind: str
+    ) -> List:
+        r"""
+        Return
+        -------
+        `List` of stored `kind` snapshot dates, oldest first
+        """
+        kind_dirpath = os.path.join(self.dirpath, kind)
+        if not os.path.isdir(kind_dirpath):
+            return []
+
+        dates_list = []
+        for dirname in os.listdir(kind_dirpath):
+            try:
+                snapshot_date = datetime.strptime(dirname, self.date_format).date()
+            except ValueError:
+                # Temporary directories of unfinished writes
+                continue
+            if os.path.exists(os.path.join(kind_dirpath, dirname, self.metadata_filename)):
+                dates_list.append(snapshot_date)
+
+        return sorted(dates_list)
+
+    # end def
+
+    def get_snapshot_dirpath(
+            self,
+            kind: str,
+            snapshot_date: date
+    ) -> str:
+        return os.path.join(self.dirpath, kind, snapshot_date.strftime(self.date_format))
+
+    # end def
+
+    def load_metadata(
+            self,
+            snapshot_dirpath: str
+    ) -> Dict:
+        try:
+            with open(os.path.join(snapshot_dirpath, self.metadata_filename), encoding='utf-8') as metadata_file:
+                return json.load(metadata_file)
+        except FileNotFoundError:
+            print(f'Snapshot not found on {snapshot_dirpath}, set STORE_PICLE as True')
+            raise SystemExit(1)
+
+    # end def
+
+    @staticmethod
+    def store_column(
+            dirpath: str,
+            filename: str,
+            values: Union[np.ndarray, pd.Categorical]
+    ) -> str:
+        r"""
+        Store `values` as a NumPy file, object columns of `str` and NaN as fixed width unicode with a null mask,
+        categorical columns as their codes and their categories.
+
+        Return
+        -------
+        Column encoding as `str`, 'numeric', 'string' or 'category'
+        """
+        if isinstance(values, pd.Categorical):
+            np.save(os.path.join(dirpath, filename + '.npy'), values.codes)
+            categories = values.categories.to_numpy()
+            np.save(os.path.join(dirpath, filename + '.categories.npy'), categories.astype(str) if len(categories)
+                    else np.array([], dtype='<U1'))
+            return 'category'
+
+        if values.dtype != object:
+            np.save(os.path.join(dirpath, filename + '.npy'), values)
+            return 'numeric'
+
+        null_mask = pd.isna(values)
+        if not all(isinstance(value, str) for value in values[~null_mask]):
+            print(f'Cannot store column {filename}, only numbers, strings and NaN are supported.')
+            raise SystemExit(1)
+
+        strings = np.where(null_mask, '', values)
+        np.save(os.path.join(dirpath, filename + '.npy'), strings.astype(str) if len(strings) else
+                np.array([], dtype='<U1'))
+        np.save(os.path.join(dirpath, filename + '.null.npy'), null_mask)
+        return 'string'
+
+    # end def
+
+    @staticmethod
+    def load_column(
+            dirpath: str,
+            filename: str,
+            encoding: str
+    ) -> Union[np.ndarray, pd.Categorical]:
+        values = np.load(os.path.join(dirpath, filename + '.npy'), mmap_mode='c')
+        if encoding == 'numeric':
+            return values
+
+        if encoding == 'category':
+            categories = np.load(os.path.join(dirpath, filename + '.categories.npy')).astype(object)
+            return pd.Categorical.from_codes(values, categories=categories)
+
+        strings = values.astype(object)
+        strings[np.load(os.path.join(dirpath, filename + '.null.npy'))] = np.nan
+        return strings
+
+    # end def
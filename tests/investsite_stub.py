@@ -0,0 +1,125 @@
+import html
+from typing import Dict, List, Optional
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+import settings
+from http_client import investsite_rate_limiter
+from investsite_replay import HttpArchive, ReplayServer
+from web_driver import WebDriver
+
+DETAIL_PAGE_TEMPLATE = (
+    '<html><body><table id="tabela_resumo_empresa"><tbody>'
+    '<tr><td>Nome</td><td>{stock}</td></tr>'
+    '<tr><td>Setor</td><td>Stub</td></tr>'
+    '<tr><td>Segmento</td><td>Stub</td></tr>'
+    '<tr><td>Situação</td><td>{status}</td></tr>'
+    '</tbody></table></body></html>'
+)
+
+STUB_RATE_PER_SECOND = 10000
+
+SCREENER_PAGE_TEMPLATE = (
+    '<html><body><table id="tabela_selecao_acoes"><thead><tr><th>Ação</th><th>Data Preço</th></tr></thead>'
+    '<tbody><tr><td>STUB3</td><td>{date}</td></tr></tbody></table></body></html>'
+)
+
+
+def format_br_cell(value) -> str:
+    r"""
+    Format a `DataFrame` cell the way investsite renders it: 1.234,56 for floats and 1.234 for integers.
+    """
+    if isinstance(value, str):
+        return html.escape(value)
+    if pd.isna(value):
+        return ''
+    if isinstance(value, (int, np.integer)):
+        return f'{value:,}'.replace(',', '.')
+    return f'{value:,.2f}'.translate(str.maketrans(',.', '.,'))
+
+
+def render_table(
+        stocks_data_frame: pd.DataFrame,
+        table_id: Optional[str] = None
+) -> str:
+    table_attributes = f' id="{table_id}"' if table_id else ''
+    table_head = ''
+    if table_id:
+        table_head = ('<thead><tr>' + ''.join(f'<th>{html.escape(str(col))}</th>' for col in stocks_data_frame.columns)
+                      + '</tr></thead>')
+    table_body = ''.join('<tr>' + ''.join(f'<td>{format_br_cell(value)}</td>' for value in row) + '</tr>'
+                         for row in stocks_data_frame.itertuples(index=False))
+    return f'<table{table_attributes}>{table_head}<tbody>{table_body}</tbody></table>'
+
+
+def render_screener_page(stocks_list: List) -> str:
+    r"""
+    Render `List` of `DataFrames` returned by `WebDriver.get_stocks_table` back into a screener page,
+    `pd.read_html` on the result returns the same `List`.
+    """
+    return ('<html><body>' + render_table(stocks_list[0])
+            + render_table(stocks_list[1], 'tabela_selecao_acoes') + '</body></html>')
+
+
+def build_archive(
+        companies_status_dict: Dict[str, str],
+        screener_pages_dict: Dict[str, str],
+        recorded_on: str = ''
+) -> HttpArchive:
+    r"""
+    Archive of a detail page per stock of `companies_status_dict` (stock name to status) and the screener pages of
+    `screener_pages_dict` (link date YYYYMMDD to page HTML).
+    """
+    http_archive = HttpArchive(recorded_on=recorded_on)
+    for link_date, page_text in screener_pages_dict.items():
+        http_archive.add_page(WebDriver.indicators_url.replace(WebDriver.old_date_str, link_date), page_text)
+    for stock, status in companies_status_dict.items():
+        http_archive.add_page(settings.INDICATORS_PARTIAL_PATH + stock,
+                              DETAIL_PAGE_TEMPLATE.format(stock=stock, status=status))
+
+    return http_archive
+
+
+def build_fixture_archive(
+        stocks_list: List,
+        link_date: str,
+        companies_in_bankruptcy_list: List = ()
+) -> HttpArchive:
+    r"""
+    Archive of the screener page of `stocks_list` on `link_date` (YYYYMMDD) and a detail page per stock, stocks of
+    `companies_in_bankruptcy_list` being in judicial recovery.
+    """
+    companies_status_dict = {stock: 'RECUPERACAO JUDICIAL' if stock in companies_in_bankruptcy_list
+                             else 'FASE OPERACIONAL' for stock in stocks_list[1]['Ação']}
+    return build_archive(companies_status_dict, {link_date: render_screener_page(stocks_list)}, link_date)
+
+
+class InvestsiteStub(ReplayServer):
+    r"""
+    `ReplayServer` of the archive of `build_archive`, logging the requested screener dates and stocks. Requests are
+    not throttled by the rate limiter while it runs.
+    """
+    def __init__(
+            self,
+            companies_status_dict: Optional[Dict[str, str]] = None,
+            screener_pages_dict: Optional[Dict[str, str]] = None
+    ) -> None:
+        super().__init__(build_archive(companies_status_dict or {}, screener_pages_dict or {}), log_requests=True)
+        self.rate_limiter_patcher = patch.multiple(investsite_rate_limiter, rate_per_second=STUB_RATE_PER_SECOND,
+                                                   burst=STUB_RATE_PER_SECOND)
+
+    # end def
+
+    def __enter__(self):
+        self.rate_limiter_patcher.start()
+        return super().__enter__()
+
+    # end def
+
+    def __exit__(self, *args) -> None:
+        super().__exit__(*args)
+        self.rate_limiter_patcher.stop()
+
+    # end def
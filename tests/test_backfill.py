@@ -0,0 +1,87 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_backfill.py ; python -m coverage html
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+
+import settings
+from backfill import Backfill
+from dataframe_parser import DataframeParser
+from snapshot_store import PREPARED_SNAPSHOT, SnapshotStore
+from tests.investsite_stub import InvestsiteStub, render_screener_page
+
+
+class TestBackfill(unittest.TestCase):
+    def setUp(self):
+        # Test fixture, served as the screener page of the weekdays, weekend pages have no registers
+        self.page_text = render_screener_page(pd.read_pickle(settings.PICKLE_UT_FULL_LIST_FILEPATH))
+        self.stocks_prepared_dataframe = DataframeParser(None).prepare_dataframe_from_page(self.page_text)
+        self.start_date, self.end_date = date(2023, 9, 1), date(2023, 9, 5)
+        self.screener_pages_dict = {'20230901': self.page_text, '20230904': self.page_text,
+                                    '20230905': self.page_text}
+
+        self.stub = InvestsiteStub(screener_pages_dict=self.screener_pages_dict).__enter__()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_store = SnapshotStore(self.tmp_dir.name)
+        self.patches_list = [
+            patch.object(settings, 'INVESTSITE_BASE_URL', self.stub.base_url),
+            patch.object(settings, 'BACKFILL_EMPTY_DATES_FILEPATH', os.path.join(self.tmp_dir.name, 'empty_dates')),
+        ]
+        for patcher in self.patches_list:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in reversed(self.patches_list):
+            patcher.stop()
+        self.stub.__exit__()
+        self.tmp_dir.cleanup()
+
+    def test_backfill_date_range(self):
+        """Ensures that each date is fetched once and dates with registers are stored as prepared snapshots"""
+        counts_dict = Backfill(self.snapshot_store, max_workers=3).run(self.start_date, self.end_date)
+
+        self.assertEqual({'stored': 3, 'empty': 2, 'skipped': 0, 'failed': 0}, counts_dict)
+        self.assertEqual(['20230901', '20230902', '20230903', '20230904', '20230905'],
+                         sorted(self.stub.requested_dates_list))
+        self.assertEqual([date(2023, 9, 1), date(2023, 9, 4), date(2023, 9, 5)],
+                         self.snapshot_store.list_dates(PREPARED_SNAPSHOT))
+        pd.testing.assert_frame_equal(self.stocks_prepared_dataframe,
+                                      self.snapshot_store.load_snapshot(PREPARED_SNAPSHOT, date(2023, 9, 4)))
+
+    def test_resume_after_interruption(self):
+        """Ensures that stored dates and dates without registers are not fetched again and failed dates are retried"""
+        original_fetch_page = Backfill.fetch_page
+
+        def fetch_page(backfill, link_date):
+            if link_date == date(2023, 9, 4):
+                raise SystemExit(1)
+            return original_fetch_page(backfill, link_date)
+
+        with patch.object(Backfill, 'fetch_page', fetch_page):
+            counts_dict = Backfill(self.snapshot_store).run(self.start_date, self.end_date)
+        self.assertEqual({'stored': 2, 'empty': 2, 'skipped': 0, 'failed': 1}, counts_dict)
+        self.stub.requested_dates_list.clear()
+
+        counts_dict = Backfill(self.snapshot_store).run(self.start_date, self.end_date)
+
+        self.assertEqual({'stored': 1, 'empty': 0, 'skipped': 4, 'failed': 0}, counts_dict)
+        self.assertEqual(['20230904'], self.stub.requested_dates_list)
+        self.assertEqual(3, len(self.snapshot_store.list_dates(PREPARED_SNAPSHOT)))
+
+    def test_invalid_arguments(self):
+        """Ensures that no workers or an inverted date range raise SystemExit"""
+        with self.assertRaises(SystemExit) as cm:
+            Backfill(self.snapshot_store, max_workers=0)
+        self.assertEqual(cm.exception.code, 1)
+
+        with self.assertRaises(SystemExit) as cm:
+            Backfill(self.snapshot_store).run(self.end_date, self.start_date)
+        self.assertEqual(cm.exception.code, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_backtest.py ; python -m coverage html
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+import pandas as pd
+
+import settings
+from backtest import Backtest
+from local_stock_filter import LocalStockFilter
+from snapshot_store import PREPARED_SNAPSHOT, SnapshotStore
+
+
+class TestBacktest(unittest.TestCase):
+    def setUp(self):
+        # Test fixtures, stored as columnar snapshots
+        self.stocks_prepared_dataframe = SnapshotStore(settings.SNAPSHOTS_UT_DIRPATH).load_snapshot('prepared')
+
+        # Three days, the EV_EBIT of 5 more selected stocks grows every day so the selection turns over
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_store = SnapshotStore(self.tmp_dir.name)
+        self.dates_list = [date(2023, 9, 5) + timedelta(days=day) for day in range(3)]
+        selected_stocks_list = list(LocalStockFilter.select_cheapest_stocks(self.stocks_prepared_dataframe.copy(),
+                                                                            top_n=20)['Stock'])
+        self.stocks_data_frames_list = []
+        for day, snapshot_date in enumerate(self.dates_list):
+            stocks_data_frame = self.stocks_prepared_dataframe.copy()
+            expensive_mask = stocks_data_frame['Stock'].isin(selected_stocks_list[:5 * day])
+            stocks_data_frame.loc[expensive_mask, 'EV_EBIT'] += 1000
+            self.snapshot_store.store_snapshot(PREPARED_SNAPSHOT, snapshot_date, stocks_data_frame)
+            self.stocks_data_frames_list.append(stocks_data_frame)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_run_matches_select_cheapest_stocks(self):
+        """Ensures that each date selection is the select_cheapest_stocks top 20 of that date snapshot"""
+        selection_data_frame = Backtest(self.snapshot_store, max_workers=1).run()
+
+        self.assertEqual(self.dates_list, [timestamp.date() for timestamp in selection_data_frame['Date'].unique()])
+        for snapshot_date, stocks_data_frame in zip(self.dates_list, self.stocks_data_frames_list):
+            expected_data_frame = LocalStockFilter.select_cheapest_stocks(stocks_data_frame, top_n=20)
+            date_data_frame = selection_data_frame[selection_data_frame['Date'] == pd.Timestamp(snapshot_date)]
+
+            self.assertEqual(list(range(1, 21)), list(date_data_frame['Rank']))
+            pd.testing.assert_frame_equal(expected_data_frame,
+                                          date_data_frame.drop(columns=['Date', 'Rank']).reset_index(drop=True))
+
+    def test_process_pool_matches_single_process(self):
+        """Ensures that spreading dates across processes returns the same selection as a single process"""
+        expected_data_frame = Backtest(self.snapshot_store, max_workers=1).run()
+
+        pd.testing.assert_frame_equal(expected_data_frame, Backtest(self.snapshot_store, max_workers=2).run())
+
+    def test_run_period(self):
+        """Ensures that only dates of the period are replayed and an empty period raises SystemExit"""
+        backtest = Backtest(self.snapshot_store, max_workers=1)
+
+        selection_data_frame = backtest.run(self.dates_list[1], self.dates_list[1])
+        self.assertEqual([pd.Timestamp(self.dates_list[1])], list(selection_data_frame['Date'].unique()))
+
+        with self.assertRaises(SystemExit) as cm:
+            backtest.run(date(2024, 1, 1))
+        self.assertEqual(cm.exception.code, 1)
+
+    def test_get_turnover(self):
+        """Ensures that turnover counts stocks entering and leaving the selection between dates"""
+        selection_data_frame = Backtest(self.snapshot_store, max_workers=1).run()
+
+        turnover_data_frame = Backtest.get_turnover(selection_data_frame)
+
+        self.assertEqual([20, 20, 20], list(turnover_data_frame['Selected']))
+        self.assertEqual(0, turnover_data_frame['Entered'].iloc[0])
+        self.assertEqual(list(turnover_data_frame['Entered']), list(turnover_data_frame['Left']))
+        self.assertTrue((turnover_data_frame['Entered'].iloc[1:] > 0).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_bankruptcy_checker.py ; python -m coverage html
+import unittest
+
+import settings
+from bankruptcy_checker import BankruptcyChecker
+from snapshot_store import SnapshotStore
+from tests.investsite_stub import InvestsiteStub
+
+
+class TestBankruptcyChecker(unittest.TestCase):
+    def setUp(self):
+        # Test fixtures, stored as columnar snapshots
+        self.snapshot_store = SnapshotStore(settings.SNAPSHOTS_UT_DIRPATH)
+
+        self.empty_stocks_list = []
+        self.stocks_filtered_dataframe = self.snapshot_store.load_snapshot('filtered')
+        self.companies_stock_name_list = list(self.stocks_filtered_dataframe['Stock'])
+        self.companies_in_bankruptcy_list = ['ALSO3', 'SAPR11']
+        self.companies_status_dict = {
+            stock: 'RECUPERACAO JUDICIAL' if stock in self.companies_in_bankruptcy_list else 'FASE OPERACIONAL'
+            for stock in self.companies_stock_name_list
+        }
+
+    def test_check_bankruptcy(self):
+        """Ensures that only stocks not in operational phase are returned, in the received order"""
+        with InvestsiteStub(self.companies_status_dict) as stub:
+            companies_stock_link_list = [stub.indicators_partial_url + stock
+                                         for stock in self.companies_stock_name_list]
+            companies_in_bankruptcy_list = BankruptcyChecker(
+                stub.indicators_partial_url, max_concurrency=4).check_bankruptcy(companies_stock_link_list)
+
+        self.assertEqual(self.companies_in_bankruptcy_list, companies_in_bankruptcy_list)
+
+    def test_check_statuses_fetches_each_stock_once(self):
+        """Ensures that every stock page is requested exactly once, even if repeated"""
+        with InvestsiteStub(self.companies_status_dict) as stub:
+            companies_status_dict = BankruptcyChecker(stub.indicators_partial_url).check_statuses(
+                self.companies_stock_name_list + self.companies_stock_name_list)
+
+        self.assertCountEqual(self.companies_stock_name_list, stub.requested_stocks_list)
+        self.assertFalse(companies_status_dict['ALSO3'])
+        self.assertTrue(companies_status_dict['PETR4'])
+
+    def test_check_bankruptcy_empty_list(self):
+        """Ensures that check_bankruptcy raises SystemExit if an empty list is received"""
+        with self.assertRaises(SystemExit) as cm:
+            BankruptcyChecker().check_bankruptcy(self.empty_stocks_list)
+        self.assertEqual(cm.exception.code, 1)
+
+    def test_check_bankruptcy_page_not_found(self):
+        """Ensures that check_bankruptcy raises SystemExit if a page cannot be fetched"""
+        with InvestsiteStub({}) as stub:
+            with self.assertRaises(SystemExit) as cm:
+                BankruptcyChecker(stub.indicators_partial_url).check_bankruptcy(
+                    [stub.indicators_partial_url + 'INVALID'])
+        self.assertEqual(cm.exception.code, 1)
+
+    def test_is_operational_without_tbody(self):
+        """Ensures that XPATH is found when the page is served without <tbody>"""
+        page_text = ('<table id="tabela_resumo_empresa"><tr><td></td></tr><tr><td></td></tr><tr><td></td></tr>'
+                     '<tr><td>Situação</td><td>FASE OPERACIONAL</td></tr></table>')
+
+        self.assertTrue(BankruptcyChecker().is_operational(page_text))
+
+    def test_is_operational_missing_xpath(self):
+        """Ensures that is_operational raises SystemExit if the status cell is missing"""
+        with self.assertRaises(SystemExit) as cm:
+            BankruptcyChecker().is_operational('<html><body></body></html>')
+        self.assertEqual(cm.exception.code, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_bankruptcy_status_cache.py ; python -m coverage html
+import os.path
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from bankruptcy_status_cache import BankruptcyStatusCache
+
+
+class TestBankruptcyStatusCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_filepath = os.path.join(self.temp_dir.name, 'status', 'bankruptcy_status_cache.db')
+        self.companies_status_dict = {'PETR4': True, 'ALSO3': False}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_statuses_stored(self):
+        """Ensures that stored statuses are returned and counted as hits"""
+        BankruptcyStatusCache(self.cache_filepath).store_statuses(self.companies_status_dict)
+
+        bankruptcy_status_cache = BankruptcyStatusCache(self.cache_filepath)
+        companies_status_dict = bankruptcy_status_cache.get_statuses(['PETR4', 'ALSO3', 'GOAU4'])
+
+        self.assertEqual(self.companies_status_dict, companies_status_dict)
+        self.assertEqual(2, bankruptcy_status_cache.hits)
+        self.assertEqual(1, bankruptcy_status_cache.misses)
+
+    def test_get_statuses_expired(self):
+        """Ensures that entries older than TTL are treated as missing"""
+        BankruptcyStatusCache(self.cache_filepath).store_statuses(self.companies_status_dict)
+
+        bankruptcy_status_cache = BankruptcyStatusCache(self.cache_filepath, ttl_seconds=60)
+        with patch('bankruptcy_status_cache.time.time', return_value=time.time() + 120):
+            companies_status_dict = bankruptcy_status_cache.get_statuses(['PETR4', 'ALSO3'])
+
+        self.assertEqual({}, companies_status_dict)
+        self.assertEqual(2, bankruptcy_status_cache.misses)
+
+    def test_store_statuses_replaces_entry(self):
+        """Ensures that a refreshed status replaces the previous one"""
+        bankruptcy_status_cache = BankruptcyStatusCache(self.cache_filepath)
+        bankruptcy_status_cache.store_statuses(self.companies_status_dict)
+        bankruptcy_status_cache.store_statuses({'ALSO3': True})
+
+        self.assertTrue(bankruptcy_status_cache.get_statuses(['ALSO3'])['ALSO3'])
+
+    def test_negative_ttl(self):
+        """Ensures that BankruptcyStatusCache raises SystemExit if a negative TTL is received"""
+        with self.assertRaises(SystemExit) as cm:
+            BankruptcyStatusCache(self.cache_filepath, ttl_seconds=-1)
+        self.assertEqual(cm.exception.code, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
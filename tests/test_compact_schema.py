@@ -0,0 +1,89 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_compact_schema.py ; python -m coverage html
+import os
+import tempfile
+import unittest
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+import settings
+from compact_schema import TickerCodes, from_compact, to_compact
+from snapshot_store import PREPARED_SNAPSHOT, TICKER_CODES_FILENAME, SnapshotStore
+
+
+class TestCompactSchema(unittest.TestCase):
+    def setUp(self):
+        # Test fixtures, stored as columnar snapshots
+        self.stocks_prepared_dataframe = SnapshotStore(settings.SNAPSHOTS_UT_DIRPATH).load_snapshot('prepared')
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_store = SnapshotStore(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Ensures that a compact history is smaller and converts back to the same prepared values"""
+        history_data_frame = pd.concat([self.stocks_prepared_dataframe] * 10, ignore_index=True)
+
+        compact_data_frame = to_compact(history_data_frame)
+
+        self.assertIsInstance(compact_data_frame['Stock'].dtype, pd.CategoricalDtype)
+        self.assertEqual(np.float32, compact_data_frame['EV_EBIT'].dtype)
+        self.assertEqual(np.int64, compact_data_frame['Financial_Volume_(%)'].dtype)
+        self.assertLess(compact_data_frame.memory_usage(deep=True).sum(),
+                        history_data_frame.memory_usage(deep=True).sum() / 2)
+        pd.testing.assert_frame_equal(history_data_frame.astype({'Financial_Volume_(%)': np.int64}),
+                                      from_compact(compact_data_frame))
+
+    def test_float64_kept_without_precision(self):
+        """Ensures that ratios float32 cannot give back are kept as float64"""
+        stocks_data_frame = pd.DataFrame({'Stock': ['PETR4', np.nan], 'Price': [1234567.89, 1.0],
+                                          'EV_EBIT': [1.23456, 2.0]})
+
+        compact_data_frame = to_compact(stocks_data_frame)
+
+        self.assertEqual([np.float64, np.float64], compact_data_frame[['Price', 'EV_EBIT']].dtypes.tolist())
+        pd.testing.assert_frame_equal(stocks_data_frame, from_compact(compact_data_frame))
+
+    def test_stable_ticker_codes(self):
+        """Ensures that tickers keep their codes when new tickers are added and the table is stored"""
+        ticker_codes = TickerCodes(['PETR4', 'VALE3'])
+        first_codes = ticker_codes.to_categorical(['VALE3', 'PETR4']).codes.tolist()
+
+        second_categorical = ticker_codes.to_categorical(pd.Categorical(['ALSO3', 'VALE3', 'ALSO3']))
+        ticker_codes.store(os.path.join(self.tmp_dir.name, 'ticker_codes.json'))
+
+        self.assertEqual([1, 0], first_codes)
+        self.assertEqual([2, 1, 2], second_categorical.codes.tolist())
+        self.assertEqual(['PETR4', 'VALE3', 'ALSO3'],
+                         TickerCodes.load(os.path.join(self.tmp_dir.name, 'ticker_codes.json')).tickers_list)
+
+    def test_snapshot_history(self):
+        """Ensures that compact snapshots round trip and several dates load into one compact history"""
+        first_date, second_date = date(2023, 9, 6), date(2023, 9, 7)
+        self.snapshot_store.store_snapshot(PREPARED_SNAPSHOT, first_date, to_compact(self.stocks_prepared_dataframe))
+        self.snapshot_store.store_snapshot(PREPARED_SNAPSHOT, second_date,
+                                           self.stocks_prepared_dataframe.iloc[::-1].reset_index(drop=True))
+
+        pd.testing.assert_frame_equal(to_compact(self.stocks_prepared_dataframe),
+                                      self.snapshot_store.load_snapshot(PREPARED_SNAPSHOT, first_date))
+
+        history_data_frame = self.snapshot_store.load_history(PREPARED_SNAPSHOT)
+
+        self.assertEqual(2 * len(self.stocks_prepared_dataframe), len(history_data_frame))
+        self.assertEqual([pd.Timestamp(first_date), pd.Timestamp(second_date)],
+                         history_data_frame['Date'].unique().tolist())
+        self.assertIsInstance(history_data_frame['Stock'].dtype, pd.CategoricalDtype)
+        self.assertEqual(np.float32, history_data_frame['Price'].dtype)
+        self.assertEqual(self.stocks_prepared_dataframe['Stock'].tolist()[::-1],
+                         history_data_frame.loc[history_data_frame['Date'] == pd.Timestamp(second_date),
+                                                'Stock'].tolist())
+        self.assertEqual(sorted(self.stocks_prepared_dataframe['Stock'].tolist()), sorted(TickerCodes.load(
+            os.path.join(self.tmp_dir.name, TICKER_CODES_FILENAME)).tickers_list))
+
+
+if __name__ == "__main__":
+    unittest.main()
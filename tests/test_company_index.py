@@ -0,0 +1,57 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_company_index.py ; python -m coverage html
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import settings
+from bankruptcy_checker import BankruptcyChecker
+from company_index import CompanyIndex
+from local_stock_filter import LocalStockFilter
+from tests.investsite_stub import InvestsiteStub
+
+
+class TestCompanyIndex(unittest.TestCase):
+    def setUp(self):
+        self.companies_stock_name_list = ['PETR4', 'ALSO3', 'PETR3', 'VALE3', 'ALSO11']
+        self.companies_status_dict = {'PETR4': 'FASE OPERACIONAL', 'PETR3': 'FASE OPERACIONAL',
+                                      'ALSO3': 'RECUPERACAO JUDICIAL', 'ALSO11': 'RECUPERACAO JUDICIAL',
+                                      'VALE3': 'FASE OPERACIONAL'}
+
+    def test_company_statuses(self):
+        """Ensures that one ticker per company is representative and its status applies to the company"""
+        company_index = CompanyIndex(self.companies_stock_name_list)
+
+        self.assertEqual(['PETR4', 'ALSO3', 'VALE3'], company_index.get_representative_stocks())
+        self.assertEqual({'PETR4': True, 'PETR3': True, 'ALSO3': False, 'ALSO11': False},
+                         company_index.get_company_statuses({'PETR4': True, 'ALSO11': False}))
+        self.assertEqual({'PETR4': True, 'PETR3': False},
+                         company_index.get_company_statuses({'PETR4': True, 'PETR3': False}))
+
+    def test_one_detail_page_per_company(self):
+        """Ensures that the checker fetches one page per company and returns every received ticker"""
+        with InvestsiteStub(self.companies_status_dict) as stub:
+            companies_status_dict = BankruptcyChecker(stub.indicators_partial_url).check_statuses(
+                self.companies_stock_name_list)
+
+        self.assertEqual({'PETR4': True, 'ALSO3': False, 'PETR3': True, 'VALE3': True, 'ALSO11': False},
+                         companies_status_dict)
+        self.assertEqual(['ALSO3', 'PETR4', 'VALE3'], sorted(stub.requested_stocks_list))
+
+    def test_cached_company_status(self):
+        """Ensures that a cached status of one ticker is reused for the other tickers of its company"""
+        with tempfile.TemporaryDirectory() as temp_dir, InvestsiteStub(self.companies_status_dict) as stub:
+            with patch.object(settings, 'BANKRUPTCY_STATUS_CACHE_FILEPATH', os.path.join(temp_dir, 'cache.db')):
+                local_stock_filter = LocalStockFilter()
+                local_stock_filter.indicators_partial_url = stub.indicators_partial_url
+                local_stock_filter.check_bankruptcy_with_cache(['PETR4', 'ALSO3'])
+                companies_in_bankruptcy_list = local_stock_filter.check_bankruptcy_with_cache(
+                    self.companies_stock_name_list)
+
+        self.assertEqual(['ALSO3', 'ALSO11'], companies_in_bankruptcy_list)
+        self.assertEqual(['ALSO3', 'PETR4', 'VALE3'], sorted(stub.requested_stocks_list))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,15 +3,21 @@
 import itertools
 import unittest
 
+import numpy as np
 import pandas as pd
 
 import settings
 from dataframe_parser import DataframeParser
+from snapshot_store import SnapshotStore
+from utils.number_decoder import decode_br_numbers
 from web_driver import WebDriver
 
 
 class TestDataFrameParser(unittest.TestCase):
     def setUp(self):
+        # Test fixtures, stored as columnar snapshots
+        self.snapshot_store = SnapshotStore(settings.SNAPSHOTS_UT_DIRPATH)
+
         self.empty_stocks_list = []
         self.empty_dataframe = pd.DataFrame()
 
@@ -19,13 +25,13 @@ class TestDataFrameParser(unittest.TestCase):
         self.stocks_list = pd.read_pickle(settings.PICKLE_UT_FULL_LIST_FILEPATH)
 
         # Full dataframe after WebDriver().get_stocks_table()
-        self.stocks_full_dataframe = pd.read_pickle(settings.PICKLE_UT_FULL_FILEPATH)
+        self.stocks_full_dataframe = self.snapshot_store.load_snapshot('full')
 
         # Full dataframe after prepare_dataframe(stocks_list)
-        self.stocks_prepared_dataframe = pd.read_pickle(settings.PICKLE_UT_PREPARED_FILEPATH)
+        self.stocks_prepared_dataframe = self.snapshot_store.load_snapshot('prepared')
 
         # Dataframe after apply_financial_filters(stocks_list)
-        self.stocks_filtered_dataframe_list = pd.read_pickle(settings.PICKLE_UT_FILTERED_FILEPATH)
+        self.stocks_filtered_dataframe_list = self.snapshot_store.load_snapshot('filtered')
 
         self.web_driver = WebDriver()
         self.dataframe_parser = DataframeParser(self.web_driver)
@@ -124,6 +130,43 @@ class TestDataFrameParser(unittest.TestCase):
             self.dataframe_parser.convert_data_type(self.empty_dataframe)
         self.assertEqual(cm.exception.code, 1)
 
+    def test_decode_numeric_columns(self):
+        """Ensures that decode_numeric_columns returns the same data as remove_invalid_chars + convert_data_type"""
+        stock_data_frame = self.dataframe_parser.drop_and_fill_nans(self.stock_data_frame_renamed_drop)
+        expected_data_frame = self.dataframe_parser.remove_invalid_chars(stock_data_frame.copy())
+        expected_data_frame = self.dataframe_parser.convert_data_type(expected_data_frame)
+        expected_data_frame = self.dataframe_parser.replace_nans_by_zero(expected_data_frame)
+
+        stock_data_frame = self.dataframe_parser.decode_numeric_columns(stock_data_frame)
+        stock_data_frame = self.dataframe_parser.replace_nans_by_zero(stock_data_frame)
+
+        pd.testing.assert_frame_equal(expected_data_frame, stock_data_frame)
+
+    def test_decode_numeric_columns_empty_dataframe(self):
+        """Ensures that decode_numeric_columns raises SystemExit if an empty df is received"""
+        with self.assertRaises(SystemExit) as cm:
+            self.dataframe_parser.decode_numeric_columns(self.empty_dataframe)
+        self.assertEqual(cm.exception.code, 1)
+
+    def test_prepare_dataframe_matches_prepared_fixture(self):
+        """Ensures that prepare_dataframe returns the prepared fixture values"""
+        pd.testing.assert_frame_equal(self.stocks_prepared_dataframe,
+                                      self.dataframe_parser.prepare_dataframe(self.stocks_list), check_dtype=False)
+
+    def test_decode_br_numbers(self):
+        """Ensures that pt-BR formatted cells are decoded and missing cells become NaN"""
+        values = pd.Series(['1.234,56', '-2.211,00%', '167.033.988', '12,3%', '-', '', np.nan, 0], dtype=object)
+        expected_values = pd.Series([1234.56, -2211.0, 167033988.0, 12.3, np.nan, np.nan, np.nan, np.nan])
+
+        pd.testing.assert_series_equal(expected_values, decode_br_numbers(values))
+        self.assertEqual(0, decode_br_numbers(values, na_value=0).isna().sum())
+
+    def test_decode_br_numbers_corrupted(self):
+        """Ensures that decode_br_numbers raises SystemExit if a cell is not a number"""
+        with self.assertRaises(SystemExit) as cm:
+            decode_br_numbers(pd.Series(['1,0', 'abc'], dtype=object))
+        self.assertEqual(cm.exception.code, 1)
+
     def test_replace_nans_by_zero_empty_dataframe(self):
         """Ensures that replace_nans_by_zero raises SystemExit if an empty df is received"""
 
@@ -0,0 +1,127 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_file_manager_formats.py ; python -m coverage html
+import json
+import os
+import tempfile
+import unittest
+import zipfile
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+
+import settings
+from file_manager_formats import FileManagerFormats
+from file_manager_sheet import FileManagerStreamingXLSX, FileManagerXLSX
+from file_manager_text import FileManagerCSV, FileManagerJSON, FileManagerParquet
+from snapshot_store import SnapshotStore
+
+
+def read_xlsx_xml(filename):
+    with zipfile.ZipFile(filename) as xlsx_file:
+        return ''.join(xlsx_file.read(name).decode('utf-8') for name in xlsx_file.namelist()
+                       if name.endswith('.xml'))
+
+
+@patch('builtins.input', side_effect=AssertionError('Output writers must not wait for input'))
+class TestFileManagerFormats(unittest.TestCase):
+    def setUp(self):
+        # Dataframe after apply_financial_filters()
+        self.stocks_filtered_dataframe = SnapshotStore(settings.SNAPSHOTS_UT_DIRPATH).load_snapshot('filtered')
+
+        # Files are written on the current directory
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.previous_cwd = os.getcwd()
+        os.chdir(self.tmp_dir.name)
+
+    def tearDown(self):
+        os.chdir(self.previous_cwd)
+        self.tmp_dir.cleanup()
+
+    def test_csv_and_json_round_trip(self, _):
+        """Ensures that CSV and JSON files are read back as the written dataframe, without index"""
+        FileManagerCSV().store_on_disk(self.stocks_filtered_dataframe)
+        FileManagerJSON().store_on_disk(self.stocks_filtered_dataframe)
+
+        expected_data_frame = self.stocks_filtered_dataframe.reset_index(drop=True)
+        pd.testing.assert_frame_equal(expected_data_frame, pd.read_csv(FileManagerCSV().filename), check_dtype=False)
+        with open(FileManagerJSON().filename, encoding='utf-8') as json_file:
+            pd.testing.assert_frame_equal(expected_data_frame, pd.DataFrame(json.load(json_file)), check_dtype=False)
+
+    def test_streaming_xlsx(self, _):
+        """Ensures that the streaming spreadsheet has a header row and one row per stock"""
+        FileManagerStreamingXLSX().store_on_disk(self.stocks_filtered_dataframe)
+
+        xlsx_xml = read_xlsx_xml(FileManagerStreamingXLSX().filename)
+        self.assertIn('Most_valuable_stocks', xlsx_xml)
+        self.assertEqual(len(self.stocks_filtered_dataframe) + 1, xlsx_xml.count('<row '))
+        for stock in self.stocks_filtered_dataframe['Stock']:
+            self.assertIn(f'>{stock}<', xlsx_xml)
+
+    def test_store_several_formats(self, _):
+        """Ensures that every selected format is written from the same dataframe"""
+        filenames_list = FileManagerFormats(['xlsx', 'csv', 'json', 'csv']).store_on_disk(
+            self.stocks_filtered_dataframe)
+
+        self.assertEqual([FileManagerXLSX().filename, FileManagerCSV().filename, FileManagerJSON().filename],
+                         filenames_list)
+        self.assertTrue(all(os.path.exists(filename) for filename in filenames_list))
+
+    def test_invalid_formats(self, _):
+        """Ensures that unknown formats, no format or two formats writing the same file raise SystemExit"""
+        for output_formats_list in (['xls'], []):
+            with self.assertRaises(SystemExit) as cm:
+                FileManagerFormats(output_formats_list)
+            self.assertEqual(cm.exception.code, 1)
+
+        with self.assertRaises(SystemExit) as cm:
+            FileManagerFormats(['xlsx', 'xlsx_streaming']).store_on_disk(self.stocks_filtered_dataframe)
+        self.assertEqual(cm.exception.code, 1)
+
+    def test_permission_error(self, mocked_input):
+        """Ensures that a write failing with PermissionError raises SystemExit instead of waiting for input"""
+        with patch.object(pd.ExcelWriter, '__new__', side_effect=PermissionError('Permission denied')), \
+                self.assertRaises(SystemExit) as cm:
+            FileManagerXLSX().store_on_disk(self.stocks_filtered_dataframe)
+        self.assertEqual(cm.exception.code, 1)
+
+        with patch.object(pd.DataFrame, 'to_csv', side_effect=PermissionError('Permission denied')), \
+                self.assertRaises(SystemExit) as cm:
+            FileManagerCSV().store_on_disk(self.stocks_filtered_dataframe)
+        self.assertEqual(cm.exception.code, 1)
+
+        mocked_input.assert_not_called()
+
+    def test_failing_format_does_not_stop_others(self, _):
+        """Ensures that other formats are still written when one fails, then SystemExit is raised"""
+        with patch.object(FileManagerCSV, 'store_on_disk', side_effect=SystemExit(1)), \
+                self.assertRaises(SystemExit) as cm:
+            FileManagerFormats(['csv', 'json']).store_on_disk(self.stocks_filtered_dataframe)
+
+        self.assertEqual(cm.exception.code, 1)
+        self.assertTrue(os.path.exists(FileManagerJSON().filename))
+
+    def test_filename_date_on_write(self, _):
+        """Ensures that the filename date is the date of the write"""
+        with patch('file_manager_text.date') as mocked_date:
+            mocked_date.today.return_value = date(2030, 1, 2)
+            FileManagerCSV().store_on_disk(self.stocks_filtered_dataframe)
+
+        self.assertTrue(os.path.exists('2030-01-02' + settings.CSV_FILENAME))
+
+    def test_parquet(self, _):
+        """Ensures that Parquet files are read back as the written dataframe, or SystemExit without engine"""
+        if not FileManagerParquet.is_available():
+            with self.assertRaises(SystemExit) as cm:
+                FileManagerParquet().store_on_disk(self.stocks_filtered_dataframe)
+            self.assertEqual(cm.exception.code, 1)
+            return
+
+        FileManagerParquet().store_on_disk(self.stocks_filtered_dataframe)
+
+        pd.testing.assert_frame_equal(self.stocks_filtered_dataframe.reset_index(drop=True),
+                                      pd.read_parquet(FileManagerParquet().filename))
+
+
+if __name__ == "__main__":
+    unittest.main()
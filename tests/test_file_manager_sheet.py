@@ -12,18 +12,23 @@ import settings
 from dataframe_parser import DataframeParser
 from file_manager_sheet import FileManagerXLSX
 from local_stock_filter import LocalStockFilter
+from snapshot_store import SnapshotStore
+from tests.investsite_stub import render_screener_page
 from web_driver import WebDriver
 
 
 class TestFileManagerSheet(unittest.TestCase):
     def setUp(self):
+        # Test fixtures, stored as columnar snapshots
+        self.snapshot_store = SnapshotStore(settings.SNAPSHOTS_UT_DIRPATH)
+
         self.empty_dataframe = pd.DataFrame()
 
         # Dataframe after apply_financial_filters()
-        self.stocks_filtered_dataframe = pd.read_pickle(settings.PICKLE_UT_FILTERED_FILEPATH)
+        self.stocks_filtered_dataframe = self.snapshot_store.load_snapshot('filtered')
 
         # Full dataframe after get_stocks_table()
-        self.stocks_full_dataframe = pd.read_pickle(settings.PICKLE_UT_FULL_FILEPATH)
+        self.stocks_full_dataframe = self.snapshot_store.load_snapshot('full')
 
         # List after get_stocks_table()
         self.stocks_list = pd.read_pickle(settings.PICKLE_UT_FULL_LIST_FILEPATH)
@@ -43,12 +48,12 @@ class TestFileManagerSheet(unittest.TestCase):
 
                 self.assertTrue(os.path.exists(attr_mock.return_value))
 
-    @patch("web_driver.WebDriver.get_stocks_table")
-    @patch('dataframe_parser.DataframeParser.prepare_dataframe')
-    def test_file_write_empty_dataframe(self, mocked_prepare_dataframe, mocked_get_stocks_table):
+    @patch("web_driver.WebDriver.get_stocks_page")
+    @patch('dataframe_parser.DataframeParser.prepare_dataframe_from_page')
+    def test_file_write_empty_dataframe(self, mocked_prepare_dataframe, mocked_get_stocks_page):
         # The test will automatically fail if no exception / exception other than SystemExit is raised.
         with self.assertRaises(SystemExit) as cm:
-            mocked_get_stocks_table.return_value = self.stocks_list
+            mocked_get_stocks_page.return_value = render_screener_page(self.stocks_list)
             mocked_prepare_dataframe.return_value = pd.DataFrame()
             LocalStockFilter().apply_financial_filters(self.dataframe_parser)
         self.assertEqual(cm.exception.code, 1)
@@ -0,0 +1,77 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_http_cache.py ; python -m coverage html
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import settings
+from bankruptcy_checker import BankruptcyChecker
+from http_cache import SQLiteCache, get_http_cache, http_cache_stats
+from tests.investsite_stub import InvestsiteStub
+
+
+class TestHttpCache(unittest.TestCase):
+    def setUp(self):
+        self.companies_status_dict = {'ALSO3': 'RECUPERACAO JUDICIAL', 'PETR4': 'FASE OPERACIONAL',
+                                      'VALE3': 'FASE OPERACIONAL'}
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_filepath = os.path.join(self.tmp_dir.name, 'web_cache.db')
+        http_cache_stats.reset()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_lru_eviction(self):
+        """Ensures that the least recently used responses are evicted once the cache exceeds its size"""
+        sqlite_cache = SQLiteCache(self.cache_filepath, max_bytes=10)
+        sqlite_cache.set('first', b'1111')
+        sqlite_cache.set('second', b'2222')
+        self.assertEqual(b'1111', sqlite_cache.get('first'))
+
+        sqlite_cache.set('third', b'3333')
+
+        self.assertIsNone(sqlite_cache.get('second'))
+        self.assertEqual(b'1111', sqlite_cache.get('first'))
+        self.assertEqual(b'3333', sqlite_cache.get('third'))
+        self.assertEqual(8, sqlite_cache.get_size())
+
+        sqlite_cache.set('expired', b'4', expires=-1)
+        self.assertIsNone(sqlite_cache.get('expired'))
+        sqlite_cache.delete('first')
+        self.assertIsNone(sqlite_cache.get('first'))
+
+    def test_conditional_revalidation(self):
+        """Ensures that cached detail pages are revalidated with their ETag and counted as hits"""
+        with patch.object(settings, 'HTTP_CACHE_FILEPATH', self.cache_filepath), \
+                InvestsiteStub(self.companies_status_dict) as stub:
+            first_status_dict = BankruptcyChecker(stub.indicators_partial_url).check_statuses(
+                list(self.companies_status_dict))
+            self.assertEqual({'hits': 0, 'misses': 3, 'bytes_saved': 0}, http_cache_stats.to_dict())
+
+            second_status_dict = BankruptcyChecker(stub.indicators_partial_url).check_statuses(
+                list(self.companies_status_dict))
+
+        self.assertEqual(first_status_dict, second_status_dict)
+        self.assertEqual(3, stub.not_modified_count)
+        self.assertEqual(6, len(stub.requested_stocks_list))
+        http_cache_dict = http_cache_stats.to_dict()
+        self.assertEqual((3, 3), (http_cache_dict['hits'], http_cache_dict['misses']))
+        self.assertGreater(http_cache_dict['bytes_saved'], 0)
+
+    def test_backends(self):
+        """Ensures that no cache backend downloads every page and an unknown backend raises SystemExit"""
+        with patch.object(settings, 'HTTP_CACHE_BACKEND', 'none'), InvestsiteStub(self.companies_status_dict) as stub:
+            for _ in range(2):
+                BankruptcyChecker(stub.indicators_partial_url).check_statuses(list(self.companies_status_dict))
+
+        self.assertEqual(0, stub.not_modified_count)
+        self.assertEqual({'hits': 0, 'misses': 6, 'bytes_saved': 0}, http_cache_stats.to_dict())
+
+        with patch.object(settings, 'HTTP_CACHE_BACKEND', 'memcached'), self.assertRaises(SystemExit) as cm:
+            get_http_cache()
+        self.assertEqual(cm.exception.code, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
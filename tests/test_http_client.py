@@ -0,0 +1,119 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_http_client.py ; python -m coverage html
+import sqlite3
+import time
+import unittest
+from unittest.mock import patch
+
+import requests
+
+import settings
+from bankruptcy_checker import BankruptcyChecker
+from http_client import CIRCUIT_CLOSED, CIRCUIT_OPEN, CircuitBreaker, CircuitOpenError, HttpClient, TokenBucket
+from tests.investsite_stub import InvestsiteStub
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.companies_status_dict = {'ALSO3': 'RECUPERACAO JUDICIAL', 'PETR4': 'FASE OPERACIONAL'}
+        self.rate_limiter = TokenBucket(rate_per_second=1000, burst=10)
+        self.circuit_breaker = CircuitBreaker(failure_threshold=3, reset_seconds=0.2)
+
+    def create_http_client(self, retries=3):
+        return HttpClient(session=requests.Session(), rate_limiter=self.rate_limiter,
+                          circuit_breaker=self.circuit_breaker, retries=retries, backoff_base_seconds=0.01)
+
+    def test_token_bucket_rate(self):
+        """Ensures that requests above the burst wait for tokens and a pause holds every caller"""
+        token_bucket = TokenBucket(rate_per_second=50, burst=2)
+
+        started_at = time.monotonic()
+        for _ in range(7):
+            token_bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started_at, 0.09)
+
+        token_bucket.pause(0.1)
+        self.assertGreaterEqual(token_bucket.acquire(), 0.09)
+
+    def test_retries_throttled_and_failing_requests(self):
+        """Ensures that 429 and 5xx answers are retried until the page is served"""
+        with InvestsiteStub(self.companies_status_dict) as stub:
+            stub.inject_failures([429, 503, 502], retry_after_seconds=0.05)
+            started_at = time.monotonic()
+
+            response = self.create_http_client().get(stub.indicators_partial_url + 'PETR4')
+
+        self.assertEqual(200, response.status_code)
+        self.assertIn('FASE OPERACIONAL', response.text)
+        self.assertEqual(3, stub.failed_count)
+        self.assertGreaterEqual(time.monotonic() - started_at, 0.05)
+        self.assertEqual(CIRCUIT_CLOSED, self.circuit_breaker.to_dict()['state'])
+
+        with InvestsiteStub(self.companies_status_dict) as stub:
+            stub.inject_failures([500] * 2)
+            with self.assertRaises(requests.exceptions.HTTPError):
+                self.create_http_client(retries=1).get(stub.indicators_partial_url + 'PETR4')
+
+    def test_circuit_breaker(self):
+        """Ensures that the circuit opens after consecutive failures, fails fast and closes after a good trial"""
+        with InvestsiteStub(self.companies_status_dict) as stub:
+            stub.inject_failures([503] * 3)
+            http_client = self.create_http_client(retries=0)
+            for _ in range(3):
+                with self.assertRaises(requests.exceptions.HTTPError):
+                    http_client.get(stub.indicators_partial_url + 'PETR4')
+
+            with self.assertRaises(CircuitOpenError):
+                http_client.get(stub.indicators_partial_url + 'PETR4')
+            self.assertEqual(CIRCUIT_OPEN, self.circuit_breaker.to_dict()['state'])
+            self.assertEqual(3, len(stub.requested_stocks_list) + stub.failed_count)
+
+            time.sleep(0.25)
+            response = http_client.get(stub.indicators_partial_url + 'PETR4')
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'state': CIRCUIT_CLOSED, 'failures': 0}, self.circuit_breaker.to_dict())
+
+    def test_circuit_breaker_trial_outcome(self):
+        """Ensures that a half-open trial failing with any error, or never reporting, does not keep the circuit open"""
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+        circuit_breaker.record_failure()
+        time.sleep(0.06)
+
+        # The trial fails inside the session cache
+        with InvestsiteStub(self.companies_status_dict) as stub:
+            http_client = HttpClient(session=requests.Session(), rate_limiter=self.rate_limiter,
+                                     circuit_breaker=circuit_breaker, retries=0)
+            with patch.object(http_client.session, 'get', side_effect=sqlite3.OperationalError('database is locked')):
+                with self.assertRaises(sqlite3.OperationalError):
+                    http_client.get(stub.indicators_partial_url + 'PETR4')
+            self.assertEqual(CIRCUIT_OPEN, circuit_breaker.to_dict()['state'])
+
+            time.sleep(0.06)
+            self.assertEqual(200, http_client.get(stub.indicators_partial_url + 'PETR4').status_code)
+
+        # A trial admitted without reporting its outcome expires after reset_seconds
+        circuit_breaker.record_failure()
+        time.sleep(0.06)
+        circuit_breaker.before_request()
+        with self.assertRaises(CircuitOpenError):
+            circuit_breaker.before_request()
+        time.sleep(0.06)
+        circuit_breaker.before_request()
+
+    def test_bankruptcy_checker_through_failures(self):
+        """Ensures that detail checks ride over injected 429 and 5xx answers"""
+        with patch.object(settings, 'HTTP_CACHE_BACKEND', 'none'), \
+                InvestsiteStub(self.companies_status_dict) as stub:
+            stub.inject_failures([429, 503, 500], retry_after_seconds=0)
+            bankruptcy_checker = BankruptcyChecker(stub.indicators_partial_url, max_concurrency=2)
+            bankruptcy_checker.http_client = self.create_http_client()
+
+            companies_status_dict = bankruptcy_checker.check_statuses(list(self.companies_status_dict))
+
+        self.assertEqual({'ALSO3': False, 'PETR4': True}, companies_status_dict)
+        self.assertEqual(3, stub.failed_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_incremental_run.py ; python -m coverage html
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+
+import settings
+from bankruptcy_checker import BankruptcyChecker
+from incremental_run import IncrementalRun
+from local_stock_filter import LocalStockFilter
+from snapshot_store import CANDIDATES_SNAPSHOT, STATUSES_SNAPSHOT, SnapshotStore
+
+
+class TestIncrementalRun(unittest.TestCase):
+    def setUp(self):
+        # Test fixtures, stored as columnar snapshots
+        self.stocks_prepared_dataframe = SnapshotStore(settings.SNAPSHOTS_UT_DIRPATH).load_snapshot('prepared')
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_store = SnapshotStore(self.tmp_dir.name)
+        self.previous_date = date(2023, 9, 6)
+        self.current_date = date(2023, 9, 7)
+
+        # Today: first stock price changed, second stock removed, one stock added
+        self.current_data_frame = self.stocks_prepared_dataframe.iloc[2:].copy()
+        self.current_data_frame.loc[self.current_data_frame.index[0], 'Price'] += 1
+        self.current_data_frame = pd.concat([self.current_data_frame, self.stocks_prepared_dataframe.iloc[[0]].assign(
+            Stock='NEWC3')])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_day(self, snapshot_date, stocks_data_frame):
+        local_stock_filter = LocalStockFilter()
+        local_stock_filter.snapshot_store = self.snapshot_store
+        local_stock_filter.snapshot_date = snapshot_date
+        candidates_data_frame = local_stock_filter.select_cheapest_stocks_incrementally(stocks_data_frame.copy())
+        return local_stock_filter, candidates_data_frame
+
+    def test_first_run(self):
+        """Ensures that without previous snapshot every row is added and the prepared snapshot is stored"""
+        incremental_run = IncrementalRun(self.snapshot_store, self.previous_date)
+
+        diff_counts_dict = incremental_run.diff(self.stocks_prepared_dataframe)
+
+        self.assertEqual({'rows': 425, 'unchanged': 0, 'changed': 0, 'added': 425, 'removed': 0}, diff_counts_dict)
+        self.assertEqual([self.previous_date], self.snapshot_store.list_dates('prepared'))
+
+    def test_diff_by_stock(self):
+        """Ensures that rows are matched by stock and changed, added and removed stocks are counted"""
+        IncrementalRun(self.snapshot_store, self.previous_date).diff(self.stocks_prepared_dataframe)
+        incremental_run = IncrementalRun(self.snapshot_store, self.current_date)
+
+        diff_counts_dict = incremental_run.diff(self.current_data_frame)
+
+        self.assertEqual({'rows': 424, 'unchanged': 422, 'changed': 1, 'added': 1, 'removed': 2}, diff_counts_dict)
+        self.assertNotIn(self.current_data_frame['Stock'].iloc[0], incremental_run.unchanged_stocks_set)
+        self.assertEqual(self.previous_date, incremental_run.previous_date)
+
+    def test_candidates_reused_when_unchanged(self):
+        """Ensures that candidates are reused when no row changed and selected again when a threshold changed"""
+        self.run_day(self.previous_date, self.stocks_prepared_dataframe)
+
+        with patch.object(LocalStockFilter, 'select_cheapest_stocks',
+                          side_effect=LocalStockFilter.select_cheapest_stocks) as select_cheapest_stocks:
+            _, candidates_data_frame = self.run_day(self.current_date, self.stocks_prepared_dataframe)
+            select_cheapest_stocks.assert_not_called()
+
+            with patch.object(settings, 'MIN_EBIT_MARGIN', 10):
+                _, margin_candidates_data_frame = self.run_day(self.current_date, self.stocks_prepared_dataframe)
+            select_cheapest_stocks.assert_called_once()
+
+        pd.testing.assert_frame_equal(LocalStockFilter.select_cheapest_stocks(self.stocks_prepared_dataframe.copy()),
+                                      candidates_data_frame)
+        pd.testing.assert_frame_equal(LocalStockFilter.select_cheapest_stocks(self.stocks_prepared_dataframe.copy(),
+                                                                              ebit_margin=10),
+                                      margin_candidates_data_frame)
+
+    def test_candidates_selected_again_when_changed(self):
+        """Ensures that candidates are selected again when a row changed"""
+        self.run_day(self.previous_date, self.stocks_prepared_dataframe)
+
+        _, candidates_data_frame = self.run_day(self.current_date, self.current_data_frame)
+
+        pd.testing.assert_frame_equal(LocalStockFilter.select_cheapest_stocks(self.current_data_frame.copy()),
+                                      candidates_data_frame)
+        pd.testing.assert_frame_equal(candidates_data_frame,
+                                      self.snapshot_store.load_snapshot(CANDIDATES_SNAPSHOT, self.current_date))
+
+    def check_two_days(self, current_data_frame):
+        local_stock_filter, candidates_data_frame = self.run_day(self.previous_date, self.stocks_prepared_dataframe)
+        candidates_list = list(candidates_data_frame['Stock'])
+        fetched_lists_list = []
+
+        def check_statuses(checker, companies_stock_name_list):
+            fetched_lists_list.append(list(companies_stock_name_list))
+            return {stock: stock != candidates_list[1] for stock in companies_stock_name_list}
+
+        with patch.object(BankruptcyChecker, 'check_statuses', check_statuses), \
+                patch.object(settings, 'BANKRUPTCY_STATUS_CACHE_FILEPATH', os.path.join(self.tmp_dir.name, 'cache.db')):
+            self.assertEqual([candidates_list[1]], local_stock_filter.check_bankruptcy_with_cache(candidates_list))
+
+            # The status cache is lost, only the incremental run can avoid the checks
+            os.remove(settings.BANKRUPTCY_STATUS_CACHE_FILEPATH)
+            local_stock_filter, candidates_data_frame = self.run_day(self.current_date, current_data_frame)
+            companies_in_bankruptcy_list = local_stock_filter.check_bankruptcy_with_cache(
+                list(candidates_data_frame['Stock']))
+
+        return local_stock_filter, candidates_list, companies_in_bankruptcy_list, fetched_lists_list
+
+    def test_statuses_reused_within_ttl(self):
+        """Ensures that unchanged candidates reuse their statuses and changed ones are checked again"""
+        changed_stock = LocalStockFilter.select_cheapest_stocks(self.stocks_prepared_dataframe.copy())['Stock'].iloc[0]
+        current_data_frame = self.stocks_prepared_dataframe.copy()
+        current_data_frame.loc[current_data_frame.Stock == changed_stock, 'Price'] += 1
+
+        local_stock_filter, candidates_list, companies_in_bankruptcy_list, fetched_lists_list = self.check_two_days(
+            current_data_frame)
+
+        self.assertEqual([candidates_list[1]], companies_in_bankruptcy_list)
+        self.assertEqual([candidates_list, [changed_stock]], fetched_lists_list)
+        self.assertEqual(len(candidates_list) - 1, local_stock_filter.incremental_run.checks_avoided)
+
+        # Reused statuses keep the time they were first fetched
+        previous_statuses_data_frame = self.snapshot_store.load_snapshot(STATUSES_SNAPSHOT, self.previous_date)
+        statuses_data_frame = self.snapshot_store.load_snapshot(STATUSES_SNAPSHOT, self.current_date)
+        self.assertEqual(candidates_list, list(statuses_data_frame['Stock']))
+        self.assertEqual(list(previous_statuses_data_frame['Fetched_At'])[1:],
+                         list(statuses_data_frame['Fetched_At'])[1:])
+        self.assertGreater(statuses_data_frame['Fetched_At'].iloc[0],
+                           previous_statuses_data_frame['Fetched_At'].iloc[0])
+
+    @patch.object(settings, 'BANKRUPTCY_STATUS_CACHE_TTL_SECONDS', 0)
+    def test_expired_statuses_checked_again(self):
+        """Ensures that statuses of unchanged candidates are not carried forward past the status cache TTL"""
+        local_stock_filter, candidates_list, companies_in_bankruptcy_list, fetched_lists_list = self.check_two_days(
+            self.stocks_prepared_dataframe)
+
+        self.assertEqual([candidates_list[1]], companies_in_bankruptcy_list)
+        self.assertEqual([candidates_list, candidates_list], fetched_lists_list)
+        self.assertEqual(0, local_stock_filter.incremental_run.checks_avoided)
+        statuses_data_frame = self.snapshot_store.load_snapshot(STATUSES_SNAPSHOT, self.current_date)
+        self.assertEqual(candidates_list, list(statuses_data_frame['Stock']))
+        self.assertEqual([stock != candidates_list[1] for stock in candidates_list],
+                         list(statuses_data_frame['Is_Operational']))
+
+
+if __name__ == "__main__":
+    unittest.main()
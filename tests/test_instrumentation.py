@@ -0,0 +1,114 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_instrumentation.py ; python -m coverage html
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+import settings
+from dataframe_parser import DataframeParser
+from instrumentation import ProgressListener, StageEvents, StageListener, StageTimer, stage_events
+from local_stock_filter import LocalStockFilter
+
+
+class RecordingListener(StageListener):
+    def __init__(self):
+        self.events_list = []
+
+    def on_stage_start(self, name, depth):
+        self.events_list.append(('start', name, depth))
+
+    def on_stage_finish(self, name, depth, wall_time_ms, failed):
+        self.events_list.append(('finish', name, depth, failed))
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.stage_events = StageEvents()
+        self.recording_listener = self.stage_events.subscribe(RecordingListener())
+
+    def test_stage_events_order(self):
+        """Ensures that nested stages report start and finish events in order with their depth"""
+        with self.stage_events.stage('outer'):
+            with self.stage_events.stage('inner'):
+                pass
+
+        self.assertEqual([('start', 'outer', 0), ('start', 'inner', 1), ('finish', 'inner', 1, False),
+                          ('finish', 'outer', 0, False)], self.recording_listener.events_list)
+
+    def test_stage_failed(self):
+        """Ensures that a stage interrupted by SystemExit reports a failed finish event and re-raises"""
+        with self.assertRaises(SystemExit):
+            with self.stage_events.stage('failing'):
+                raise SystemExit(1)
+
+        self.assertEqual(('finish', 'failing', 0, True), self.recording_listener.events_list[-1])
+
+        with self.stage_events.stage('next'):
+            pass
+        self.assertEqual(('start', 'next', 0), self.recording_listener.events_list[-2])
+
+    def test_unsubscribe(self):
+        """Ensures that an unsubscribed listener does not receive events"""
+        self.stage_events.unsubscribe(self.recording_listener)
+
+        with self.stage_events.stage('silent'):
+            pass
+
+        self.assertEqual([], self.recording_listener.events_list)
+
+    def test_stage_timer_json(self):
+        """Ensures that StageTimer records every stage and stores them as JSON"""
+        stage_timer = self.stage_events.subscribe(StageTimer())
+
+        with self.stage_events.stage('outer'):
+            with self.stage_events.stage('inner'):
+                pass
+
+        stages_list = json.loads(stage_timer.to_json())['stages']
+        self.assertEqual(['inner', 'outer'], [stage['stage'] for stage in stages_list])
+        self.assertGreaterEqual(stages_list[1]['wall_time_ms'], stages_list[0]['wall_time_ms'])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, 'stage_timings.json')
+            stage_timer.store_on_disk(filepath)
+            with open(filepath) as timings_file:
+                self.assertEqual(stages_list, json.load(timings_file)['stages'])
+
+    def test_progress_listener(self):
+        """Ensures that ProgressListener completes one task per stage and stops after the outermost stage"""
+        progress_listener = self.stage_events.subscribe(ProgressListener())
+
+        with self.stage_events.stage('outer'):
+            with self.stage_events.stage('inner'):
+                pass
+
+        self.assertEqual(2, len(progress_listener.progress.tasks))
+        self.assertTrue(all(task.finished for task in progress_listener.progress.tasks))
+        self.assertFalse(progress_listener.progress.live.is_started)
+
+    @patch.object(settings, 'UNIT_TEST', True)
+    def test_pipeline_stages(self):
+        """Ensures that preparing and filtering the fixture emits the pipeline stages"""
+        stage_timer = stage_events.subscribe(StageTimer())
+        stocks_list = pd.read_pickle(settings.PICKLE_UT_FULL_LIST_FILEPATH)
+        dataframe_parser = DataframeParser(None)
+        try:
+            with patch.object(DataframeParser, 'prepare_dataframe_from_page',
+                              lambda self, page_text: dataframe_parser.prepare_dataframe(stocks_list)), \
+                    patch.object(dataframe_parser, 'web_driver') as web_driver:
+                web_driver.get_stocks_page.return_value = ''
+                web_driver.updated_date = ''
+                LocalStockFilter().apply_financial_filters(dataframe_parser)
+        finally:
+            stage_events.unsubscribe(stage_timer)
+
+        self.assertEqual(['Preparing fetched data', 'Dropping stocks in bankruptcy', 'Applying financial filters'],
+                         [stage['stage'] for stage in json.loads(stage_timer.to_json())['stages']])
+
+
+if __name__ == "__main__":
+    unittest.main()
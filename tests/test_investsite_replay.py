@@ -0,0 +1,156 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_investsite_replay.py ; python -m coverage html
+import os
+import tempfile
+import time
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+import requests
+
+import settings
+from bankruptcy_checker import BankruptcyChecker
+from dataframe_parser import DataframeParser
+from http_client import response_hooks_list
+from investsite_replay import HttpArchive, ReplayServer, SCREENER_EMPTY_PAGE
+from local_stock_filter import LocalStockFilter
+from tests.investsite_stub import InvestsiteStub, build_fixture_archive, render_screener_page
+from web_driver import WebDriver
+
+
+class TestInvestsiteReplay(unittest.TestCase):
+    def setUp(self):
+        # Test fixture, archived as the screener page of 2023-09-07
+        self.stocks_list = pd.read_pickle(settings.PICKLE_UT_FULL_LIST_FILEPATH)
+        self.page_text = render_screener_page(self.stocks_list)
+        stocks_prepared_dataframe = DataframeParser(None).prepare_dataframe_from_page(self.page_text)
+        self.candidates_data_frame = LocalStockFilter.select_cheapest_stocks(stocks_prepared_dataframe)
+        self.companies_in_bankruptcy_list = self.candidates_data_frame['Stock'].tolist()[1:12:5]
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.patches_list = [
+            patch.object(settings, 'INDICATORS_LAST_DATE_FILEPATH', os.path.join(self.tmp_dir.name, 'last_date')),
+            patch.object(settings, 'BANKRUPTCY_STATUS_CACHE_FILEPATH', os.path.join(self.tmp_dir.name, 'cache.db')),
+            patch.object(settings, 'HTTP_CACHE_BACKEND', 'none'),
+            # The day after the screener date
+            patch.object(WebDriver, 'current_date', date(2023, 9, 8)),
+        ]
+        for patcher in self.patches_list:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in reversed(self.patches_list):
+            patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def point_at(self, base_url):
+        # Every investsite client built afterwards requests `base_url`
+        return patch.object(settings, 'INVESTSITE_BASE_URL', base_url)
+
+    def test_record_and_replay(self):
+        """Ensures that pages received from the site are archived, stored and replayed with the same answers"""
+        companies_stock_name_list = ['PETR4', 'ALSO3', 'VALE3']
+        companies_status_dict = {'PETR4': 'FASE OPERACIONAL', 'ALSO3': 'RECUPERACAO JUDICIAL',
+                                 'VALE3': 'FASE OPERACIONAL'}
+        http_archive = HttpArchive()
+        archive_filepath = os.path.join(self.tmp_dir.name, 'archive.json.gz')
+
+        with InvestsiteStub(companies_status_dict, {'20230907': self.page_text}) as stub, \
+                self.point_at(stub.base_url):
+            response_hooks_list.append(http_archive.record)
+            try:
+                recorded_page_text = WebDriver().get_stocks_page()
+                recorded_status_dict = BankruptcyChecker().check_statuses(
+                    companies_stock_name_list)
+            finally:
+                response_hooks_list.remove(http_archive.record)
+            requests.get(stub.indicators_partial_url + 'NONE3')
+            http_archive.recorded_on = '20230907'
+            http_archive.store(archive_filepath)
+
+        os.remove(settings.INDICATORS_LAST_DATE_FILEPATH)
+        replayed_archive = HttpArchive.load(archive_filepath)
+        with ReplayServer(replayed_archive) as replay_server, self.point_at(replay_server.base_url):
+            replayed_page_text = WebDriver().get_stocks_page()
+            replayed_status_dict = BankruptcyChecker().check_statuses(
+                companies_stock_name_list)
+
+        # One screener page and one detail page per company, requests of other clients are not recorded
+        self.assertEqual('20230907', replayed_archive.recorded_on)
+        self.assertEqual(1 + len(companies_stock_name_list), len(replayed_archive.pages_dict))
+        self.assertEqual(self.page_text, recorded_page_text)
+        self.assertEqual(recorded_page_text, replayed_page_text)
+        self.assertEqual({'PETR4': True, 'ALSO3': False, 'VALE3': True}, recorded_status_dict)
+        self.assertEqual(recorded_status_dict, replayed_status_dict)
+        self.assertEqual(0, replay_server.not_found_count)
+
+    def test_replay_latency_and_errors(self):
+        """Ensures that answers are delayed, errors injected and unknown pages answered as the site does"""
+        http_archive = build_fixture_archive(self.stocks_list, '20230907')
+        screener_url = WebDriver.indicators_url.replace(WebDriver.old_date_str, '20230910')
+
+        with ReplayServer(http_archive, latency_seconds=0.05) as replay_server:
+            start = time.perf_counter()
+            detail_response = requests.get(replay_server.indicators_partial_url + 'PETR4')
+            elapsed_seconds = time.perf_counter() - start
+            unknown_response = requests.get(replay_server.indicators_partial_url + 'NONE3')
+            empty_response = requests.get(screener_url.replace('https://www.investsite.com.br',
+                                                               replay_server.base_url))
+
+        with ReplayServer(http_archive, fill_dates=True) as replay_server:
+            filled_response = requests.get(screener_url.replace('https://www.investsite.com.br',
+                                                                replay_server.base_url))
+
+        with ReplayServer(http_archive, error_rate=1.0) as replay_server:
+            error_response = requests.get(replay_server.indicators_partial_url + 'PETR4')
+
+        self.assertEqual(200, detail_response.status_code)
+        self.assertIn('FASE OPERACIONAL', detail_response.text)
+        self.assertGreaterEqual(elapsed_seconds, 0.05)
+        self.assertEqual(404, unknown_response.status_code)
+        self.assertEqual(SCREENER_EMPTY_PAGE, empty_response.text)
+        self.assertEqual(self.page_text, filled_response.text)
+        self.assertEqual(503, error_response.status_code)
+        self.assertEqual((1, 1), (replay_server.requests_count, replay_server.errors_count))
+
+        with self.assertRaises(SystemExit) as cm:
+            ReplayServer(http_archive, error_rate=2.0)
+        self.assertEqual(cm.exception.code, 1)
+
+    def test_replay_conditional_requests_and_logging(self):
+        """Ensures that pages carry an ETag, queued failures answer first and requests are logged when asked"""
+        http_archive = build_fixture_archive(self.stocks_list, '20230907')
+
+        with ReplayServer(http_archive, log_requests=True) as replay_server:
+            replay_server.inject_failures([429], retry_after_seconds=1)
+            failed_response = requests.get(replay_server.indicators_partial_url + 'PETR4')
+            detail_response = requests.get(replay_server.indicators_partial_url + 'PETR4')
+            not_modified_response = requests.get(replay_server.indicators_partial_url + 'PETR4',
+                                                 headers={'If-None-Match': detail_response.headers['ETag']})
+
+        self.assertEqual((429, '1'), (failed_response.status_code, failed_response.headers['Retry-After']))
+        self.assertEqual(200, detail_response.status_code)
+        self.assertEqual(304, not_modified_response.status_code)
+        self.assertEqual((1, 1), (replay_server.failed_count, replay_server.not_modified_count))
+        self.assertEqual(['PETR4', 'PETR4'], replay_server.requested_stocks_list)
+
+    def test_pipeline_end_to_end(self):
+        """Ensures that the whole pipeline runs offline against a replay server with transient errors"""
+        http_archive = build_fixture_archive(self.stocks_list, '20230907', self.companies_in_bankruptcy_list)
+        expected_data_frame = self.candidates_data_frame[
+            ~self.candidates_data_frame.Stock.isin(self.companies_in_bankruptcy_list)].head(
+            settings.SELECTED_STOCKS_LIMIT)
+
+        with ReplayServer(http_archive, error_rate=0.1, seed=1) as replay_server, \
+                self.point_at(replay_server.base_url), \
+                patch.multiple(settings, INCREMENTAL_RUN=False, UNIT_TEST=False):
+            stocks_data_frame = LocalStockFilter().apply_financial_filters(DataframeParser(WebDriver()))
+
+        pd.testing.assert_frame_equal(expected_data_frame, stocks_data_frame)
+        self.assertGreater(replay_server.errors_count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,20 +1,27 @@
 # AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
 # python -m coverage run -m pytest .\test_local_stock_filter.py ; python -m coverage html
 import itertools
+import os.path
+import tempfile
 import unittest
 from collections import Counter
-from unittest.mock import patch, PropertyMock
+from unittest.mock import patch
 
 import pandas as pd
 
 import settings
 from dataframe_parser import DataframeParser
 from local_stock_filter import LocalStockFilter
+from snapshot_store import SnapshotStore
+from tests.investsite_stub import InvestsiteStub, render_screener_page
 from web_driver import WebDriver
 
 
 class TestLocalStockFilter(unittest.TestCase):
     def setUp(self):
+        # Test fixtures, stored as columnar snapshots
+        self.snapshot_store = SnapshotStore(settings.SNAPSHOTS_UT_DIRPATH)
+
         self.empty_stocks_list = []
         self.empty_dataframe = pd.DataFrame()
 
@@ -22,13 +29,13 @@ class TestLocalStockFilter(unittest.TestCase):
         self.stocks_list = pd.read_pickle(settings.PICKLE_UT_FULL_LIST_FILEPATH)
 
         # Full dataframe after get_stocks_table()
-        self.stocks_full_dataframe = pd.read_pickle(settings.PICKLE_UT_FULL_FILEPATH)
+        self.stocks_full_dataframe = self.snapshot_store.load_snapshot('full')
 
         # Full dataframe after prepare_dataframe()
-        self.stocks_prepared_dataframe = pd.read_pickle(settings.PICKLE_UT_PREPARED_FILEPATH)
+        self.stocks_prepared_dataframe = self.snapshot_store.load_snapshot('prepared')
 
         # Dataframe after apply_financial_filters()
-        self.stocks_filtered_dataframe_list = pd.read_pickle(settings.PICKLE_UT_FILTERED_FILEPATH)
+        self.stocks_filtered_dataframe_list = self.snapshot_store.load_snapshot('filtered')
 
         self.web_driver = WebDriver()
         self.dataframe_parser = DataframeParser(self.web_driver)
@@ -195,16 +202,132 @@ class TestLocalStockFilter(unittest.TestCase):
                 has_duplicated_stocks_by_financial_volume = True
         self.assertFalse(has_duplicated_stocks_by_financial_volume)
 
+    def test_drop_duplicated_stocks_by_financial_volume_parity(self):
+        """Ensures that the same stocks as the previous nested loop implementation (first 41 stocks) are kept"""
+        stock_data_frame = LocalStockFilter().drop_low_financial_volume(self.stocks_prepared_dataframe)
+        stock_data_frame = LocalStockFilter().drop_negative_profit_stocks(stock_data_frame)
+        stock_data_frame = LocalStockFilter().sort_by_ev_ebit(stock_data_frame)
+        stock_data_frame = LocalStockFilter().drop_duplicated_stocks_by_financial_volume(stock_data_frame.head(41))
+
+        pd.testing.assert_frame_equal(self.snapshot_store.load_snapshot('deduplicated'), stock_data_frame)
+
+    def test_drop_duplicated_stocks_by_financial_volume_full_universe(self):
+        """Ensures that every company keeps only its largest financial volume stock, without a row cap"""
+        stock_data_frame = LocalStockFilter().sort_by_ev_ebit(self.stocks_prepared_dataframe)
+        companies_prefix_series = stock_data_frame['Stock'].str[:4]
+        expected_largest_fv_dict = (stock_data_frame['Financial_Volume_(%)']
+                                    .groupby(companies_prefix_series).max().to_dict())
+
+        stock_data_frame = LocalStockFilter().drop_duplicated_stocks_by_financial_volume(stock_data_frame)
+
+        self.assertEqual(len(expected_largest_fv_dict), len(stock_data_frame))
+        self.assertTrue(stock_data_frame['EV_EBIT'].is_monotonic_increasing)
+        self.assertEqual(expected_largest_fv_dict, dict(zip(stock_data_frame['Stock'].str[:4],
+                                                            stock_data_frame['Financial_Volume_(%)'])))
+
+    def test_select_cheapest_stocks_parity(self):
+        """Ensures that the fused stage returns the same stocks as the separate filters, sort and head"""
+        expected_data_frame = LocalStockFilter().drop_low_financial_volume(self.stocks_prepared_dataframe.copy())
+        expected_data_frame = LocalStockFilter().drop_negative_profit_stocks(expected_data_frame)
+        expected_data_frame = LocalStockFilter().sort_by_ev_ebit(expected_data_frame)
+        expected_data_frame = LocalStockFilter().drop_duplicated_stocks_by_financial_volume(expected_data_frame)
+
+        stock_data_frame = LocalStockFilter().select_cheapest_stocks(self.stocks_prepared_dataframe, top_n=41)
+
+        # In place quicksorts do not keep the order of stocks with the same EV_EBIT
+        pd.testing.assert_frame_equal(expected_data_frame.head(41).sort_values(['EV_EBIT', 'Stock'], ignore_index=True),
+                                      stock_data_frame.sort_values(['EV_EBIT', 'Stock'], ignore_index=True))
+        self.assertEqual(expected_data_frame['EV_EBIT'].head(41).tolist(), stock_data_frame['EV_EBIT'].tolist())
+
+    def test_select_cheapest_stocks_parameters(self):
+        """Ensures that top_n and thresholds are applied"""
+        stock_data_frame = LocalStockFilter().select_cheapest_stocks(
+            self.stocks_prepared_dataframe, top_n=5, financial_volume=50_000_000, ebit_margin=10)
+
+        self.assertEqual(5, len(stock_data_frame))
+        self.assertTrue((stock_data_frame['Financial_Volume_(%)'] >= 50_000_000).all())
+        self.assertTrue((stock_data_frame['EBIT_Margin_(%)'] >= 10).all())
+        self.assertTrue(stock_data_frame['EV_EBIT'].is_monotonic_increasing)
+
+    def test_select_cheapest_stocks_invalid_parameters(self):
+        """Ensures that select_cheapest_stocks raises SystemExit if negative volume or top_n are received"""
+        for kwargs in ({'financial_volume': -1}, {'top_n': 0}):
+            with self.assertRaises(SystemExit) as cm:
+                LocalStockFilter().select_cheapest_stocks(self.stocks_prepared_dataframe, **kwargs)
+            self.assertEqual(cm.exception.code, 1)
+
     def test_drop_stocks_in_bankruptcy(self):
-        # Mocking attribute within the class
-        with (patch.object(LocalStockFilter, 'companies_in_bankruptcy_list', new_callable=PropertyMock)
-              as attr_mock):
-            settings.UNIT_TEST = True
-            attr_mock.return_value = ['ALSO3']
-            stock_data_frame = LocalStockFilter().drop_stocks_in_bankruptcy(self.stocks_filtered_dataframe_list)
+        # Bankruptcy check result of this run only
+        with patch.object(settings, 'UNIT_TEST', True):
+            local_stock_filter = LocalStockFilter()
+            local_stock_filter.companies_in_bankruptcy_list = ['ALSO3']
+            stock_data_frame = local_stock_filter.drop_stocks_in_bankruptcy(self.stocks_filtered_dataframe_list)
             print(stock_data_frame['Stock'].tolist())
 
             self.assertFalse('ALSO3' in stock_data_frame['Stock'].tolist())
+            self.assertEqual([], LocalStockFilter().companies_in_bankruptcy_list)
+
+    def test_check_statuses_in_rank_order(self):
+        """Ensures that stocks are checked in rank order, never past the top N operational ones"""
+        companies_stock_name_list = [f'STK{position}' for position in range(10)]
+        checked_batches_list = []
+
+        def check_statuses(stocks_batch_list):
+            checked_batches_list.append(stocks_batch_list)
+            return {stock: stock not in ('STK1', 'STK5') for stock in stocks_batch_list}
+
+        companies_status_dict = LocalStockFilter.check_statuses_in_rank_order(companies_stock_name_list,
+                                                                               check_statuses, top_n=5, batch_size=3)
+
+        self.assertEqual([['STK0', 'STK1', 'STK2'], ['STK3', 'STK4', 'STK5'], ['STK6']], checked_batches_list)
+        self.assertEqual(companies_stock_name_list[:7], list(companies_status_dict))
+        self.assertEqual(5, sum(companies_status_dict.values()))
+
+        with self.assertRaises(SystemExit) as cm:
+            LocalStockFilter.check_statuses_in_rank_order(companies_stock_name_list, check_statuses, batch_size=0)
+        self.assertEqual(cm.exception.code, 1)
+
+    def test_drop_stocks_in_bankruptcy_early_termination(self):
+        """Ensures that the rank order check selects the same stocks as a full check with fewer detail pages"""
+        candidates_data_frame = LocalStockFilter.select_cheapest_stocks(self.stocks_prepared_dataframe)
+        companies_stock_name_list = candidates_data_frame['Stock'].tolist()
+        companies_in_bankruptcy_list = companies_stock_name_list[2:20:6]
+        companies_status_dict = {stock: 'RECUPERACAO JUDICIAL' if stock in companies_in_bankruptcy_list
+                                 else 'FASE OPERACIONAL' for stock in companies_stock_name_list}
+        full_check_data_frame = candidates_data_frame[~candidates_data_frame.Stock.isin(companies_in_bankruptcy_list)]
+
+        with tempfile.TemporaryDirectory() as temp_dir, InvestsiteStub(companies_status_dict) as stub, \
+                patch.object(settings, 'BANKRUPTCY_STATUS_CACHE_FILEPATH', os.path.join(temp_dir, 'cache.db')), \
+                patch.object(settings, 'HTTP_CACHE_BACKEND', 'none'), patch.object(settings, 'UNIT_TEST', False):
+            local_stock_filter = LocalStockFilter()
+            local_stock_filter.indicators_partial_url = stub.indicators_partial_url
+            stocks_data_frame = local_stock_filter.drop_stocks_in_bankruptcy(candidates_data_frame)
+
+        pd.testing.assert_frame_equal(full_check_data_frame.head(settings.SELECTED_STOCKS_LIMIT),
+                                      stocks_data_frame.head(settings.SELECTED_STOCKS_LIMIT))
+        self.assertEqual(companies_in_bankruptcy_list, local_stock_filter.companies_in_bankruptcy_list)
+        self.assertEqual(settings.SELECTED_STOCKS_LIMIT + len(companies_in_bankruptcy_list),
+                         len(stub.requested_stocks_list))
+        self.assertLess(len(stub.requested_stocks_list), len(companies_stock_name_list))
+
+    def test_check_bankruptcy_with_cache_warm_run(self):
+        """Ensures that a warm rerun reuses cached statuses without fetching detail pages"""
+        companies_stock_name_list = self.stocks_filtered_dataframe_list['Stock'].tolist()
+        companies_status_dict = {stock: 'FASE OPERACIONAL' for stock in companies_stock_name_list}
+        companies_status_dict['ALSO3'] = 'RECUPERACAO JUDICIAL'
+
+        with tempfile.TemporaryDirectory() as temp_dir, InvestsiteStub(companies_status_dict) as stub:
+            with patch.object(settings, 'BANKRUPTCY_STATUS_CACHE_FILEPATH', os.path.join(temp_dir, 'cache.db')):
+                local_stock_filter = LocalStockFilter()
+                local_stock_filter.indicators_partial_url = stub.indicators_partial_url
+                cold_run_list = local_stock_filter.check_bankruptcy_with_cache(companies_stock_name_list)
+                cold_run_requests = len(stub.requested_stocks_list)
+                warm_run_list = local_stock_filter.check_bankruptcy_with_cache(companies_stock_name_list)
+
+        self.assertEqual(['ALSO3'], cold_run_list)
+        self.assertEqual(cold_run_list, warm_run_list)
+        self.assertEqual(len(companies_stock_name_list), cold_run_requests)
+        self.assertEqual(cold_run_requests, len(stub.requested_stocks_list))
 
     def test_prepared_dataframe_empty_list(self):
         # The test will automatically fail if no exception / exception other than SystemExit is raised.
@@ -212,12 +335,12 @@ class TestLocalStockFilter(unittest.TestCase):
             self.dataframe_parser.prepare_dataframe(self.empty_stocks_list)
         self.assertEqual(cm.exception.code, 1)
 
-    @patch("web_driver.WebDriver.get_stocks_table")
-    @patch('dataframe_parser.DataframeParser.prepare_dataframe')
-    def test_applied_financial_filters_empty_dataframe(self, mocked_prepare_dataframe, mocked_get_stocks_table):
+    @patch("web_driver.WebDriver.get_stocks_page")
+    @patch('dataframe_parser.DataframeParser.prepare_dataframe_from_page')
+    def test_applied_financial_filters_empty_dataframe(self, mocked_prepare_dataframe, mocked_get_stocks_page):
         # The test will automatically fail if no exception / exception other than SystemExit is raised.
         with self.assertRaises(SystemExit) as cm:
-            mocked_get_stocks_table.return_value = self.stocks_list
+            mocked_get_stocks_page.return_value = render_screener_page(self.stocks_list)
             mocked_prepare_dataframe.return_value = pd.DataFrame()
             LocalStockFilter().apply_financial_filters(self.dataframe_parser)
         self.assertEqual(cm.exception.code, 1)
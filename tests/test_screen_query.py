@@ -0,0 +1,85 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_screen_query.py ; python -m coverage html
+import json
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+import settings
+from local_stock_filter import LocalStockFilter
+from screen_query import Screen, ScreenQueryEngine, load_screens
+from snapshot_store import SnapshotStore
+
+
+class TestScreenQuery(unittest.TestCase):
+    def setUp(self):
+        # Test fixtures, stored as columnar snapshots
+        self.stocks_prepared_dataframe = SnapshotStore(settings.SNAPSHOTS_UT_DIRPATH).load_snapshot('prepared')
+
+        self.screens_list = [
+            Screen('cheapest', [('Financial_Volume_(%)', '>=', 1_000_000), ('EBIT_Margin_(%)', '>=', 0)]),
+            Screen('cheapest_liquid', [('Financial_Volume_(%)', '>=', 1_000_000), ('EBIT_Margin_(%)', '>=', 10)],
+                   top_n=5),
+            Screen('highest_dividend_yield', [('EBIT_Margin_(%)', '>=', 0)], sort_by='Dividend_Yield_(%)',
+                   ascending=False, top_n=10, drop_duplicated_companies=False),
+        ]
+
+    def test_same_result_as_separate_filters(self):
+        """Ensures that a screen selects the same stocks as the separate filters, de-duplication and sort"""
+        stocks_data_frame = LocalStockFilter.drop_low_financial_volume(self.stocks_prepared_dataframe.copy())
+        stocks_data_frame = stocks_data_frame[stocks_data_frame['EBIT_Margin_(%)'] >= 10].sort_index()
+        stocks_data_frame = LocalStockFilter.drop_duplicated_stocks_by_financial_volume(stocks_data_frame)
+        expected_data_frame = stocks_data_frame.nsmallest(5, 'EV_EBIT').reset_index(drop=True)
+
+        screen_data_frame = ScreenQueryEngine(self.stocks_prepared_dataframe).select(self.screens_list[1])
+
+        pd.testing.assert_frame_equal(expected_data_frame, screen_data_frame)
+
+    def test_several_screens_in_one_pass(self):
+        """Ensures that every screen gets its own result and filters used by several screens are evaluated once"""
+        screen_query_engine = ScreenQueryEngine(self.stocks_prepared_dataframe)
+
+        screens_dict = screen_query_engine.run(self.screens_list)
+
+        self.assertEqual(['cheapest', 'cheapest_liquid', 'highest_dividend_yield'], list(screens_dict))
+        self.assertEqual(20, len(screens_dict['cheapest']))
+        self.assertEqual(5, len(screens_dict['cheapest_liquid']))
+        self.assertTrue(screens_dict['cheapest']['EV_EBIT'].is_monotonic_increasing)
+        self.assertTrue(screens_dict['highest_dividend_yield']['Dividend_Yield_(%)'].is_monotonic_decreasing)
+        self.assertEqual(3, len(screen_query_engine.masks_dict))
+
+        pd.testing.assert_frame_equal(LocalStockFilter.select_cheapest_stocks(self.stocks_prepared_dataframe,
+                                                                               top_n=20),
+                                      screens_dict['cheapest'])
+
+    def test_load_screens(self):
+        """Ensures that screens are loaded from JSON and invalid screens raise SystemExit"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            screens_filepath = os.path.join(temp_dir, 'screens.json')
+            with open(screens_filepath, 'w', encoding='utf-8') as screens_file:
+                json.dump([{'name': 'liquid', 'filters': [['Financial_Volume_(%)', '>=', 10_000_000]],
+                            'sort_by': 'EV_EBIT', 'top_n': 3}], screens_file)
+
+            screens_list = load_screens(screens_filepath)
+
+            self.assertEqual(['liquid'], [screen.name for screen in screens_list])
+            self.assertEqual([('Financial_Volume_(%)', '>=', 10_000_000)], screens_list[0].filters_list)
+            self.assertEqual(3, screens_list[0].top_n)
+
+            for screen_dict in ({'filters': []}, {'name': 'a', 'limit': 3},
+                                {'name': 'a', 'filters': [['EV_EBIT', '=>', 0]]}, {'name': 'a', 'top_n': 0}):
+                with self.assertRaises(SystemExit) as cm:
+                    Screen.from_dict(screen_dict)
+                self.assertEqual(cm.exception.code, 1)
+
+        for screens_list in ([Screen('a', [('Unknown', '>=', 0)])], [Screen('a', sort_by='Unknown')],
+                             [Screen('a'), Screen('a')]):
+            with self.assertRaises(SystemExit) as cm:
+                ScreenQueryEngine(self.stocks_prepared_dataframe).run(screens_list)
+            self.assertEqual(cm.exception.code, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_screener_service.py ; python -m coverage html
+import json
+import os
+import tempfile
+import time
+import unittest
+from datetime import date
+from unittest.mock import patch
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pandas as pd
+
+import settings
+from bankruptcy_checker import BankruptcyChecker
+from bankruptcy_status_cache import BankruptcyStatusCache
+from dataframe_parser import DataframeParser
+from local_stock_filter import LocalStockFilter
+from screener_service import ScreenerService
+from tests.investsite_stub import InvestsiteStub, render_screener_page
+from web_driver import WebDriver
+
+
+def request_json(url, method='GET'):
+    try:
+        with urlopen(Request(url, method=method), timeout=settings.HTTP_TIMEOUT_SECONDS) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestScreenerService(unittest.TestCase):
+    def setUp(self):
+        # Test fixture, served as the screener page of 2023-09-07
+        page_text = render_screener_page(pd.read_pickle(settings.PICKLE_UT_FULL_LIST_FILEPATH))
+        stocks_prepared_dataframe = DataframeParser(None).prepare_dataframe_from_page(page_text)
+        self.candidates_list = list(LocalStockFilter.select_cheapest_stocks(stocks_prepared_dataframe.copy())['Stock'])
+        # Cheapest stocks of any volume and margin, the first one is not a default candidate
+        self.loose_stocks_list = list(LocalStockFilter.select_cheapest_stocks(
+            stocks_prepared_dataframe.copy(), top_n=len(stocks_prepared_dataframe), financial_volume=1,
+            ebit_margin=-100)['Stock'])
+
+        # Every stock is operational but the cheapest candidate and the cheapest stock of any volume and margin
+        companies_status_dict = {stock: 'FASE OPERACIONAL' for stock in stocks_prepared_dataframe['Stock']}
+        companies_status_dict[self.candidates_list[0]] = 'RECUPERACAO JUDICIAL'
+        companies_status_dict[self.loose_stocks_list[0]] = 'RECUPERACAO JUDICIAL'
+        screener_pages_dict = {'20230907': page_text}
+
+        self.stub = InvestsiteStub(companies_status_dict, screener_pages_dict).__enter__()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.patches_list = [
+            patch.object(settings, 'INVESTSITE_BASE_URL', self.stub.base_url),
+            patch.object(settings, 'INDICATORS_LAST_DATE_FILEPATH', os.path.join(self.tmp_dir.name, 'last_date')),
+            patch.object(settings, 'BANKRUPTCY_STATUS_CACHE_FILEPATH', os.path.join(self.tmp_dir.name, 'cache.db')),
+            patch('screener_service.date'),
+        ]
+        for patcher in self.patches_list:
+            patcher.start()
+        # The day after the screener date
+        self.patches_list[-1].target.date.today.return_value = date(2023, 9, 8)
+
+        self.screener_service = ScreenerService(indicators_partial_url=self.stub.indicators_partial_url,
+                                                refresh_interval_seconds=3600, port=0)
+
+    def tearDown(self):
+        self.screener_service.server.server_close()
+        for patcher in reversed(self.patches_list):
+            patcher.stop()
+        self.stub.__exit__()
+        self.tmp_dir.cleanup()
+
+    def test_top_stocks_from_memory(self):
+        """Ensures that queries are answered from memory, without stocks in bankruptcy and with their status"""
+        self.screener_service.refresh()
+        requested_stocks_count = len(self.stub.requested_stocks_list)
+
+        top_stocks_data_frame = self.screener_service.get_top_stocks(top_n=5)
+
+        self.assertEqual(self.candidates_list[1:6], list(top_stocks_data_frame['Stock']))
+        self.assertEqual([True] * 5, list(top_stocks_data_frame['Is_Operational']))
+        self.assertEqual(sorted(self.candidates_list), sorted(self.stub.requested_stocks_list))
+        self.assertEqual('20230907', self.screener_service.screener_date)
+
+        # Default candidates were checked by the refresh, the query did not fetch any page
+        self.assertEqual(requested_stocks_count, len(self.stub.requested_stocks_list))
+
+        # Stocks outside the default candidates are checked in rank order until 5 operational ones are found
+        top_stocks_data_frame = self.screener_service.get_top_stocks(top_n=5, financial_volume=1, ebit_margin=-100)
+        self.assertNotIn(self.loose_stocks_list[0], self.candidates_list)
+        self.assertEqual([stock for stock in self.loose_stocks_list
+                          if stock not in (self.loose_stocks_list[0], self.candidates_list[0])][:5],
+                         list(top_stocks_data_frame['Stock']))
+        self.assertEqual([True] * 5, list(top_stocks_data_frame['Is_Operational']))
+        self.assertLessEqual(len(self.stub.requested_stocks_list), requested_stocks_count + 6)
+
+    def test_http_api(self):
+        """Ensures that the HTTP API answers 503 before the first refresh, then top N queries and health"""
+        self.screener_service.refresh_interval_seconds = 0.05
+        with patch.object(ScreenerService, 'run_scheduler'), self.screener_service:
+            status, body_dict = request_json(self.screener_service.base_url + '/top')
+            self.assertEqual(503, status)
+            self.assertEqual('starting', body_dict['status'])
+
+            status, body_dict = request_json(self.screener_service.base_url + '/refresh', method='POST')
+            self.assertEqual(200, status)
+            self.assertEqual(1, body_dict['refreshes'])
+
+            status, body_dict = request_json(self.screener_service.base_url + '/top?n=3&min_ebit_margin=0')
+            self.assertEqual(200, status)
+            self.assertEqual('20230907', body_dict['screener_date'])
+            self.assertEqual(self.candidates_list[1:4], [stock_dict['Stock'] for stock_dict in body_dict['stocks']])
+
+            for query in ('n=three', 'min_financial_volume=-1', 'n=0', f'n={settings.SERVICE_MAX_TOP_N + 1}'):
+                status, _ = request_json(self.screener_service.base_url + '/top?' + query)
+                self.assertEqual(400, status)
+
+            # Thresholds no stock passes
+            status, body_dict = request_json(self.screener_service.base_url + '/top?min_financial_volume=10' + '0' * 12)
+            self.assertEqual(200, status)
+            self.assertEqual([], body_dict['stocks'])
+
+            status, _ = request_json(self.screener_service.base_url + '/unknown')
+            self.assertEqual(404, status)
+
+    def test_check_statuses_outside_lock(self):
+        """Ensures that statuses are fetched without holding the status lock and disk cache hits keep their time"""
+        fetched_at = time.time() - settings.BANKRUPTCY_STATUS_CACHE_TTL_SECONDS / 2
+        with patch('bankruptcy_status_cache.time.time', return_value=fetched_at):
+            BankruptcyStatusCache(settings.BANKRUPTCY_STATUS_CACHE_FILEPATH).store_statuses(
+                {self.candidates_list[1]: True})
+        status_lock_held_list = []
+
+        def check_statuses(checker, companies_stock_name_list):
+            status_lock_held_list.append(self.screener_service.status_lock.locked())
+            return {stock: stock != self.candidates_list[0] for stock in companies_stock_name_list}
+
+        with patch.object(BankruptcyChecker, 'check_statuses', check_statuses):
+            companies_status_dict = self.screener_service.check_statuses(self.candidates_list[:3])
+
+        self.assertEqual({self.candidates_list[0]: False, self.candidates_list[1]: True,
+                          self.candidates_list[2]: True}, companies_status_dict)
+        self.assertEqual([False], status_lock_held_list)
+        self.assertEqual((True, fetched_at), self.screener_service.checked_status_dict[self.candidates_list[1]])
+        self.assertGreater(self.screener_service.checked_status_dict[self.candidates_list[0]][1], fetched_at)
+
+    def test_scheduled_refresh_keeps_data_on_failure(self):
+        """Ensures that scheduled refreshes reuse statuses in memory and a failed refresh keeps the previous data"""
+        self.screener_service.refresh_interval_seconds = 0.05
+        with self.screener_service:
+            deadline = time.time() + 10
+            while self.screener_service.refreshes < 2 and time.time() < deadline:
+                time.sleep(0.01)
+
+            with patch.object(WebDriver, 'get_stocks_page', side_effect=SystemExit(1)):
+                self.assertFalse(self.screener_service.try_refresh())
+
+            health_dict = self.screener_service.get_health()
+            top_stocks_data_frame = self.screener_service.get_top_stocks(top_n=3)
+
+        self.assertGreaterEqual(health_dict['refreshes'], 2)
+        self.assertEqual('ok', health_dict['status'])
+        self.assertIn('SystemExit', health_dict['last_error'])
+        self.assertEqual(self.candidates_list[1:4], list(top_stocks_data_frame['Stock']))
+        self.assertEqual(sorted(self.candidates_list), sorted(self.stub.requested_stocks_list))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_screener_table_parser.py ; python -m coverage html
+import unittest
+from io import StringIO
+
+import pandas as pd
+
+import settings
+from dataframe_parser import DataframeParser
+from investsite_replay import SCREENER_EMPTY_PAGE
+from screener_table_parser import ScreenerTableParser
+from snapshot_store import SnapshotStore
+from tests.investsite_stub import render_screener_page
+
+
+class TestScreenerTableParser(unittest.TestCase):
+    def setUp(self):
+        # Test fixtures, stored as columnar snapshots
+        self.snapshot_store = SnapshotStore(settings.SNAPSHOTS_UT_DIRPATH)
+
+        # List after WebDriver().get_stocks_table()
+        self.stocks_list = pd.read_pickle(settings.PICKLE_UT_FULL_LIST_FILEPATH)
+
+        # Full dataframe after prepare_dataframe(stocks_list)
+        self.stocks_prepared_dataframe = self.snapshot_store.load_snapshot('prepared')
+
+        self.page_text = render_screener_page(self.stocks_list)
+        self.screener_table_parser = ScreenerTableParser()
+
+    def test_rendered_page_matches_fixture(self):
+        """Ensures that the rendered page is read back by pd.read_html into the fixture list"""
+        stocks_list = pd.read_html(StringIO(self.page_text), decimal=',', thousands='.')
+
+        pd.testing.assert_frame_equal(self.stocks_list[1], stocks_list[1])
+
+    def test_parse_matches_prepare_dataframe(self):
+        """Ensures that parse returns the same dataframe as the pd.read_html + prepare_dataframe path"""
+        stocks_list = pd.read_html(StringIO(self.page_text), decimal=',', thousands='.')
+        expected_data_frame = DataframeParser(None).prepare_dataframe(stocks_list)
+
+        pd.testing.assert_frame_equal(expected_data_frame, self.screener_table_parser.parse(self.page_text))
+
+    def test_parse_matches_prepared_fixture(self):
+        """Ensures that parse returns the prepared fixture values (volume integer width is platform dependent)"""
+        pd.testing.assert_frame_equal(self.stocks_prepared_dataframe, self.screener_table_parser.parse(self.page_text),
+                                      check_dtype=False)
+
+    def test_parse_empty_table(self):
+        """Ensures that parse raises SystemExit if the stocks table has no registers"""
+        with self.assertRaises(SystemExit) as cm:
+            self.screener_table_parser.parse(SCREENER_EMPTY_PAGE)
+        self.assertEqual(cm.exception.code, 1)
+
+    def test_parse_missing_table(self):
+        """Ensures that parse raises SystemExit if the stocks table is not in the page"""
+        with self.assertRaises(SystemExit) as cm:
+            self.screener_table_parser.parse('<html><body><table></table></body></html>')
+        self.assertEqual(cm.exception.code, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_snapshot_store.py ; python -m coverage html
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+import settings
+from local_stock_filter import LocalStockFilter
+from snapshot_store import CANDIDATES_SNAPSHOT, SnapshotStore
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        # Test fixtures, stored as columnar snapshots
+        self.fixtures_snapshot_store = SnapshotStore(settings.SNAPSHOTS_UT_DIRPATH)
+        self.stocks_full_dataframe = self.fixtures_snapshot_store.load_snapshot('full')
+        self.stocks_prepared_dataframe = self.fixtures_snapshot_store.load_snapshot('prepared')
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_store = SnapshotStore(self.tmp_dir.name)
+        self.snapshot_date = date(2023, 9, 7)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Ensures that stored raw and prepared tables are loaded back unchanged, index and dtypes included"""
+        for kind, stocks_data_frame in (('raw', self.stocks_full_dataframe),
+                                        ('prepared', self.stocks_prepared_dataframe),
+                                        ('empty', self.stocks_prepared_dataframe.iloc[:0])):
+            self.snapshot_store.store_snapshot(kind, self.snapshot_date, stocks_data_frame)
+
+            pd.testing.assert_frame_equal(stocks_data_frame, self.snapshot_store.load_snapshot(kind))
+
+    def test_load_selected_columns(self):
+        """Ensures that only the requested columns are loaded, numeric ones memory mapped"""
+        self.snapshot_store.store_snapshot('prepared', self.snapshot_date, self.stocks_prepared_dataframe)
+
+        stocks_data_frame = self.snapshot_store.load_snapshot('prepared', self.snapshot_date, ['EV_EBIT', 'Stock'])
+
+        pd.testing.assert_frame_equal(self.stocks_prepared_dataframe[['EV_EBIT', 'Stock']], stocks_data_frame)
+        self.assertIsInstance(stocks_data_frame['EV_EBIT'].to_numpy().base, np.memmap)
+
+    def test_loaded_snapshot_is_copy_on_write(self):
+        """Ensures that changing a loaded snapshot does not change the stored one"""
+        self.snapshot_store.store_snapshot('prepared', self.snapshot_date, self.stocks_prepared_dataframe)
+        stocks_data_frame = self.snapshot_store.load_snapshot('prepared')
+
+        stocks_data_frame.loc[stocks_data_frame.index[0], 'EV_EBIT'] = -1.0
+        stocks_data_frame.fillna(0, inplace=True)
+
+        pd.testing.assert_frame_equal(self.stocks_prepared_dataframe, self.snapshot_store.load_snapshot('prepared'))
+
+    def test_dates_and_most_recent_snapshot(self):
+        """Ensures that dates are listed oldest first and the most recent snapshot is loaded by default"""
+        self.snapshot_store.store_snapshot('prepared', date(2023, 9, 8), self.stocks_prepared_dataframe.head(3))
+        self.snapshot_store.store_snapshot('prepared', self.snapshot_date, self.stocks_prepared_dataframe)
+        os.makedirs(os.path.join(self.tmp_dir.name, 'prepared', '20230909.tmp-1'))
+
+        self.assertEqual([self.snapshot_date, date(2023, 9, 8)], self.snapshot_store.list_dates('prepared'))
+        self.assertEqual(3, len(self.snapshot_store.load_snapshot('prepared')))
+        self.assertEqual([], self.snapshot_store.list_dates('raw'))
+
+    def test_store_replaces_snapshot(self):
+        """Ensures that storing the same kind and date twice keeps only the last table"""
+        self.snapshot_store.store_snapshot('prepared', self.snapshot_date, self.stocks_prepared_dataframe)
+        self.snapshot_store.store_snapshot('prepared', self.snapshot_date, self.stocks_prepared_dataframe.head(3))
+
+        pd.testing.assert_frame_equal(self.stocks_prepared_dataframe.head(3),
+                                      self.snapshot_store.load_snapshot('prepared', self.snapshot_date))
+
+    def test_missing_snapshot_and_columns(self):
+        """Ensures that loading a missing snapshot or column raises SystemExit"""
+        self.snapshot_store.store_snapshot('prepared', self.snapshot_date, self.stocks_prepared_dataframe)
+
+        for kwargs in ({'kind': 'raw'}, {'kind': 'prepared', 'snapshot_date': date(2023, 9, 8)},
+                       {'kind': 'prepared', 'columns_list': ['ROE']}):
+            with self.assertRaises(SystemExit) as cm:
+                self.snapshot_store.load_snapshot(**kwargs)
+            self.assertEqual(cm.exception.code, 1)
+
+    def test_store_unsupported_column(self):
+        """Ensures that storing an object column of other types than str raises SystemExit"""
+        with self.assertRaises(SystemExit) as cm:
+            self.snapshot_store.store_snapshot('raw', self.snapshot_date, pd.DataFrame({'Stock': ['PETR4', 4]}))
+        self.assertEqual(cm.exception.code, 1)
+
+    @patch.object(settings, 'UNIT_TEST', True)
+    def test_drop_stocks_in_bankruptcy_snapshots(self):
+        """Ensures that STORE_PICLE stores the candidates snapshot and USE_PICKLE_DATAFRAME reads it back"""
+        local_stock_filter = LocalStockFilter()
+        local_stock_filter.snapshot_store = self.snapshot_store
+        local_stock_filter.snapshot_date = self.snapshot_date
+
+        with patch.object(settings, 'STORE_PICLE', True), self.assertRaises(SystemExit):
+            local_stock_filter.drop_stocks_in_bankruptcy(self.stocks_prepared_dataframe)
+
+        with patch.object(settings, 'USE_PICKLE_DATAFRAME', True):
+            stocks_data_frame = local_stock_filter.drop_stocks_in_bankruptcy(pd.DataFrame())
+
+        self.assertEqual([self.snapshot_date], self.snapshot_store.list_dates(CANDIDATES_SNAPSHOT))
+        pd.testing.assert_frame_equal(self.stocks_prepared_dataframe, stocks_data_frame)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_startup.py ; python -m coverage html
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from benchmarks.bench_import_time import ONLINE_MODULES_LIST
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code):
+    return subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+
+
+class TestStartup(unittest.TestCase):
+    def test_main_does_not_import_online_modules(self):
+        """Ensures that importing main loads no HTTP, browser, progress bar or spreadsheet module"""
+        completed_process = run_python('import json, sys, main; print(json.dumps(sorted(sys.modules)))')
+
+        modules_list = json.loads(completed_process.stdout)
+
+        self.assertEqual([], [module for module in modules_list
+                              if module.split('.')[0] in ONLINE_MODULES_LIST or module in ONLINE_MODULES_LIST])
+
+    def test_config_parser_import_has_no_side_effects(self):
+        """Ensures that utils.config_parser prints nothing at import and reads its config on first use"""
+        completed_process = run_python('import utils.config_parser as c; print(c.get_config.cache_info().currsize)')
+
+        self.assertEqual('0', completed_process.stdout.strip())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_web_driver_pool.py ; python -m coverage html
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from web_driver import WebDriver
+from web_driver_pool import WebDriverPool
+from web_stock_filter import WebStockFilter
+
+
+class TestWebDriverPool(unittest.TestCase):
+    def setUp(self):
+        self.started_drivers_list = []
+        self.web_driver_pool = WebDriverPool(max_drivers=2, max_pages_per_driver=3, max_memory_mb=0,
+                                             driver_factory=self.fake_driver_factory)
+
+    def fake_driver_factory(self):
+        driver = MagicMock()
+        self.started_drivers_list.append(driver)
+        return driver
+
+    def test_no_driver_started_before_first_use(self):
+        """Ensures that creating the pool does not start any browser"""
+        self.assertEqual([], self.started_drivers_list)
+
+    def test_no_driver_started_by_web_driver_objects(self):
+        """Ensures that WebDriver and WebStockFilter objects do not start browsers when created"""
+        WebDriver(self.web_driver_pool)
+        WebStockFilter(self.web_driver_pool)
+
+        self.assertEqual([], self.started_drivers_list)
+
+    def test_driver_reused(self):
+        """Ensures that a released driver is handed to the next worker instead of starting a new one"""
+        with self.web_driver_pool.driver() as first_driver:
+            pass
+        with self.web_driver_pool.driver() as second_driver:
+            pass
+
+        self.assertIs(first_driver, second_driver)
+        self.assertEqual(1, len(self.started_drivers_list))
+
+    def test_pool_is_bounded(self):
+        """Ensures that a worker waits for a busy driver when the pool is full"""
+        first_driver = self.web_driver_pool.acquire()
+        second_driver = self.web_driver_pool.acquire()
+        acquired_drivers_list = []
+
+        worker = threading.Thread(target=lambda: acquired_drivers_list.append(self.web_driver_pool.acquire()))
+        worker.start()
+        worker.join(timeout=0.2)
+        self.assertTrue(worker.is_alive())
+
+        self.web_driver_pool.release(first_driver)
+        worker.join(timeout=2)
+
+        self.assertEqual([first_driver], acquired_drivers_list)
+        self.assertEqual(2, len(self.started_drivers_list))
+        self.web_driver_pool.release(second_driver)
+
+    def test_driver_recycled_after_max_pages(self):
+        """Ensures that a driver is quit after max_pages_per_driver pages and a new one is started"""
+        for _ in range(4):
+            with self.web_driver_pool.driver():
+                pass
+
+        self.assertEqual(2, len(self.started_drivers_list))
+        self.started_drivers_list[0].quit.assert_called_once()
+        self.started_drivers_list[1].quit.assert_not_called()
+
+    def test_driver_recycled_over_memory_limit(self):
+        """Ensures that a driver is quit when it uses more memory than allowed"""
+        with patch.object(WebDriverPool, 'is_over_memory_limit', return_value=True):
+            with self.web_driver_pool.driver():
+                pass
+
+        self.started_drivers_list[0].quit.assert_called_once()
+
+    def test_shutdown(self):
+        """Ensures that shutdown quits idle drivers, busy drivers on release and refuses new requests"""
+        busy_driver = self.web_driver_pool.acquire()
+        with self.web_driver_pool.driver() as idle_driver:
+            pass
+
+        self.web_driver_pool.shutdown()
+        idle_driver.quit.assert_called_once()
+        busy_driver.quit.assert_not_called()
+
+        self.web_driver_pool.release(busy_driver)
+        busy_driver.quit.assert_called_once()
+
+        with self.assertRaises(SystemExit) as cm:
+            self.web_driver_pool.acquire()
+        self.assertEqual(cm.exception.code, 1)
+
+    def test_invalid_pool_size(self):
+        """Ensures that WebDriverPool raises SystemExit if an invalid size is received"""
+        with self.assertRaises(SystemExit) as cm:
+            WebDriverPool(max_drivers=0, driver_factory=self.fake_driver_factory)
+        self.assertEqual(cm.exception.code, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,17 +2,19 @@
 # python -m coverage run -m pytest .\test_web_stock_filter.py ; python -m coverage html
 import unittest
 
-import pandas as pd
-
 import settings
+from snapshot_store import SnapshotStore
 from web_stock_filter import WebStockFilter
 from utils.config_parser import get_indicators_url
 
 
 class TestWebStockFilter(unittest.TestCase):
     def setUp(self):
+        # Test fixtures, stored as columnar snapshots
+        self.snapshot_store = SnapshotStore(settings.SNAPSHOTS_UT_DIRPATH)
+
         self.empty_stocks_list = []
-        self.stocks_filtered_dataframe = pd.read_pickle(settings.PICKLE_UT_FILTERED_FILEPATH)
+        self.stocks_filtered_dataframe = self.snapshot_store.load_snapshot('filtered')
         self.companies_stock_name_list = list(self.stocks_filtered_dataframe['Stock'])
         self.companies_stock_link_list = [
             get_indicators_url()
@@ -25,15 +27,15 @@ class TestWebStockFilter(unittest.TestCase):
             for stock_check_link in self.companies_stock_name_list
         ]
 
-    def test_request_invalid_thread_nums_link(self):
+    def test_request_empty_link_list(self):
         # The test will automatically fail if no exception / exception other than SystemExit is raised.
         with self.assertRaises(SystemExit) as cm:
-            WebStockFilter().check_bankruptcy(
-                self.companies_stock_link_list,
-                self.empty_stocks_list,
-                -1,
-                -1
-            )
+            WebStockFilter().check_bankruptcy(self.empty_stocks_list)
+        self.assertEqual(cm.exception.code, 1)
+
+    def test_request_invalid_workers(self):
+        with self.assertRaises(SystemExit) as cm:
+            WebStockFilter().check_bankruptcy(self.companies_stock_link_list, max_workers=0)
         self.assertEqual(cm.exception.code, 1)
 
 
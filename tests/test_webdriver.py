@@ -1,20 +1,35 @@
 # AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
 # python -m coverage run -m pytest .\test_webdriver.py ; python -m coverage html
+import os.path
+import socket
+import tempfile
 import unittest
-from datetime import datetime
+from datetime import date, datetime
 from unittest.mock import patch, PropertyMock
 
 import pandas as pd
 import requests
-from cachecontrol import CacheControl
-from cachecontrol.caches import FileCache
 
+import settings
+from investsite_replay import ReplayServer
+from tests.investsite_stub import InvestsiteStub, SCREENER_PAGE_TEMPLATE, build_fixture_archive
 from web_driver import WebDriver
 
 
 class TestWebDriver(unittest.TestCase):
 
     def setUp(self):
+        # Test fixture, replayed as the screener page of 2023-09-07 and of any later date, offline
+        self.replay_server = ReplayServer(build_fixture_archive(pd.read_pickle(settings.PICKLE_UT_FULL_LIST_FILEPATH),
+                                                                '20230907'), fill_dates=True).__enter__()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.patches_list = [
+            patch.object(settings, 'INVESTSITE_BASE_URL', self.replay_server.base_url),
+            patch.object(settings, 'INDICATORS_LAST_DATE_FILEPATH', os.path.join(self.tmp_dir.name, 'last_date')),
+        ]
+        for patcher in self.patches_list:
+            patcher.start()
+
         self.web_driver_obj = WebDriver()
         self.all_df_columns = ['Ação', 'Empresa', 'Preço', 'Data Preço', 'Data Dem.Financ.', 'Consolidação', 'ROTanC',
                                'ROInvC', 'RPL', 'ROA', 'Margem Líquida', 'Margem Bruta', 'Margem EBIT', 'Giro Ativo',
@@ -23,8 +38,15 @@ class TestWebDriver(unittest.TestCase):
                                'EV/EBIT', 'EV/EBITDA', 'EV/Rec.Líq.', 'EV/FCO', 'EV/FCF', 'EV/Ativo Total',
                                'Div.Yield', 'Volume Financ.(R$)', 'Market Cap(R$)', '# Ações Total', '# Ações Ord.',
                                '# Ações Pref.']
-        # Reducing number of requests, using keep-alive and improving performance by using Cache
-        self.session = CacheControl(requests.Session(), cache=FileCache('.web_cache'))
+        # Keep-alive connections, nothing is cached on disk
+        self.session = requests.Session()
+
+    def tearDown(self):
+        for patcher in reversed(self.patches_list):
+            patcher.stop()
+        self.session.close()
+        self.replay_server.__exit__()
+        self.tmp_dir.cleanup()
 
     def test_stocks_table_has_all_columns(self):
         stocks_list = self.web_driver_obj.get_stocks_table()
@@ -34,10 +56,15 @@ class TestWebDriver(unittest.TestCase):
         self.assertEqual(stocks_data_frame.columns.tolist(), self.all_df_columns)
 
     def test_request_exception(self):
+        # A local port nothing listens on, connections are refused without leaving the machine
+        with socket.socket() as closed_socket:
+            closed_socket.bind(('127.0.0.1', 0))
+            closed_port = closed_socket.getsockname()[1]
+
         # Mocking attribute within the class
         with patch.object(WebDriver, 'indicators_url', new_callable=PropertyMock) as attr_mock:
             with self.assertRaises(SystemExit) as cm:
-                attr_mock.return_value = 'https://invalidwebdriverlink.com'
+                attr_mock.return_value = f'http://127.0.0.1:{closed_port}/selecao_acoes.php'
                 WebDriver().get_stocks_table()
             self.assertEqual(cm.exception.code, 1)
 
@@ -78,6 +105,60 @@ class TestWebDriver(unittest.TestCase):
 
         self.assertTrue(response.ok)
 
+    def probe_stub_indicators_url(self, stub, current_date, last_date_filepath):
+        with (patch.object(settings, 'INVESTSITE_BASE_URL', stub.base_url),
+              patch.object(WebDriver, 'current_date', current_date),
+              patch.object(settings, 'INDICATORS_LAST_DATE_FILEPATH', last_date_filepath)):
+            web_driver = WebDriver()
+            web_driver.update_indicators_url()
+        return web_driver
+
+    def test_update_indicators_url_across_month_boundary(self):
+        """Ensures that probing goes back to the previous month and the found date is stored"""
+        screener_pages_dict = {'20230831': SCREENER_PAGE_TEMPLATE.format(date='31/08/2023')}
+
+        with tempfile.TemporaryDirectory() as temp_dir, InvestsiteStub(screener_pages_dict=screener_pages_dict) as stub:
+            last_date_filepath = os.path.join(temp_dir, 'last_date')
+            web_driver = self.probe_stub_indicators_url(stub, date(2023, 9, 3), last_date_filepath)
+
+            self.assertEqual('20230831', web_driver.updated_date)
+            self.assertTrue('20230831' in web_driver.indicators_url)
+            self.assertEqual(['20230902', '20230901', '20230831'], stub.requested_dates_list)
+            with open(last_date_filepath) as last_date_file:
+                self.assertEqual('20230831', last_date_file.read())
+
+    def test_update_indicators_url_stops_at_last_good_date(self):
+        """Ensures that dates older than the stored last good date are not probed"""
+        with tempfile.TemporaryDirectory() as temp_dir, InvestsiteStub() as stub:
+            last_date_filepath = os.path.join(temp_dir, 'last_date')
+            with open(last_date_filepath, 'w') as last_date_file:
+                last_date_file.write('20230831')
+            web_driver = self.probe_stub_indicators_url(stub, date(2023, 9, 3), last_date_filepath)
+
+        self.assertEqual('20230831', web_driver.updated_date)
+        self.assertEqual(['20230902', '20230901'], stub.requested_dates_list)
+
+    def test_update_indicators_url_max_lookback(self):
+        """Ensures that update_indicators_url raises SystemExit after INDICATORS_MAX_LOOKBACK_DAYS empty pages"""
+        with tempfile.TemporaryDirectory() as temp_dir, InvestsiteStub() as stub:
+            with self.assertRaises(SystemExit) as cm:
+                self.probe_stub_indicators_url(stub, date(2023, 9, 3), os.path.join(temp_dir, 'last_date'))
+
+        self.assertEqual(cm.exception.code, 1)
+        self.assertEqual(settings.INDICATORS_MAX_LOOKBACK_DAYS, len(stub.requested_dates_list))
+
+    def test_update_indicators_url_old_last_good_date(self):
+        """Ensures that a last good date older than the lookback window is used when newer dates are empty"""
+        with tempfile.TemporaryDirectory() as temp_dir, InvestsiteStub() as stub:
+            last_date_filepath = os.path.join(temp_dir, 'last_date')
+            with open(last_date_filepath, 'w') as last_date_file:
+                last_date_file.write('20230801')
+            web_driver = self.probe_stub_indicators_url(stub, date(2023, 9, 3), last_date_filepath)
+
+        self.assertEqual('20230801', web_driver.updated_date)
+        self.assertTrue('20230801' in web_driver.indicators_url)
+        self.assertEqual(settings.INDICATORS_MAX_LOOKBACK_DAYS, len(stub.requested_dates_list))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,88 @@
+# AAA - Arrange, Act, Assert - https://docs.pytest.org/en/7.1.x/explanation/anatomy.html#test-anatomy
+# python -m coverage run -m pytest .\test_work_queue.py ; python -m coverage html
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import settings
+from bankruptcy_checker import BankruptcyChecker
+from http_client import CircuitOpenError
+from tests.investsite_stub import InvestsiteStub
+from work_queue import WorkQueue
+
+
+class TestWorkQueue(unittest.TestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.processed_tasks_list = []
+
+    def process_task(self, task, timeout_seconds):
+        if task == 'SLOW':
+            time.sleep(0.3)
+        with self.lock:
+            self.processed_tasks_list.append(task)
+        return task.lower()
+
+    def test_every_task_processed_once(self):
+        """Ensures that every distinct task is processed once and a slow task does not hold the others"""
+        tasks_list = ['SLOW'] + [f'TASK{task_num}' for task_num in range(10)] + ['TASK0']
+
+        result_collector = WorkQueue(self.process_task, max_workers=2, retries=0).run(tasks_list)
+
+        self.assertEqual(11, len(self.processed_tasks_list))
+        self.assertEqual(set(tasks_list), set(self.processed_tasks_list))
+        self.assertEqual('SLOW', self.processed_tasks_list[-1])
+        self.assertEqual({task: task.lower() for task in tasks_list}, result_collector.results_dict)
+        self.assertEqual({}, result_collector.errors_dict)
+
+    def test_retries(self):
+        """Ensures that failed attempts are retried and errors are recorded once every attempt failed"""
+        failures_dict = {'FLAKY': 1, 'BROKEN': 10}
+
+        def flaky_task(task, timeout_seconds):
+            if failures_dict[task] > 0:
+                failures_dict[task] -= 1
+                raise ConnectionError(f'{task} unavailable')
+            return timeout_seconds
+
+        result_collector = WorkQueue(flaky_task, max_workers=2, retries=2, timeout_seconds=5).run(['FLAKY', 'BROKEN'])
+
+        self.assertEqual({'FLAKY': 5}, result_collector.results_dict)
+        self.assertEqual({'FLAKY': 2, 'BROKEN': 3}, result_collector.attempts_dict)
+        self.assertEqual(['BROKEN'], list(result_collector.errors_dict))
+        self.assertIn('BROKEN unavailable', result_collector.errors_dict['BROKEN'])
+
+    def test_invalid_parameters(self):
+        """Ensures that WorkQueue raises SystemExit on invalid workers, retries or timeout"""
+        for kwargs in ({'max_workers': 0}, {'retries': -1}, {'timeout_seconds': 0}):
+            with self.assertRaises(SystemExit) as cm:
+                WorkQueue(self.process_task, **kwargs)
+            self.assertEqual(cm.exception.code, 1)
+
+    def test_bankruptcy_checker_retries(self):
+        """Ensures that BankruptcyChecker leaves retries to the HTTP client and raises SystemExit on a failing page"""
+        with patch.object(settings, 'HTTP_CACHE_BACKEND', 'none'), \
+                InvestsiteStub({'PETR4': 'FASE OPERACIONAL'}) as stub, self.assertRaises(SystemExit) as cm:
+            BankruptcyChecker(stub.indicators_partial_url).check_statuses(['PETR4', 'MISSING3'])
+
+        self.assertEqual(cm.exception.code, 1)
+        # 404 is not retried by the HTTP client and the queue does not retry on top of it
+        self.assertEqual(1, stub.requested_stocks_list.count('MISSING3'))
+
+    def test_circuit_open_not_retried(self):
+        """Ensures that a task failing fast on the open circuit breaker is not retried"""
+        attempts_list = []
+
+        def circuit_open_task(task, timeout_seconds):
+            attempts_list.append(task)
+            raise CircuitOpenError('Circuit breaker is open')
+
+        result_collector = WorkQueue(circuit_open_task, max_workers=1, retries=2).run(['PETR4'])
+
+        self.assertEqual(['PETR4'], attempts_list)
+        self.assertEqual(['PETR4'], list(result_collector.errors_dict))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,22 +1,22 @@
 import configparser
+from functools import lru_cache
 
 from pathlib import Path
 
 cfg_file = '../config/config_tests.ini'
 cfg_file_dir = 'config'
 
-config = configparser.ConfigParser()
 BASE_DIR = Path(__file__).resolve().parent.parent
-print(BASE_DIR)
 CONFIG_FILE = BASE_DIR.joinpath(cfg_file_dir).joinpath(cfg_file)
-print(CONFIG_FILE)
 
-# Reading keys from pet_sqa.ini
-config.read(CONFIG_FILE)
 
-
-def get_indicators_url() -> str:
-    return config['indicators']['url']
+@lru_cache(maxsize=None)
+def get_config() -> configparser.ConfigParser:
+    # Read on first use, importing this module has no side effects
+    config = configparser.ConfigParser()
+    config.read(CONFIG_FILE)
+    return config
 
 
-print(get_indicators_url())
+def get_indicators_url() -> str:
+    return get_config()['indicators']['url']
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+# pt-BR cells: "." groups thousands, "," is the decimal mark and percentages end with "%"
+BR_NUMBER_TRANSLATION = str.maketrans({'.': None, '%': None, ',': '.', ' ': None, '\xa0': None})
+BR_NUMBER_MISSING_LIST = ['', '-']
+
+
+def decode_br_numbers(
+        values: pd.Series,
+        na_value: float = np.nan
+) -> pd.Series:
+    r"""
+    Convert pt-BR formatted cells ("1.234,56", "12,3%", "-") to float64 in a single pass over the strings.
+    Columns already parsed as numbers are only cast, empty, "-" and missing cells become `na_value`.
+
+    Return
+    -------
+    Pandas `Series` of float64
+    """
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        decoded_values = values.astype(np.float64)
+    else:
+        # Non string cells (NaN, or 0 left by fillna) are missing, same as the .str accessor does
+        translated_values = values.map(
+            lambda value: value.translate(BR_NUMBER_TRANSLATION) if isinstance(value, str) else np.nan)
+        translated_values = translated_values.mask(translated_values.isin(BR_NUMBER_MISSING_LIST))
+        try:
+            decoded_values = pd.to_numeric(translated_values, errors='raise').astype(np.float64)
+        except (ValueError, TypeError) as e:
+            print(f'Cannot decode {values.name} numbers, data is corrupted.\nError message: {e}')
+            raise SystemExit(1)
+
+    if not pd.isna(na_value):
+        decoded_values = decoded_values.fillna(na_value)
+
+    return decoded_values
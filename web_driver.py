@@ -1,18 +1,17 @@
-import time
-from datetime import datetime, timedelta
-from typing import List
+from datetime import date, datetime, timedelta
+from io import StringIO
+from typing import List, Optional
 
 import pandas as pd
 import requests
-from cachecontrol import CacheControl
-from cachecontrol.caches import FileCache
-from rich.progress import Progress
-from selenium.common import NoSuchElementException
-from selenium.webdriver.common.by import By
+from lxml import html
 
-from utils.helper import is_text_in_xpath
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+import settings
+from http_client import HEADER_DICT, HttpClient
+from instrumentation import stage_events
+from web_driver_pool import WebDriverPool, web_driver_pool
+
+INVESTSITE_HOST_URL = 'https://www.investsite.com.br'
 
 
 class WebDriver:
@@ -37,27 +36,27 @@ class WebDriver:
     updated_date: str = ''
 
     def __init__(
-            self
+            self,
+            driver_pool: WebDriverPool = web_driver_pool
     ) -> None:
         self.indicators_url_status: str = 'Sem registros para mostrar'
         self.indicators_url_xpath: str = '//*[@id="tabela_selecao_acoes"]/tbody/tr/td'
 
-        self.user_agent: str = ('Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) '
-                                'Chrome/50.0.2661.75 Safari/537.36')
+        # Screener pages of the configured host, the live site or a replay server
+        self.indicators_url = self.indicators_url.replace(INVESTSITE_HOST_URL, settings.INVESTSITE_BASE_URL)
+
         self.url_request_type: str = 'XMLHttpRequest'
         self.header = {
-            'User-Agent': self.user_agent,
-            'X-Requested-With': self.url_request_type,
-            'Accept-Encoding': 'gzip'
+            **HEADER_DICT,
+            'X-Requested-With': self.url_request_type
         }
 
-        self.chrome_options = Options()
-        self.chrome_options.add_argument("--headless")
-        self.chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        self.driver = webdriver.Chrome(options=self.chrome_options)
+        # Browsers are borrowed from the pool only when a page is loaded
+        self.driver_pool: WebDriverPool = driver_pool
 
-        # Reducing number of requests, using keep-alive and improving performance by using Cache
-        self.session = CacheControl(requests.Session(), cache=FileCache('.web_cache'))
+        # Reducing number of requests, using keep-alive and improving performance by using Cache, rate limited,
+        # retried and guarded by the circuit breaker shared with the other investsite clients
+        self.http_client = HttpClient()
 
     # end def
 
@@ -71,45 +70,140 @@ class WebDriver:
         -------
         `List` of `DataFrames`
         """
-        self.update_indicators_url()
-
-        with Progress() as progress:
-            task1 = progress.add_task("[green]Getting indicators:        ", total=100)
-
-            while not progress.finished:
-                progress.update(task1, advance=20)
-                try:
-                    response = self.session.get(self.indicators_url, headers=self.header)
-                    progress.update(task1, advance=50)
-                    time.sleep(0.25)
-                except requests.exceptions.RequestException as e:
-                    print(f'Error accessing www.investsite.com.br\nError message: {e}')
-                    raise SystemExit(1)
-                else:
-                    stocks_list = pd.read_html(response.text, decimal=',', thousands='.')
-                    progress.update(task1, advance=30)
-
-        return stocks_list
+        return pd.read_html(StringIO(self.get_stocks_page()), decimal=',', thousands='.')
 
     # end def
+
+    def get_stocks_page(
+            self
+    ) -> str:
+        r"""
+        Get stocks screener page of the most recent date with registers.
+
+        Return
+        -------
+        Page HTML as `str`
+        """
+        with stage_events.stage('Getting indicators'):
+            self.update_indicators_url()
+
+            try:
+                response = self.http_client.get(self.indicators_url, headers=self.header)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                print(f'Error accessing www.investsite.com.br\nError message: {e}')
+                raise SystemExit(1)
+
+        return response.text
+
+    # end def
+
     def update_indicators_url(self) -> None:
         r"""
-        Get indicators URL and reformat it to updated link date.
+        Get indicators URL and reformat it to the most recent link date with registers to be shown.
+        Dates are probed over HTTP from yesterday backwards, up to INDICATORS_MAX_LOOKBACK_DAYS, and the
+        search stops at the last good date stored on disk since it is known to have registers. A last good date
+        older than the lookback window is used when no newer date has registers.
         """
-        self.current_date -= timedelta(days=1)
-        self.updated_date = str(datetime.today().date().replace(day=self.current_date.day)).replace('-', '')
-        self.indicators_url = self.indicators_url.replace(self.old_date_str, self.updated_date)
+        last_good_date = self.load_last_good_date()
+
+        for days_back in range(1, settings.INDICATORS_MAX_LOOKBACK_DAYS + 1):
+            probe_date = self.current_date - timedelta(days=days_back)
+            if last_good_date is not None and probe_date <= last_good_date:
+                probe_date = last_good_date
+                break
+            if self.has_registers(self.get_indicators_url(probe_date)):
+                break
+        else:
+            if last_good_date is None:
+                print(f'Could not find indicators in the last {settings.INDICATORS_MAX_LOOKBACK_DAYS} days.')
+                raise SystemExit(1)
+            probe_date = last_good_date
+
+        self.store_last_good_date(probe_date)
+        self.indicators_url = self.get_indicators_url(probe_date)
+        self.updated_date = probe_date.strftime('%Y%m%d')
         self.old_date_str = self.updated_date
 
+    # end def
+
+    def get_indicators_url(
+            self,
+            link_date: date
+    ) -> str:
+        r"""
+        Reformat indicators URL to `link_date`.
+
+        Return
+        -------
+        Indicators URL as `str`
+        """
+        return self.indicators_url.replace(self.old_date_str, link_date.strftime('%Y%m%d'))
+
+    # end def
+
+    def has_registers(
+            self,
+            indicators_url: str
+    ) -> bool:
+        r"""
+        Fetch indicators page over HTTP and verify if it contains registers to be shown.
+
+        Return
+        -------
+        `True` if stocks table has registers, `False` otherwise
+        """
         try:
-            self.driver.get(self.indicators_url)
-            webpage_text_status = self.driver.find_element(By.XPATH, self.indicators_url_xpath)
-        except NoSuchElementException as e:
-            print(f'{e} Could not find XPATH, webpage is empty.')
-            raise NoSuchElementException
-
-        # Verify if link contains registers to be shown, otherwise try previous day
-        if is_text_in_xpath(self.indicators_url_status, webpage_text_status):
-            self.update_indicators_url()
+            response = self.http_client.get(indicators_url, headers=self.header)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f'Error accessing www.investsite.com.br\nError message: {e}')
+            raise SystemExit(1)
+
+        return self.page_has_registers(response.text)
+
+    # end def
+
+    def page_has_registers(
+            self,
+            page_text: str
+    ) -> bool:
+        r"""
+        Verify if the stocks table of a screener page contains registers to be shown.
+
+        Return
+        -------
+        `True` if stocks table has registers, `False` otherwise
+        """
+        page_tree = html.fromstring(page_text)
+        table_cells = (page_tree.xpath(self.indicators_url_xpath)
+                       or page_tree.xpath(self.indicators_url_xpath.replace('/tbody', '')))
+
+        return len(table_cells) > 1 or (bool(table_cells)
+                                        and self.indicators_url_status not in table_cells[0].text_content())
+
+    # end def
+
+    @staticmethod
+    def load_last_good_date() -> Optional[date]:
+        r"""
+        Read last link date with registers from disk.
+
+        Return
+        -------
+        `date` or `None` if it was never stored
+        """
+        try:
+            with open(settings.INDICATORS_LAST_DATE_FILEPATH) as last_date_file:
+                return datetime.strptime(last_date_file.read().strip(), '%Y%m%d').date()
+        except (OSError, ValueError):
+            return None
+
+    # end def
+
+    @staticmethod
+    def store_last_good_date(link_date: date) -> None:
+        with open(settings.INDICATORS_LAST_DATE_FILEPATH, 'w') as last_date_file:
+            last_date_file.write(link_date.strftime('%Y%m%d'))
 
     # end def
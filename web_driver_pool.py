@@ -0,0 +1,190 @@
+import atexit
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import settings
+
+try:
+    import psutil
+except ImportError:
+    # Memory based recycling is disabled without psutil, page based recycling still applies
+    psutil = None
+
+
+def create_chrome_driver():
+    r"""
+    Start a headless Chrome instance. Selenium is imported by the first browser start only.
+
+    Return
+    -------
+    Selenium `webdriver.Chrome`
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    return webdriver.Chrome(options=chrome_options)
+
+
+class WebDriverPool:
+    def __init__(
+            self,
+            max_drivers: int = settings.WEB_DRIVER_POOL_SIZE,
+            max_pages_per_driver: int = settings.WEB_DRIVER_MAX_PAGES,
+            max_memory_mb: int = settings.WEB_DRIVER_MAX_MEMORY_MB,
+            driver_factory: Callable = create_chrome_driver
+    ) -> None:
+        if max_drivers <= 0 or max_pages_per_driver <= 0:
+            print('Invalid web driver pool size.')
+            raise SystemExit(1)
+
+        self.max_drivers: int = max_drivers
+        self.max_pages_per_driver: int = max_pages_per_driver
+        self.max_memory_mb: int = max_memory_mb
+        self.driver_factory: Callable = driver_factory
+
+        self.idle_drivers_list: List = []
+        self.pages_per_driver_dict: Dict[int, int] = {}
+        self.started_drivers: int = 0
+        self.is_closed: bool = False
+        self.condition = threading.Condition()
+
+    # end def
+
+    @contextmanager
+    def driver(self):
+        r"""
+        Borrow a driver for one page, the driver is returned to the pool (or recycled) on exit.
+
+        Return
+        -------
+        Selenium `WebDriver`
+        """
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    # end def
+
+    def acquire(self):
+        r"""
+        Get an idle driver, starting a new one on first use while the pool is not full.
+        Blocks until a driver is released when all of them are busy.
+
+        Return
+        -------
+        Selenium `WebDriver`
+        """
+        with self.condition:
+            while True:
+                if self.is_closed:
+                    print('Cannot acquire web driver, pool is shut down.')
+                    raise SystemExit(1)
+                if self.idle_drivers_list:
+                    return self.idle_drivers_list.pop()
+                if self.started_drivers < self.max_drivers:
+                    self.started_drivers += 1
+                    break
+                self.condition.wait()
+
+        # Starting a browser is slow, do not hold the lock meanwhile
+        try:
+            driver = self.driver_factory()
+        except BaseException:
+            with self.condition:
+                self.started_drivers -= 1
+                self.condition.notify()
+            raise
+
+        with self.condition:
+            self.pages_per_driver_dict[id(driver)] = 0
+        return driver
+
+    # end def
+
+    def release(
+            self,
+            driver
+    ) -> None:
+        r"""
+        Give back a borrowed driver, quitting it when it reached the page or memory limit or the pool is closed.
+        """
+        with self.condition:
+            self.pages_per_driver_dict[id(driver)] += 1
+            is_recycled = (self.is_closed or self.pages_per_driver_dict[id(driver)] >= self.max_pages_per_driver
+                           or self.is_over_memory_limit(driver))
+
+            if is_recycled:
+                del self.pages_per_driver_dict[id(driver)]
+                self.started_drivers -= 1
+            else:
+                self.idle_drivers_list.append(driver)
+            self.condition.notify()
+
+        if is_recycled:
+            driver.quit()
+
+    # end def
+
+    def is_over_memory_limit(
+            self,
+            driver
+    ) -> bool:
+        r"""
+        Check if the driver process and its browser children use more memory than allowed.
+
+        Return
+        -------
+        `True` if memory limit is exceeded, `False` otherwise or if memory cannot be measured
+        """
+        driver_pid = self.get_driver_pid(driver)
+        if psutil is None or not self.max_memory_mb or driver_pid is None:
+            return False
+
+        try:
+            process = psutil.Process(driver_pid)
+            processes_list = [process] + process.children(recursive=True)
+            memory_bytes = sum(child.memory_info().rss for child in processes_list)
+        except psutil.Error:
+            return False
+
+        return memory_bytes > self.max_memory_mb * 1024 * 1024
+
+    # end def
+
+    @staticmethod
+    def get_driver_pid(driver) -> Optional[int]:
+        try:
+            return driver.service.process.pid
+        except AttributeError:
+            return None
+
+    # end def
+
+    def shutdown(self) -> None:
+        r"""
+        Quit all idle drivers, busy drivers are quit as soon as they are released.
+        """
+        with self.condition:
+            self.is_closed = True
+            idle_drivers_list = self.idle_drivers_list
+            self.idle_drivers_list = []
+            for driver in idle_drivers_list:
+                del self.pages_per_driver_dict[id(driver)]
+            self.started_drivers -= len(idle_drivers_list)
+            self.condition.notify_all()
+
+        for driver in idle_drivers_list:
+            driver.quit()
+
+    # end def
+
+
+# Shared by WebDriver and WebStockFilter, no browser is started until a page is requested
+web_driver_pool = WebDriverPool()
+atexit.register(web_driver_pool.shutdown)
@@ -1,65 +1,92 @@
-import threading
 from typing import List
 
 from selenium.common import InvalidArgumentException
 from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.common.by import By
 
+import settings
+from company_index import CompanyIndex
 from utils.helper import is_text_in_xpath
 from web_driver import WebDriver
-
-# Creating lock to avoid race condition on shared resource
-lock = threading.RLock()
+from web_driver_pool import WebDriverPool, web_driver_pool
+from work_queue import WorkQueue
 
 
 class WebStockFilter(WebDriver):
     def __init__(
-            self
+            self,
+            driver_pool: WebDriverPool = web_driver_pool
     ) -> None:
-        super().__init__()
+        super().__init__(driver_pool)
         self.stock_bankruptcy_status: str = 'FASE OPERACIONAL'
         self.bankruptcy_text_xpath: str = '//*[@id="tabela_resumo_empresa"]/tbody/tr[4]/td[2]'
 
     def check_bankruptcy(
             self,
             companies_stock_link_list: List,
-            companies_in_bankruptcy_list: List,
-            first_half_per_thread: int,
-            second_half_per_thread: int
+            max_workers: int = settings.DETAIL_CHECK_WORKERS
     ) -> List:
         r"""
-        Gets `List` of local-filtered stocks and do `multiprocessing` web analysis using bankruptcy indicators
-        for each stock.
+        Gets `List` of local-filtered stocks links and do web analysis using bankruptcy indicators for each stock.
+        Links are taken from a shared work queue by `max_workers` browsers. Only the first link of each company is
+        loaded, once, retried up to DETAIL_CHECK_RETRIES times, and its status applies to the company's tickers.
 
         Return
         -------
-        `List` of stocks in bankruptcy
+        `List` of stocks in bankruptcy, in the received order
         """
-        if first_half_per_thread < 0 or second_half_per_thread < 0:
-            print('Invalid thread division.')
+        if not companies_stock_link_list:
+            print('Cannot fetch links, list is empty or corrupted.')
             raise SystemExit(1)
 
-        if companies_stock_link_list:
-            for company_stock_link in companies_stock_link_list[first_half_per_thread:second_half_per_thread]:
-                try:
-                    self.driver.get(company_stock_link)
-                except InvalidArgumentException as e:
-                    print(f'{e} Cannot fetch links, list is empty or corrupted.')
-                    raise InvalidArgumentException
-                else:
-                    try:
-                        bankruptcy_situation = self.driver.find_element(By.XPATH, self.bankruptcy_text_xpath)
-                    except NoSuchElementException as e:
-                        print(f'{e} Could not find XPATH, webpage is empty.')
-                        raise NoSuchElementException
-                    else:
-                        if not is_text_in_xpath(self.stock_bankruptcy_status, bankruptcy_situation):
-                            # print(f"Found {company_stock_link[-5:]} in bankruptcy to be removed "
-                            #       f"from selected stocks.")
-                            with lock:
-                                companies_in_bankruptcy_list.append(company_stock_link[-5:])
-        else:
-            print('Cannot fetch links, list is empty or corrupted.')
+        stock_link_dict = {company_stock_link.split('cod_negociacao=')[-1]: company_stock_link
+                           for company_stock_link in companies_stock_link_list}
+        company_index = CompanyIndex(list(stock_link_dict))
+        result_collector = WorkQueue(self.is_operational, max_workers=max_workers).run(
+            [stock_link_dict[stock] for stock in company_index.get_representative_stocks()])
+        if result_collector.errors_dict:
+            print(f'Could not check {list(result_collector.errors_dict)}\n'
+                  f'Error messages: {list(result_collector.errors_dict.values())}')
             raise SystemExit(1)
 
-        return companies_in_bankruptcy_list
+        companies_status_dict = company_index.get_company_statuses(
+            {stock: result_collector.results_dict[stock_link_dict[stock]]
+             for stock in company_index.get_representative_stocks()})
+
+        return [stock for stock in stock_link_dict if not companies_status_dict[stock]]
+
+    def is_operational(
+            self,
+            company_stock_link: str,
+            timeout_seconds: float = settings.DETAIL_CHECK_TIMEOUT_SECONDS
+    ) -> bool:
+        r"""
+        Load indicators page of one stock in a pooled browser and check if company is in operational phase.
+
+        Return
+        -------
+        `True` if company is operational, `False` otherwise
+        """
+        with self.driver_pool.driver() as driver:
+            driver.set_page_load_timeout(timeout_seconds)
+            # Browsers draw from the same rate limit and circuit breaker as the HTTP clients
+            self.http_client.rate_limiter.acquire()
+            self.http_client.circuit_breaker.before_request()
+            try:
+                driver.get(company_stock_link)
+            except InvalidArgumentException as e:
+                self.http_client.circuit_breaker.record_failure()
+                print(f'{e} Cannot fetch links, list is empty or corrupted.')
+                raise InvalidArgumentException
+            except BaseException:
+                # Every admitted request reports its outcome, a half-open trial is never left in flight
+                self.http_client.circuit_breaker.record_failure()
+                raise
+            self.http_client.circuit_breaker.record_success()
+            try:
+                bankruptcy_situation = driver.find_element(By.XPATH, self.bankruptcy_text_xpath)
+            except NoSuchElementException as e:
+                print(f'{e} Could not find XPATH, webpage is empty.')
+                raise NoSuchElementException
+
+            return is_text_in_xpath(self.stock_bankruptcy_status, bankruptcy_situation)
@@ -0,0 +1,109 @@
+import queue
+import threading
+from typing import Callable, Dict, List
+
+import settings
+from http_client import CircuitOpenError
+
+
+class ResultCollector:
+    r"""
+    Results of one `WorkQueue` run: `results_dict` of task to result, `errors_dict` of task to the last error of
+    the tasks failing every attempt and `attempts_dict` of task to the number of attempts.
+    """
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.results_dict: Dict = {}
+        self.errors_dict: Dict = {}
+        self.attempts_dict: Dict = {}
+
+    # end def
+
+    def add_attempt(self, task) -> int:
+        with self.lock:
+            self.attempts_dict[task] = self.attempts_dict.get(task, 0) + 1
+            return self.attempts_dict[task]
+
+    # end def
+
+    def add_result(self, task, result) -> None:
+        with self.lock:
+            self.results_dict[task] = result
+
+    # end def
+
+    def add_error(self, task, error: str) -> None:
+        with self.lock:
+            self.errors_dict[task] = error
+
+    # end def
+
+
+class WorkQueue:
+    r"""
+    Runs `worker_function(task, timeout_seconds)` over every task from a shared queue, each worker takes the next
+    task as soon as it is done with its current one. Every task is processed once, a failed attempt is tried again up
+    to `retries` times, unless the circuit breaker is open since retrying at once would fail fast again. The timeout is applied by `worker_function` to its page load.
+    """
+    def __init__(
+            self,
+            worker_function: Callable,
+            max_workers: int = settings.DETAIL_CHECK_WORKERS,
+            retries: int = settings.DETAIL_CHECK_RETRIES,
+            timeout_seconds: float = settings.DETAIL_CHECK_TIMEOUT_SECONDS
+    ) -> None:
+        if max_workers <= 0 or retries < 0 or timeout_seconds <= 0:
+            print('Invalid work queue workers, retries or timeout.')
+            raise SystemExit(1)
+
+        self.worker_function: Callable = worker_function
+        self.max_workers: int = max_workers
+        self.retries: int = retries
+        self.timeout_seconds: float = timeout_seconds
+
+    # end def
+
+    def run(self, tasks_list: List) -> ResultCollector:
+        r"""
+        Process every distinct task of `tasks_list`.
+
+        Return
+        -------
+        `ResultCollector` of this run
+        """
+        result_collector = ResultCollector()
+        tasks_queue = queue.Queue()
+        for task in dict.fromkeys(tasks_list):
+            tasks_queue.put(task)
+
+        workers_list = [threading.Thread(target=self._work, args=(tasks_queue, result_collector), daemon=True)
+                        for _ in range(min(self.max_workers, tasks_queue.qsize()))]
+        [worker.start() for worker in workers_list]
+        [worker.join() for worker in workers_list]
+
+        return result_collector
+
+    # end def
+
+    def _work(
+            self,
+            tasks_queue: queue.Queue,
+            result_collector: ResultCollector
+    ) -> None:
+        while True:
+            try:
+                task = tasks_queue.get_nowait()
+            except queue.Empty:
+                return
+
+            while True:
+                attempt = result_collector.add_attempt(task)
+                try:
+                    result_collector.add_result(task, self.worker_function(task, self.timeout_seconds))
+                    break
+                except (SystemExit, Exception) as e:
+                    if attempt > self.retries or isinstance(e, CircuitOpenError):
+                        result_collector.add_error(task, repr(e))
+                        break
+
+    # end def